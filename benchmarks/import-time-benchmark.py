@@ -0,0 +1,109 @@
+#
+# Copyright (c) 2024-2025, Daily
+#
+# SPDX-License-Identifier: BSD 2-Clause License
+#
+
+"""Cold-start cost of importing pipecat-moss and creating the service.
+
+Each scenario runs in a fresh interpreter several times and the median wall
+time is reported, so nothing is served from modules already in memory. The
+reference scenarios show what the Moss SDK and Pipecat's frame modules cost on
+their own, which is what an eager import would add to every cold start.
+
+Usage:
+    python benchmarks/import-time-benchmark.py
+    python benchmarks/import-time-benchmark.py --repeat 10 --top 15
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+SCENARIOS = {
+    "import pipecat_moss": "import pipecat_moss",
+    "create MossRetrievalService": (
+        "from pipecat_moss import MossRetrievalService\nMossRetrievalService()"
+    ),
+    "create a processor": (
+        "from pipecat_moss import MossRetrievalService\nMossRetrievalService().query('index')"
+    ),
+    "reference: import inferedge_moss": "import inferedge_moss",
+    "reference: import pipecat frames": "import pipecat.frames.frames",
+}
+
+TIMER = """
+import time
+_start = time.perf_counter()
+{code}
+print(time.perf_counter() - _start)
+"""
+
+
+def time_scenario(code: str) -> float:
+    """Run ``code`` in a fresh interpreter and return its wall time in seconds."""
+    result = subprocess.run(
+        [sys.executable, "-c", TIMER.format(code=code)],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return float(result.stdout.strip().splitlines()[-1])
+
+
+def slowest_imports(code: str, top: int) -> list[tuple[int, str]]:
+    """Return the ``top`` modules with the largest cumulative import time, in µs."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = (part.strip() for part in line[len("import time:") :].split("|"))
+        rows.append((int(cumulative), name))
+    return sorted(rows, reverse=True)[:top]
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Time every scenario and print a summary."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5, help="runs per scenario")
+    parser.add_argument("--top", type=int, default=10, help="slowest imports to list")
+    parser.add_argument(
+        "--profile",
+        choices=SCENARIOS,
+        default="create MossRetrievalService",
+        help="scenario whose slowest imports are listed",
+    )
+    parser.add_argument("--json", type=Path, help="also write the results to this file")
+    args = parser.parse_args(argv)
+
+    results = {}
+    for name, code in SCENARIOS.items():
+        try:
+            runs = [time_scenario(code) for _ in range(args.repeat)]
+        except subprocess.CalledProcessError as exc:
+            print(f"{name:<36} failed: {exc.stderr.strip().splitlines()[-1]}")
+            continue
+        results[name] = statistics.median(runs) * 1000
+        print(f"{name:<36} {results[name]:>8.1f} ms  (min {min(runs) * 1000:.1f} ms)")
+
+    if args.top:
+        print(f"\nSlowest imports to {args.profile}:")
+        for cumulative, module in slowest_imports(SCENARIOS[args.profile], args.top):
+            print(f"  {cumulative / 1000:>8.1f} ms  {module}")
+
+    if args.json:
+        args.json.write_text(json.dumps(results, indent=2) + "\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
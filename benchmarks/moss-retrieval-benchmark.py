@@ -0,0 +1,318 @@
+#
+# Copyright (c) 2024-2025, Daily
+#
+# SPDX-License-Identifier: BSD 2-Clause License
+#
+
+"""Offline load test for Moss retrieval in concurrent Pipecat pipelines.
+
+Runs many sessions at once through one ``MossRetrievalService`` backed by a
+``FakeMossClient``. Each session replays a scripted transcript as
+``LLMContextFrame`` turns through its own pipeline and measures how long the
+retrieval processor holds each turn. The run reports per-turn added latency,
+throughput, event-loop lag and memory per session, and can save the results
+as a baseline or compare them against one.
+
+Usage:
+    python benchmarks/moss-retrieval-benchmark.py --sessions 100
+    python benchmarks/moss-retrieval-benchmark.py --save-baseline benchmarks/baselines/local.json
+    python benchmarks/moss-retrieval-benchmark.py --baseline benchmarks/baselines/local.json
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import resource
+import sys
+import time
+from pathlib import Path
+
+from loguru import logger
+from pipecat.frames.frames import EndFrame, Frame, LLMContextFrame, TTSSpeakFrame
+from pipecat.pipeline.pipeline import Pipeline
+from pipecat.pipeline.runner import PipelineRunner
+from pipecat.pipeline.task import PipelineParams, PipelineTask
+from pipecat.processors.aggregators.llm_context import LLMContext
+from pipecat.processors.frame_processor import FrameDirection, FrameProcessor
+
+from pipecat_moss import ConversationQueryBuilder, MossRetrievalService
+from pipecat_moss.moss_fake_client import FakeMossClient
+
+DEFAULT_TRANSCRIPT = Path(__file__).parent / "transcripts" / "support-call.txt"
+
+# (result key, whether a higher value is worse, absolute slack ignored as noise)
+REGRESSION_CHECKS = [
+    ("added_latency_ms.p95", True, 1.0),
+    ("added_latency_ms.p99", True, 2.0),
+    ("throughput_turns_per_s", False, 0.0),
+    ("loop_lag_ms.p99", True, 2.0),
+    ("memory_per_session_kb", True, 64.0),
+]
+
+
+class TurnClock(FrameProcessor):
+    """Timestamp every context (or spoken answer) frame that passes through."""
+
+    def __init__(self, **kwargs):
+        """Create the clock with an empty queue of timestamps."""
+        super().__init__(**kwargs)
+        self.stamps: asyncio.Queue[float] = asyncio.Queue()
+
+    async def process_frame(self, frame: Frame, direction: FrameDirection):
+        """Record when turn frames pass and forward every frame."""
+        await super().process_frame(frame, direction)
+        if isinstance(frame, (LLMContextFrame, TTSSpeakFrame)):
+            self.stamps.put_nowait(time.perf_counter())
+        await self.push_frame(frame, direction)
+
+
+def read_transcript(path: Path) -> list[str]:
+    """Read one user turn per line, skipping blank lines and comments."""
+    lines = (line.strip() for line in path.read_text(encoding="utf-8").splitlines())
+    return [line for line in lines if line and not line.startswith("#")]
+
+
+def percentiles(values: list[float]) -> dict[str, float]:
+    """Summarize ``values`` (seconds) in milliseconds."""
+    if not values:
+        return {"mean": 0.0, "p50": 0.0, "p95": 0.0, "p99": 0.0, "max": 0.0}
+    ordered = sorted(values)
+
+    def pick(q: float) -> float:
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))] * 1000
+
+    return {
+        "mean": sum(ordered) / len(ordered) * 1000,
+        "p50": pick(0.50),
+        "p95": pick(0.95),
+        "p99": pick(0.99),
+        "max": ordered[-1] * 1000,
+    }
+
+
+def peak_rss_kb() -> float:
+    """Return the peak resident set size of this process in KB."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KB, macOS reports bytes.
+    return peak / 1024 if sys.platform == "darwin" else float(peak)
+
+
+async def run_session(
+    service: MossRetrievalService,
+    args: argparse.Namespace,
+    transcript: list[str],
+    session_id: int,
+    latencies: list[float],
+):
+    """Replay ``transcript`` through one pipeline and collect added latencies."""
+    rng = random.Random(args.seed * 100_003 + session_id)
+    before, after = TurnClock(), TurnClock()
+    query_builder = (
+        ConversationQueryBuilder(window_turns=args.query_window, summary_terms=args.summary_terms)
+        if args.query_window is not None
+        else None
+    )
+    processor = service.query(
+        args.index_name,
+        top_k=args.top_k,
+        query_timeout=args.query_timeout,
+        max_context_blocks=args.max_context_blocks,
+        query_builder=query_builder,
+        embedding_cache_size=args.embedding_cache_size,
+    )
+    task = PipelineTask(
+        Pipeline([before, processor, after]),
+        params=PipelineParams(enable_metrics=False),
+        idle_timeout_secs=None,
+        cancel_on_idle_timeout=False,
+        check_dangling_tasks=False,
+        enable_turn_tracking=False,
+    )
+    runner = asyncio.create_task(PipelineRunner(handle_sigint=False).run(task))
+
+    context = LLMContext([{"role": "system", "content": "You are a support agent."}])
+    # Stagger session starts so turns do not arrive in lockstep.
+    await asyncio.sleep(rng.uniform(0, args.think_time))
+    for turn in range(args.turns):
+        context.add_message({"role": "user", "content": transcript[turn % len(transcript)]})
+        await task.queue_frame(LLMContextFrame(context))
+        entered = await before.stamps.get()
+        left = await after.stamps.get()
+        latencies.append(left - entered)
+        context.add_message({"role": "assistant", "content": "Sure, let me help with that."})
+        await asyncio.sleep(args.think_time * rng.uniform(0.5, 1.5))
+
+    await task.queue_frame(EndFrame())
+    await runner
+
+
+async def run_benchmark(args: argparse.Namespace) -> dict:
+    """Run every session concurrently and summarize the results."""
+    transcript = read_transcript(args.transcript)
+    fake = FakeMossClient(
+        corpus_size=args.corpus_size,
+        latency=args.latency,
+        jitter=args.jitter,
+        cpu_time=args.cpu_time,
+        failure_rate=args.failure_rate,
+        seed=args.seed,
+    )
+    service = MossRetrievalService(
+        client_factory=lambda: fake,
+        cache_max_size=args.cache_size,
+        batch_window=args.batch_window,
+        query_workers=args.query_workers,
+        monitor_loop_lag=True,
+    )
+    await service.load_index(args.index_name, pin=True)
+
+    rss_before = peak_rss_kb()
+    latencies: list[float] = []
+    start = time.perf_counter()
+    await asyncio.gather(
+        *(run_session(service, args, transcript, i, latencies) for i in range(args.sessions))
+    )
+    wall_time = time.perf_counter() - start
+    rss_after = peak_rss_kb()
+
+    lag = service.loop_lag_stats
+    summary = service.retrieval_latency.get(args.index_name)
+    await service.close()
+
+    return {
+        "turns": len(latencies),
+        "wall_time_s": wall_time,
+        "throughput_turns_per_s": len(latencies) / wall_time,
+        "added_latency_ms": percentiles(latencies),
+        "query_ms": {
+            "p50": summary.stages["query"].p50 * 1000,
+            "p95": summary.stages["query"].p95 * 1000,
+            "p99": summary.stages["query"].p99 * 1000,
+        }
+        if summary
+        else {},
+        "outcomes": summary.outcomes if summary else {},
+        "loop_lag_ms": {
+            "mean": lag.mean * 1000,
+            "p99": lag.p99 * 1000,
+            "max": lag.max * 1000,
+        },
+        "memory_per_session_kb": max(0.0, rss_after - rss_before) / args.sessions,
+        "queries": fake.stats.queries,
+        "query_failures": fake.stats.failures,
+        "embedded_texts": fake.stats.embeddings,
+    }
+
+
+def lookup(results: dict, key: str) -> float:
+    """Return a nested value such as ``"added_latency_ms.p95"``."""
+    value = results
+    for part in key.split("."):
+        value = value[part]
+    return value
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list[str]:
+    """Return a description of every metric that regressed beyond ``tolerance``."""
+    regressions = []
+    for key, higher_is_worse, slack in REGRESSION_CHECKS:
+        try:
+            old = lookup(baseline["results"], key)
+        except KeyError:
+            continue
+        new = lookup(results, key)
+        if higher_is_worse:
+            regressed = new > old * (1 + tolerance) + slack
+        else:
+            regressed = new < old * (1 - tolerance) - slack
+        status = "REGRESSED" if regressed else "ok"
+        print(f"  {key:<28} {old:>10.2f} -> {new:>10.2f}  {status}")
+        if regressed:
+            regressions.append(key)
+    return regressions
+
+
+def print_report(config: dict, results: dict):
+    """Print a human-readable summary of a run."""
+    latency = results["added_latency_ms"]
+    lag = results["loop_lag_ms"]
+    print(
+        f"{config['sessions']} sessions, {results['turns']} turns in "
+        f"{results['wall_time_s']:.1f}s ({results['throughput_turns_per_s']:.1f} turns/s)"
+    )
+    print(
+        f"  added latency ms: mean {latency['mean']:.2f}  p50 {latency['p50']:.2f}  "
+        f"p95 {latency['p95']:.2f}  p99 {latency['p99']:.2f}  max {latency['max']:.2f}"
+    )
+    print(f"  loop lag ms:      mean {lag['mean']:.2f}  p99 {lag['p99']:.2f}  max {lag['max']:.2f}")
+    print(f"  memory/session:   {results['memory_per_session_kb']:.1f} KB")
+    print(f"  queries:          {results['queries']} ({results['embedded_texts']} texts embedded)")
+    print(f"  outcomes:         {results['outcomes']}")
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    """Parse the command line."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=50, help="concurrent pipelines")
+    parser.add_argument("--turns", type=int, default=20, help="user turns per session")
+    parser.add_argument("--transcript", type=Path, default=DEFAULT_TRANSCRIPT)
+    parser.add_argument("--think-time", type=float, default=0.2, help="seconds between turns")
+    parser.add_argument("--index-name", default="benchmark")
+    parser.add_argument("--top-k", type=int, default=5)
+    parser.add_argument("--corpus-size", type=int, default=1000)
+    parser.add_argument("--latency", type=float, default=0.005, help="fake query seconds")
+    parser.add_argument("--jitter", type=float, default=0.002, help="fake extra seconds")
+    parser.add_argument("--cpu-time", type=float, default=0.0005, help="fake blocking seconds")
+    parser.add_argument("--failure-rate", type=float, default=0.0)
+    parser.add_argument("--query-timeout", type=float, default=None)
+    parser.add_argument("--max-context-blocks", type=int, default=None)
+    parser.add_argument(
+        "--query-window", type=int, default=None, help="earlier turns folded into each query"
+    )
+    parser.add_argument("--summary-terms", type=int, default=0, help="rolling summary keywords")
+    parser.add_argument("--embedding-cache-size", type=int, default=64)
+    parser.add_argument("--cache-size", type=int, default=0, help="shared query cache size")
+    parser.add_argument("--batch-window", type=float, default=None)
+    parser.add_argument("--query-workers", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--save-baseline", type=Path, help="write the results to this file")
+    parser.add_argument("--baseline", type=Path, help="compare the results with this file")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed relative change")
+    parser.add_argument("--log-level", default="WARNING")
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Run the benchmark and return a non-zero exit code on regression."""
+    args = parse_args(argv)
+    logger.remove()
+    logger.add(sys.stderr, level=args.log_level)
+
+    config = {
+        key: str(value) if isinstance(value, Path) else value
+        for key, value in vars(args).items()
+        if key not in ("save_baseline", "baseline", "tolerance", "log_level")
+    }
+    results = asyncio.run(run_benchmark(args))
+    print_report(config, results)
+
+    if args.save_baseline:
+        args.save_baseline.parent.mkdir(parents=True, exist_ok=True)
+        args.save_baseline.write_text(
+            json.dumps({"config": config, "results": results}, indent=2) + "\n"
+        )
+        print(f"Saved baseline to {args.save_baseline}")
+
+    if args.baseline:
+        baseline = json.loads(args.baseline.read_text())
+        if baseline["config"] != config:
+            print("Warning: the baseline was recorded with different settings")
+        print(f"Compared with {args.baseline} (tolerance {args.tolerance:.0%}):")
+        if compare(results, baseline, args.tolerance):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -2,23 +2,72 @@
 
 from __future__ import annotations
 
-from inferedge_moss import (
-    AddDocumentsOptions,
-    DocumentInfo,
-    GetDocumentsOptions,
-    IndexInfo,
-    MossClient,
-    SearchResult,
-)
+import importlib
+from typing import TYPE_CHECKING
 
-from .moss_retrieval_service import MossRetrievalService
+if TYPE_CHECKING:
+    from inferedge_moss import (
+        AddDocumentsOptions,
+        DocumentInfo,
+        GetDocumentsOptions,
+        IndexInfo,
+        MossClient,
+        SearchResult,
+    )
+
+    from .moss_document_packer import DocumentPacker
+    from .moss_index_sync import MossIndexSync
+    from .moss_ingest import IngestRecord, MossIngestor
+    from .moss_multi_index_processor import MossIndexQuery
+    from .moss_query_builder import ConversationQueryBuilder
+    from .moss_retrieval_gate import RetrievalGate
+    from .moss_retrieval_service import MossRetrievalService
 
 __all__ = [
     "AddDocumentsOptions",
+    "ConversationQueryBuilder",
     "DocumentInfo",
+    "DocumentPacker",
     "GetDocumentsOptions",
     "IndexInfo",
+    "IngestRecord",
     "MossClient",
+    "MossIndexQuery",
+    "MossIndexSync",
+    "MossIngestor",
     "MossRetrievalService",
+    "RetrievalGate",
     "SearchResult",
 ]
+
+# Imported on first access: the Moss SDK loads its embedding runtime at import
+# time, and the processors pull in Pipecat's frame modules.
+_LAZY_IMPORTS = {
+    "AddDocumentsOptions": "inferedge_moss",
+    "DocumentInfo": "inferedge_moss",
+    "GetDocumentsOptions": "inferedge_moss",
+    "IndexInfo": "inferedge_moss",
+    "MossClient": "inferedge_moss",
+    "SearchResult": "inferedge_moss",
+    "ConversationQueryBuilder": ".moss_query_builder",
+    "DocumentPacker": ".moss_document_packer",
+    "IngestRecord": ".moss_ingest",
+    "MossIndexQuery": ".moss_multi_index_processor",
+    "MossIndexSync": ".moss_index_sync",
+    "MossIngestor": ".moss_ingest",
+    "MossRetrievalService": ".moss_retrieval_service",
+    "RetrievalGate": ".moss_retrieval_gate",
+}
+
+
+def __getattr__(name: str):
+    module = _LAZY_IMPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted({*globals(), *__all__})
@@ -0,0 +1,98 @@
+#
+# Copyright (c) 2024-2025, Daily
+#
+# SPDX-License-Identifier: BSD 2-Clause License
+#
+
+"""Circuit breaker that short-circuits retrieval against a failing Moss index."""
+
+from __future__ import annotations
+
+import time
+from typing import Literal
+
+from loguru import logger
+
+__all__ = ["MossCircuitBreaker"]
+
+CircuitState = Literal["closed", "open", "half_open"]
+
+
+class MossCircuitBreaker:
+    """Skip retrieval after repeated failures and re-probe after a cool-down.
+
+    The breaker opens after ``failure_threshold`` consecutive failures or
+    timeouts. While open every request is rejected; once ``reset_timeout``
+    seconds have passed a single probe request is let through. A successful
+    probe closes the breaker, a failed one opens it again. A probe that ends
+    without a result, e.g. because the turn was cancelled, must be handed back
+    with ``release_probe()`` so the next request can probe instead.
+    """
+
+    def __init__(self, name: str, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        """Configure the breaker thresholds.
+
+        Args:
+            name: Label used in log messages, usually the index name.
+            failure_threshold: Consecutive failures that open the breaker.
+            reset_timeout: Seconds to wait before probing an open breaker.
+        """
+        self._name = name
+        self._failure_threshold = failure_threshold
+        self._reset_timeout = reset_timeout
+        self._state: CircuitState = "closed"
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+
+    @property
+    def state(self) -> CircuitState:
+        """Return the current breaker state."""
+        return self._state
+
+    def allow_request(self) -> bool:
+        """Return whether a retrieval may be attempted right now."""
+        if self._state == "closed":
+            return True
+
+        if self._state == "open":
+            if time.monotonic() - self._opened_at < self._reset_timeout:
+                return False
+            logger.debug(f"Moss circuit for {self._name} half-open; probing")
+            self._state = "half_open"
+            self._probe_in_flight = False
+
+        # Half-open: only one probe at a time.
+        if self._probe_in_flight:
+            return False
+        self._probe_in_flight = True
+        return True
+
+    def release_probe(self):
+        """Let another request probe after one ended without success or failure.
+
+        Does nothing unless the breaker is half-open, so callers may call it
+        unconditionally once a request is over.
+        """
+        if self._state == "half_open":
+            self._probe_in_flight = False
+
+    def record_success(self):
+        """Record a successful retrieval and close the breaker."""
+        if self._state != "closed":
+            logger.info(f"Moss circuit for {self._name} closed")
+        self._state = "closed"
+        self._failures = 0
+        self._probe_in_flight = False
+
+    def record_failure(self):
+        """Record a failed or timed-out retrieval."""
+        self._failures += 1
+        self._probe_in_flight = False
+        if self._state == "half_open" or self._failures >= self._failure_threshold:
+            if self._state != "open":
+                logger.warning(
+                    f"Moss circuit for {self._name} opened after {self._failures} failures"
+                )
+            self._state = "open"
+            self._opened_at = time.monotonic()
@@ -0,0 +1,165 @@
+#
+# Copyright (c) 2024-2025, Daily
+#
+# SPDX-License-Identifier: BSD 2-Clause License
+#
+
+"""Token-budgeted, score-aware packing of retrieved Moss documents."""
+
+from __future__ import annotations
+
+import re
+from collections.abc import Callable, Sequence
+from dataclasses import dataclass
+from typing import Any
+
+from .moss_query_cache import normalize_query
+
+__all__ = ["DocumentPacker", "PackedDocument", "Tokenizer", "estimate_tokens"]
+
+Tokenizer = Callable[[str], int]
+
+_SENTENCE_RE = re.compile(r"(?<=[.!?])\s+")
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheaply estimate the token count of ``text`` (about 4 characters per token)."""
+    return (len(text) + 3) // 4
+
+
+@dataclass
+class PackedDocument:
+    """A retrieved document, possibly trimmed, selected for the prompt.
+
+    Parameters:
+        id: Document identifier.
+        text: Passage text, trimmed to its best-matching sentences if needed.
+        metadata: Document metadata.
+        score: Retrieval score reported by Moss.
+        tokens: Estimated tokens of ``text``.
+    """
+
+    id: str | None
+    text: str
+    metadata: dict[str, Any] | None
+    score: float | None
+    tokens: int
+
+
+class DocumentPacker:
+    """Select and trim retrieved documents to fit a prompt budget.
+
+    Documents below ``min_score``, or below ``min_relative_score`` times the top
+    score, are dropped. The rest are added greedily by score until
+    ``max_tokens`` is used up. Passages longer than ``max_passage_tokens``, or
+    longer than the budget left, are cut down to the sentences that share the
+    most terms with the query.
+    """
+
+    def __init__(
+        self,
+        max_tokens: int = 512,
+        *,
+        min_score: float | None = None,
+        min_relative_score: float | None = None,
+        max_passage_tokens: int | None = None,
+        tokenizer: Tokenizer = estimate_tokens,
+    ):
+        """Configure the packing budget and relevance cutoffs.
+
+        Args:
+            max_tokens: Total budget for all passages. Pass ``tokenizer=len`` to
+                budget in characters instead of tokens.
+            min_score: Absolute score below which documents are dropped.
+            min_relative_score: Fraction of the top score below which documents
+                are dropped, e.g. ``0.5`` keeps hits scoring at least half the best.
+            max_passage_tokens: Upper bound for a single passage.
+            tokenizer: Function that returns the token count of a string.
+        """
+        self._max_tokens = max_tokens
+        self._min_score = min_score
+        self._min_relative_score = min_relative_score
+        self._max_passage_tokens = max_passage_tokens
+        self.tokenizer = tokenizer
+
+    def pack(self, query: str, documents: Sequence[Any]) -> list[PackedDocument]:
+        """Return the documents that fit the budget, highest score first."""
+        candidates = self._filter_by_score(documents)
+        query_terms = set(normalize_query(query).split())
+
+        packed: list[PackedDocument] = []
+        remaining = self._max_tokens
+        for doc in candidates:
+            if remaining <= 0:
+                break
+
+            text = getattr(doc, "text", "") or ""
+            limit = remaining
+            if self._max_passage_tokens is not None:
+                limit = min(limit, self._max_passage_tokens)
+
+            tokens = self.tokenizer(text)
+            if tokens > limit:
+                text = self._trim(text, query_terms, limit)
+                tokens = self.tokenizer(text)
+            if not text or tokens > remaining:
+                continue
+
+            packed.append(
+                PackedDocument(
+                    id=getattr(doc, "id", None),
+                    text=text,
+                    metadata=getattr(doc, "metadata", None),
+                    score=getattr(doc, "score", None),
+                    tokens=tokens,
+                )
+            )
+            remaining -= tokens
+        return packed
+
+    def _filter_by_score(self, documents: Sequence[Any]) -> list[Any]:
+        scores = [s for doc in documents if (s := getattr(doc, "score", None)) is not None]
+        threshold = self._min_score
+        if self._min_relative_score is not None and scores and max(scores) > 0:
+            relative = max(scores) * self._min_relative_score
+            threshold = relative if threshold is None else max(threshold, relative)
+
+        kept = [
+            doc
+            for doc in documents
+            if threshold is None
+            or (score := getattr(doc, "score", None)) is None
+            or score >= threshold
+        ]
+        # Stable sort keeps Moss' order for ties and unscored documents.
+        return sorted(kept, key=lambda d: -(getattr(d, "score", None) or 0.0))
+
+    def _trim(self, text: str, query_terms: set[str], limit: int) -> str:
+        """Keep the sentences sharing the most terms with the query, in original order."""
+        sentences = [s for s in _SENTENCE_RE.split(text.strip()) if s]
+        ranked = sorted(
+            range(len(sentences)),
+            key=lambda i: -len(query_terms & set(normalize_query(sentences[i]).split())),
+        )
+
+        chosen: list[int] = []
+        used = 0
+        for i in ranked:
+            tokens = self.tokenizer(sentences[i])
+            if used + tokens <= limit:
+                chosen.append(i)
+                used += tokens
+
+        if not chosen:
+            # Even the best sentence is too long: keep the longest prefix that fits.
+            words = sentences[ranked[0]].split() if ranked else []
+            low, high = 0, len(words)
+            while low < high:
+                mid = (low + high + 1) // 2
+                if self.tokenizer(" ".join(words[:mid])) <= limit:
+                    low = mid
+                else:
+                    high = mid - 1
+            return " ".join(words[:low])
+
+        return " ".join(sentences[i] for i in sorted(chosen))
@@ -0,0 +1,336 @@
+#
+# Copyright (c) 2024-2025, Daily
+#
+# SPDX-License-Identifier: BSD 2-Clause License
+#
+
+"""In-memory stand-in for ``MossClient`` for offline benchmarks and development."""
+
+from __future__ import annotations
+
+import asyncio
+import math
+import random
+import re
+import time
+import zlib
+from collections import defaultdict
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+
+from inferedge_moss import (
+    AddDocumentsOptions,
+    DocumentInfo,
+    GetDocumentsOptions,
+    IndexInfo,
+    ModelRef,
+    QueryResultDocumentInfo,
+    SearchResult,
+)
+
+__all__ = ["FakeClientStats", "FakeMossClient"]
+
+_WORD = re.compile(r"\w+")
+_EMBEDDING_DIMS = 64
+
+# Enough distinct words that synthetic documents rarely share all query terms.
+_VOCABULARY = (
+    "account address airport allergy appointment baggage balance billing booking cancel "
+    "card charge checkout claim coverage credit delay delivery deposit discount doctor "
+    "exchange fee flight gate hotel insurance invoice limit login loyalty menu order "
+    "password payment pharmacy pickup plan points policy prescription price refund "
+    "renewal reservation return room schedule seat shipping size subscription support "
+    "ticket transfer upgrade warranty weekend allowance arrival bonus branch "
+    "contract deadline device dosage estimate feature install internet network outage "
+    "portal premium receipt repair roaming router signal storage tariff trial voucher"
+).split()
+
+
+@dataclass
+class FakeClientStats:
+    """Calls served by a ``FakeMossClient``.
+
+    Parameters:
+        loads: Number of ``load_index`` calls.
+        queries: Number of ``query`` calls.
+        failures: Number of queries that raised a simulated failure.
+        writes: Number of ``add_docs`` and ``delete_docs`` calls.
+        embeddings: Number of query texts embedded, by ``query`` or ``embed_queries``.
+    """
+
+    loads: int = 0
+    queries: int = 0
+    failures: int = 0
+    writes: int = 0
+    embeddings: int = 0
+
+
+@dataclass
+class _FakeIndex:
+    model_id: str
+    docs: dict[str, DocumentInfo]
+    version: int = 1
+    created_at: str = field(default_factory=lambda: datetime.now(timezone.utc).isoformat())
+    postings: dict[str, set[str]] | None = None
+
+    def terms(self) -> dict[str, set[str]]:
+        if self.postings is None:
+            self.postings = defaultdict(set)
+            for doc in self.docs.values():
+                for term in set(_WORD.findall(doc.text.lower())):
+                    self.postings[term].add(doc.id)
+        return self.postings
+
+
+class FakeMossClient:
+    """Serve ``MossClient`` calls from memory with simulated latency and failures.
+
+    Indexes that were never created are generated on first use with
+    ``corpus_size`` synthetic documents, so benchmarks need no setup. Results
+    are ranked by query-term overlap, which is enough to exercise retrieval
+    code without embeddings or network access.
+
+    Each query awaits ``latency`` plus up to ``jitter`` seconds, then blocks
+    the calling thread for ``cpu_time`` seconds to stand in for in-process
+    query embedding, and fails with probability ``failure_rate``.
+    ``embed_queries`` blocks for ``cpu_time`` per text and returns hashed
+    bag-of-words vectors; ``query_with_embedding`` skips the embedding cost
+    and ranks by the query text like ``query``.
+    """
+
+    def __init__(
+        self,
+        project_id: str | None = None,
+        project_key: str | None = None,
+        *,
+        corpus_size: int = 1000,
+        latency: float = 0.005,
+        jitter: float = 0.002,
+        cpu_time: float = 0.0,
+        failure_rate: float = 0.0,
+        load_latency: float = 0.0,
+        model_id: str = "moss-minilm",
+        seed: int | None = None,
+    ):
+        """Configure the simulated project.
+
+        Args:
+            project_id: Ignored; accepted for signature compatibility.
+            project_key: Ignored; accepted for signature compatibility.
+            corpus_size: Documents generated for an index on first use.
+            latency: Base seconds each query awaits.
+            jitter: Extra random seconds, between ``0`` and ``jitter``, per query.
+            cpu_time: Seconds each embedded query text blocks the calling thread.
+            failure_rate: Probability, between ``0`` and ``1``, that a query fails.
+            load_latency: Seconds ``load_index`` awaits.
+            model_id: Model reported for generated indexes.
+            seed: Seed for the corpus, jitter and failures.
+        """
+        if not 0.0 <= failure_rate <= 1.0:
+            raise ValueError("failure_rate must be between 0 and 1")
+        self._corpus_size = corpus_size
+        self._latency = latency
+        self._jitter = jitter
+        self._cpu_time = cpu_time
+        self._failure_rate = failure_rate
+        self._load_latency = load_latency
+        self._model_id = model_id
+        self._seed = seed
+        self._random = random.Random(seed)
+        self._indexes: dict[str, _FakeIndex] = {}
+        self._loaded: set[str] = set()
+        self._stats = FakeClientStats()
+
+    @property
+    def stats(self) -> FakeClientStats:
+        """Return a snapshot of the call counters."""
+        return FakeClientStats(**vars(self._stats))
+
+    async def create_index(
+        self, index_name: str, docs: list[DocumentInfo], model_id: str | None = None
+    ) -> bool:
+        """Create ``index_name`` with ``docs``, replacing any existing index."""
+        self._indexes[index_name] = _FakeIndex(
+            model_id or self._model_id, {doc.id: doc for doc in docs}
+        )
+        return True
+
+    async def get_index(self, index_name: str) -> IndexInfo:
+        """Describe ``index_name``; its version increases with every write."""
+        index = self._index(index_name)
+        return IndexInfo(
+            id=index_name,
+            name=index_name,
+            version=str(index.version),
+            status="Ready",
+            doc_count=len(index.docs),
+            created_at=index.created_at,
+            updated_at=index.created_at,
+            model=ModelRef(id=index.model_id, version="1"),
+        )
+
+    async def list_indexes(self) -> list[IndexInfo]:
+        """Describe every index created or generated so far."""
+        return [await self.get_index(name) for name in self._indexes]
+
+    async def delete_index(self, index_name: str) -> bool:
+        """Delete ``index_name``."""
+        self._loaded.discard(index_name)
+        return self._indexes.pop(index_name, None) is not None
+
+    async def add_docs(
+        self,
+        index_name: str,
+        docs: list[DocumentInfo],
+        options: AddDocumentsOptions | None = None,
+    ) -> dict[str, int]:
+        """Add or replace documents in ``index_name``."""
+        index = self._index(index_name)
+        updated = sum(1 for doc in docs if doc.id in index.docs)
+        index.docs.update((doc.id, doc) for doc in docs)
+        self._written(index)
+        return {"added": len(docs) - updated, "updated": updated}
+
+    async def delete_docs(self, index_name: str, doc_ids: list[str]) -> dict[str, int]:
+        """Delete documents from ``index_name`` by ID."""
+        index = self._index(index_name)
+        deleted = sum(1 for doc_id in doc_ids if index.docs.pop(doc_id, None) is not None)
+        self._written(index)
+        return {"deleted": deleted}
+
+    async def get_docs(
+        self, index_name: str, options: GetDocumentsOptions | None = None
+    ) -> list[DocumentInfo]:
+        """Return the documents of ``index_name``, optionally only some IDs."""
+        index = self._index(index_name)
+        doc_ids = getattr(options, "doc_ids", None)
+        if doc_ids is None:
+            return list(index.docs.values())
+        return [index.docs[doc_id] for doc_id in doc_ids if doc_id in index.docs]
+
+    async def load_index(self, index_name: str) -> str:
+        """Mark ``index_name`` as loaded so it can be queried."""
+        self._stats.loads += 1
+        if self._load_latency:
+            await asyncio.sleep(self._load_latency)
+        self._index(index_name).terms()
+        self._loaded.add(index_name)
+        return index_name
+
+    async def query(
+        self, index_name: str, query: str, top_k: int = 5, alpha: float | None = None
+    ) -> SearchResult:
+        """Rank the documents of a loaded index by overlap with ``query``."""
+        self._check_loaded(index_name)
+        self._stats.queries += 1
+        self._stats.embeddings += 1
+        start = time.perf_counter()
+        await asyncio.sleep(self._latency + self._random.uniform(0.0, self._jitter))
+        self._block(self._cpu_time)
+        return self._search(index_name, query, top_k, start)
+
+    async def embed_queries(self, index_name: str, texts: list[str]) -> list[list[float]]:
+        """Embed query texts for a loaded index as hashed bag-of-words vectors."""
+        self._check_loaded(index_name)
+        self._stats.embeddings += len(texts)
+        self._block(self._cpu_time * len(texts))
+        return [self._embed(text) for text in texts]
+
+    async def query_with_embedding(
+        self,
+        index_name: str,
+        query: str,
+        embedding: list[float],
+        top_k: int = 5,
+        alpha: float | None = None,
+    ) -> SearchResult:
+        """Rank like ``query`` without paying to embed ``query``."""
+        self._check_loaded(index_name)
+        self._stats.queries += 1
+        start = time.perf_counter()
+        await asyncio.sleep(self._latency + self._random.uniform(0.0, self._jitter))
+        return self._search(index_name, query, top_k, start)
+
+    def _check_loaded(self, index_name: str):
+        if index_name not in self._loaded:
+            raise ValueError(
+                f"Index '{index_name}' not found, please load the index first before querying"
+            )
+
+    @staticmethod
+    def _block(seconds: float):
+        deadline = time.perf_counter() + seconds
+        while time.perf_counter() < deadline:
+            pass
+
+    @staticmethod
+    def _embed(text: str) -> list[float]:
+        vector = [0.0] * _EMBEDDING_DIMS
+        for term in _WORD.findall(text.lower()):
+            vector[zlib.crc32(term.encode()) % _EMBEDDING_DIMS] += 1.0
+        norm = math.sqrt(sum(value * value for value in vector))
+        return [value / norm for value in vector] if norm else vector
+
+    def _search(self, index_name: str, query: str, top_k: int, start: float) -> SearchResult:
+        if self._random.random() < self._failure_rate:
+            self._stats.failures += 1
+            raise RuntimeError(f"Simulated query failure for index '{index_name}'")
+
+        index = self._indexes[index_name]
+        docs = self._rank(index, query, top_k)
+        return SearchResult(
+            docs=docs,
+            query=query,
+            index_name=index_name,
+            time_taken_ms=int((time.perf_counter() - start) * 1000),
+        )
+
+    def _rank(self, index: _FakeIndex, query: str, top_k: int) -> list[QueryResultDocumentInfo]:
+        terms = set(_WORD.findall(query.lower()))
+        postings = index.terms()
+        matches: dict[str, int] = defaultdict(int)
+        for term in terms:
+            for doc_id in postings.get(term, ()):
+                matches[doc_id] += 1
+        ranked = sorted(matches, key=lambda doc_id: (-matches[doc_id], doc_id))[:top_k]
+        # Semantic search always returns top_k results, however weak.
+        for doc_id in index.docs:
+            if len(ranked) >= top_k:
+                break
+            if doc_id not in matches:
+                ranked.append(doc_id)
+        return [
+            QueryResultDocumentInfo(
+                id=doc_id,
+                text=index.docs[doc_id].text,
+                metadata=index.docs[doc_id].metadata,
+                score=matches.get(doc_id, 0) / len(terms) if terms else 0.0,
+            )
+            for doc_id in ranked
+        ]
+
+    def _index(self, index_name: str) -> _FakeIndex:
+        index = self._indexes.get(index_name)
+        if index is None:
+            index = _FakeIndex(self._model_id, self._generate(index_name))
+            self._indexes[index_name] = index
+        return index
+
+    def _generate(self, index_name: str) -> dict[str, DocumentInfo]:
+        rng = random.Random(f"{self._seed}:{index_name}")
+        docs = {}
+        for i in range(self._corpus_size):
+            doc_id = f"{index_name}-{i}"
+            sentences = [
+                " ".join(rng.choices(_VOCABULARY, k=rng.randint(6, 14))).capitalize() + "."
+                for _ in range(rng.randint(2, 5))
+            ]
+            docs[doc_id] = DocumentInfo(
+                id=doc_id, text=" ".join(sentences), metadata={"source": index_name}
+            )
+        return docs
+
+    def _written(self, index: _FakeIndex):
+        self._stats.writes += 1
+        index.version += 1
+        index.postings = None
@@ -0,0 +1,474 @@
+#
+# Copyright (c) 2024-2025, Daily
+#
+# SPDX-License-Identifier: BSD 2-Clause License
+#
+
+"""Loaded-index registry with lazy loading, memory-bounded eviction and hot swap."""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from collections import OrderedDict, deque
+from collections.abc import Callable
+from dataclasses import dataclass
+from functools import partial
+from typing import TYPE_CHECKING, Literal
+
+from loguru import logger
+
+from .moss_index_snapshot import MossIndexSnapshotCache
+from .moss_query_executor import MossQueryExecutor
+from .moss_sdk_adapter import sdk_internals
+
+if TYPE_CHECKING:
+    from inferedge_moss import MossClient, SearchResult
+
+__all__ = ["IndexEvent", "IndexStats", "MossIndexManager", "estimate_index_memory"]
+
+IndexEventKind = Literal["load", "refresh", "evict"]
+
+# Per-document bookkeeping in the Rust index and the Python document map.
+_DOC_OVERHEAD_BYTES = 256
+_EMBEDDING_DIMS = {"moss-minilm": 384, "moss-mediumlm": 768}
+
+
+@dataclass
+class IndexStats:
+    """Residency, freshness and refresh counters for one loaded index.
+
+    Parameters:
+        index_name: Name of the index.
+        version: Remote version currently served, if known.
+        loaded_at: Wall-clock time the served version was loaded.
+        checked_at: Wall-clock time the served version was last confirmed current.
+        last_used: Wall-clock time the index was last queried.
+        memory_bytes: Approximate resident memory of the index.
+        pinned: Whether the index is exempt from eviction.
+        queries: Number of queries served.
+        refreshes: Number of times a newer version was swapped in.
+        failures: Number of failed refresh attempts.
+        last_refresh_duration: Seconds the most recent load or refresh took.
+    """
+
+    index_name: str
+    version: str | None = None
+    loaded_at: float = 0.0
+    checked_at: float = 0.0
+    last_used: float = 0.0
+    memory_bytes: int = 0
+    pinned: bool = False
+    queries: int = 0
+    refreshes: int = 0
+    failures: int = 0
+    last_refresh_duration: float = 0.0
+
+    @property
+    def staleness(self) -> float:
+        """Seconds since the served version was last confirmed current."""
+        return time.time() - self.checked_at
+
+
+@dataclass
+class IndexEvent:
+    """An index being loaded, refreshed or evicted.
+
+    Parameters:
+        kind: ``"load"``, ``"refresh"`` or ``"evict"``.
+        index_name: Name of the index.
+        memory_bytes: Approximate memory the index occupies (or freed).
+        duration: Seconds the load or refresh took; ``0`` for evictions.
+        timestamp: Wall-clock time of the event.
+    """
+
+    kind: IndexEventKind
+    index_name: str
+    memory_bytes: int
+    duration: float
+    timestamp: float
+
+
+def estimate_index_memory(client: MossClient, index_name: str) -> int:
+    """Approximate the memory ``index_name`` occupies inside ``client``.
+
+    Counts one float32 embedding per document plus its text, metadata and a
+    fixed per-document overhead. Returns ``0`` if the client does not expose
+    its loaded documents, including SDK versions ``moss_sdk_adapter`` does
+    not support.
+    """
+    internals = sdk_internals(client)
+    documents = internals.index_documents(index_name) if internals is not None else None
+    if not documents:
+        return 0
+    embedding_bytes = _EMBEDDING_DIMS.get(internals.index_model(index_name), 384) * 4
+    total = 0
+    for doc in documents.values():
+        total += _DOC_OVERHEAD_BYTES + embedding_bytes + len(doc.text.encode())
+        if doc.metadata:
+            total += sum(len(k) + len(str(v)) for k, v in doc.metadata.items())
+    return total
+
+
+async def _embed(client: MossClient, index_name: str, texts: list[str]) -> list[list[float]]:
+    """Embed ``texts`` the way ``client`` embeds queries against ``index_name``."""
+    internals = sdk_internals(client)
+    if internals is not None and internals.has_index(index_name):
+        return await internals.embed(index_name, texts)
+    embed_queries = getattr(client, "embed_queries", None)
+    if embed_queries is None:
+        raise NotImplementedError(f"{type(client).__name__} cannot embed queries")
+    return await embed_queries(index_name, texts)
+
+
+async def _query_with_embedding(
+    client: MossClient,
+    index_name: str,
+    query: str,
+    embedding: list[float],
+    top_k: int,
+    alpha: float | None,
+) -> SearchResult:
+    """Search ``index_name`` in ``client`` without embedding ``query`` again.
+
+    Falls back to a plain ``query``, which embeds it again, when the client
+    cannot search by embedding.
+    """
+    internals = sdk_internals(client)
+    if internals is not None and internals.has_index(index_name):
+        return internals.query_with_embedding(index_name, query, embedding, top_k, alpha)
+    query_with_embedding = getattr(client, "query_with_embedding", None)
+    if query_with_embedding is None:
+        return await client.query(index_name, query, top_k, alpha)
+    return await query_with_embedding(index_name, query, embedding, top_k, alpha)
+
+
+async def _query_batch(
+    client: MossClient,
+    index_name: str,
+    queries: list[str],
+    top_k: int,
+    alpha: float | None,
+) -> list[SearchResult | BaseException]:
+    """Embed ``queries`` in one call, then search ``index_name`` once per embedding."""
+    try:
+        embeddings = await _embed(client, index_name, queries)
+    except NotImplementedError:
+        searches = [client.query(index_name, query, top_k, alpha) for query in queries]
+    else:
+        searches = [
+            _query_with_embedding(client, index_name, query, embedding, top_k, alpha)
+            for query, embedding in zip(queries, embeddings, strict=True)
+        ]
+    return await asyncio.gather(*searches, return_exceptions=True)
+
+
+class MossIndexManager:
+    """Serve each index from its own client so it can be swapped or dropped alone.
+
+    Indexes are loaded on first use; concurrent requests for the same index
+    share one load. When ``max_memory`` is set, least-recently-used indexes
+    are evicted after a load pushes the approximate total above it. Pinned
+    indexes are never evicted.
+
+    A refresh loads the new version into a fresh client alongside the one in
+    use and then replaces a single routing entry. Queries already running keep
+    the old client until they finish; new queries see the new version. Nothing
+    waits on the load, and no query sees a half-loaded index.
+    """
+
+    def __init__(
+        self,
+        control_client: MossClient | None,
+        client_factory: Callable[[], MossClient],
+        *,
+        snapshots: MossIndexSnapshotCache | None = None,
+        executor: MossQueryExecutor | None = None,
+        max_memory: int | None = None,
+        refresh_interval: float | None = None,
+        memory_estimator: Callable[[MossClient, str], int] = estimate_index_memory,
+        on_swap: Callable[[str], None] | None = None,
+        on_event: Callable[[IndexEvent], None] | None = None,
+        event_history: int = 256,
+    ):
+        """Create the manager.
+
+        Args:
+            control_client: Client used for version checks; created with
+                ``client_factory`` on first use if ``None``.
+            client_factory: Creates the client that holds one loaded index.
+            snapshots: Optional on-disk snapshot cache used for loads.
+            executor: Optional worker pool that runs the searches.
+            max_memory: Approximate bytes of indexes to keep resident.
+            refresh_interval: Seconds between background refreshes, started
+                when the first index is loaded.
+            memory_estimator: Returns the approximate bytes an index occupies.
+            on_swap: Called with the index name after a version is swapped in
+                or evicted.
+            on_event: Called with every load, refresh and eviction event.
+            event_history: Number of recent events kept in ``events``.
+        """
+        self._control = control_client
+        self._client_factory = client_factory
+        self._snapshots = snapshots
+        self._executor = executor
+        self._max_memory = max_memory
+        self._refresh_interval = refresh_interval
+        self._memory_estimator = memory_estimator
+        self._on_swap = on_swap
+        self._on_event = on_event
+        # Least recently used first.
+        self._clients: OrderedDict[str, MossClient] = OrderedDict()
+        self._stats: dict[str, IndexStats] = {}
+        self._pinned: set[str] = set()
+        self._locks: dict[str, asyncio.Lock] = {}
+        self._events: deque[IndexEvent] = deque(maxlen=event_history)
+        self._refresh_task: asyncio.Task | None = None
+
+    @property
+    def stats(self) -> dict[str, IndexStats]:
+        """Return a snapshot of the per-index counters for resident indexes."""
+        return {name: IndexStats(**vars(stats)) for name, stats in self._stats.items()}
+
+    @property
+    def events(self) -> list[IndexEvent]:
+        """Return recent load, refresh and eviction events, oldest first."""
+        return list(self._events)
+
+    @property
+    def resident_bytes(self) -> int:
+        """Return the approximate memory of all resident indexes."""
+        return sum(stats.memory_bytes for stats in self._stats.values())
+
+    def is_loaded(self, index_name: str) -> bool:
+        """Return whether ``index_name`` is resident."""
+        return index_name in self._clients
+
+    def pin(self, index_name: str):
+        """Exempt ``index_name`` from eviction."""
+        self._pinned.add(index_name)
+        if index_name in self._stats:
+            self._stats[index_name].pinned = True
+
+    def unpin(self, index_name: str):
+        """Make ``index_name`` evictable again."""
+        self._pinned.discard(index_name)
+        if index_name in self._stats:
+            self._stats[index_name].pinned = False
+
+    async def query(
+        self, index_name: str, query: str, top_k: int = 5, alpha: float | None = None
+    ) -> SearchResult:
+        """Search the served version of ``index_name``, loading it on first use."""
+        client = await self._serving_client(index_name)
+        self._touch(index_name)
+        if self._executor:
+            return await self._executor.run(client, index_name, query, top_k, alpha)
+        return await client.query(index_name, query, top_k, alpha)
+
+    async def query_batch(
+        self,
+        index_name: str,
+        queries: list[str],
+        *,
+        top_k: int = 5,
+        alpha: float | None = None,
+    ) -> list[SearchResult | BaseException]:
+        """Search ``index_name`` for several queries, embedding them in one call.
+
+        Each entry is the result of the query at the same position, or the
+        exception its search raised, so one failed search does not fail the
+        others. Clients that cannot embed on their own get one ``query`` per text.
+        """
+        client = await self._serving_client(index_name)
+        self._touch(index_name, len(queries))
+        call = partial(_query_batch, client, index_name, queries, top_k, alpha)
+        if self._executor:
+            return await self._executor.submit(call)
+        return await call()
+
+    async def embed_queries(self, index_name: str, texts: list[str]) -> list[list[float]]:
+        """Embed ``texts`` with the model of ``index_name``, loading it on first use.
+
+        Raises:
+            NotImplementedError: If the client cannot embed without searching.
+        """
+        client = await self._serving_client(index_name)
+        if self._executor:
+            return await self._executor.submit(lambda: _embed(client, index_name, texts))
+        return await _embed(client, index_name, texts)
+
+    async def query_with_embedding(
+        self,
+        index_name: str,
+        query: str,
+        embedding: list[float],
+        top_k: int = 5,
+        alpha: float | None = None,
+    ) -> SearchResult:
+        """Search ``index_name`` with a precomputed embedding of ``query``.
+
+        ``query`` is still used for keyword scoring. Clients that cannot
+        search by embedding run a plain ``query`` instead.
+        """
+        client = await self._serving_client(index_name)
+        self._touch(index_name)
+        call = partial(_query_with_embedding, client, index_name, query, embedding, top_k, alpha)
+        if self._executor:
+            return await self._executor.submit(call)
+        return await call()
+
+    async def load(self, index_name: str):
+        """Load ``index_name`` if it is not already resident."""
+        if index_name in self._clients:
+            return
+        if self._refresh_interval:
+            # Lazily loaded indexes need refreshing as much as preloaded ones.
+            self.start_refresh(self._refresh_interval)
+        async with self._lock(index_name):
+            if index_name in self._clients:
+                return
+            # Versions are only needed to find snapshots and to skip unchanged refreshes.
+            needs_version = self._snapshots is not None or self._refresh_task is not None
+            version = await self._remote_version(index_name) if needs_version else None
+            await self._swap_in(index_name, version)
+        self._evict_over_budget(keep=index_name)
+
+    async def refresh(self, index_name: str, *, force: bool = False) -> bool:
+        """Swap in the latest version of ``index_name`` if it changed.
+
+        Returns:
+            Whether a new version was swapped in.
+        """
+        async with self._lock(index_name):
+            stats = self._stats.get(index_name)
+            try:
+                version = await self._remote_version(index_name)
+                if stats and not force and version == stats.version:
+                    stats.checked_at = time.time()
+                    return False
+                await self._swap_in(index_name, version)
+            except Exception:
+                if stats:
+                    stats.failures += 1
+                raise
+        self._evict_over_budget(keep=index_name)
+        return True
+
+    def evict(self, index_name: str) -> bool:
+        """Stop serving ``index_name`` and release its memory, even if pinned.
+
+        Queries already running against it finish normally.
+        """
+        client = self._clients.pop(index_name, None)
+        if client is None:
+            return False
+        stats = self._stats.pop(index_name)
+        self._record(IndexEvent("evict", index_name, stats.memory_bytes, 0.0, time.time()))
+        logger.debug(f"Evicted index {index_name} (~{stats.memory_bytes / 1e6:.1f} MB)")
+        if self._on_swap:
+            self._on_swap(index_name)
+        return True
+
+    def start_refresh(self, interval: float):
+        """Refresh every resident index every ``interval`` seconds in the background."""
+        if self._refresh_task is None or self._refresh_task.done():
+            self._refresh_task = asyncio.get_running_loop().create_task(
+                self._refresh_loop(interval)
+            )
+
+    async def stop_refresh(self):
+        """Stop the background refresh."""
+        if self._refresh_task:
+            self._refresh_task.cancel()
+            try:
+                await self._refresh_task
+            except asyncio.CancelledError:
+                pass
+            self._refresh_task = None
+
+    async def _refresh_loop(self, interval: float):
+        while True:
+            await asyncio.sleep(interval)
+            for index_name in list(self._clients):
+                if index_name not in self._clients:
+                    continue
+                try:
+                    await self.refresh(index_name)
+                except Exception as exc:
+                    logger.warning(f"Failed to refresh index {index_name}: {exc}")
+
+    def _lock(self, index_name: str) -> asyncio.Lock:
+        return self._locks.setdefault(index_name, asyncio.Lock())
+
+    async def _serving_client(self, index_name: str) -> MossClient:
+        client = self._clients.get(index_name)
+        if client is None:
+            await self.load(index_name)
+            client = self._clients[index_name]
+        return client
+
+    def _touch(self, index_name: str, queries: int = 1):
+        self._clients.move_to_end(index_name)
+        stats = self._stats[index_name]
+        stats.last_used = time.time()
+        stats.queries += queries
+
+    async def _remote_version(self, index_name: str) -> str:
+        if self._control is None:
+            self._control = self._client_factory()
+        return (await self._control.get_index(index_name)).version
+
+    async def _swap_in(self, index_name: str, version: str | None):
+        """Load ``index_name`` into a new client and route queries to it."""
+        start = time.perf_counter()
+        client = self._client_factory()
+        if self._snapshots:
+            await self._snapshots.load_index(client, index_name, version=version)
+        else:
+            await client.load_index(index_name)
+
+        replaced = index_name in self._clients
+        # One assignment: queries see either the old client or the fully loaded new one.
+        self._clients[index_name] = client
+        self._clients.move_to_end(index_name)
+
+        now = time.time()
+        stats = self._stats.setdefault(index_name, IndexStats(index_name))
+        stats.version = version
+        stats.loaded_at = stats.checked_at = stats.last_used = now
+        stats.memory_bytes = self._memory_estimator(client, index_name)
+        stats.pinned = index_name in self._pinned
+        stats.last_refresh_duration = time.perf_counter() - start
+        if replaced:
+            stats.refreshes += 1
+        kind: IndexEventKind = "refresh" if replaced else "load"
+        self._record(
+            IndexEvent(kind, index_name, stats.memory_bytes, stats.last_refresh_duration, now)
+        )
+        logger.debug(
+            f"Index {index_name} {kind}ed (version {version}, "
+            f"~{stats.memory_bytes / 1e6:.1f} MB) in {stats.last_refresh_duration * 1000:.0f} ms"
+        )
+        if self._on_swap:
+            self._on_swap(index_name)
+
+    def _evict_over_budget(self, keep: str):
+        """Evict least-recently-used, unpinned indexes until under ``max_memory``."""
+        if self._max_memory is None:
+            return
+        for index_name in list(self._clients):
+            if self.resident_bytes <= self._max_memory:
+                return
+            if index_name != keep and index_name not in self._pinned:
+                self.evict(index_name)
+        if self.resident_bytes > self._max_memory:
+            logger.warning(
+                f"Resident indexes use ~{self.resident_bytes / 1e6:.1f} MB, above the "
+                f"{self._max_memory / 1e6:.1f} MB cap, but the rest are pinned or in use"
+            )
+
+    def _record(self, event: IndexEvent):
+        self._events.append(event)
+        if self._on_event:
+            self._on_event(event)
@@ -8,33 +8,145 @@
 
 from __future__ import annotations
 
+import asyncio
+import sys
+import time
 from collections.abc import Sequence
-from typing import Any
+from dataclasses import dataclass
+from difflib import SequenceMatcher
+from typing import TYPE_CHECKING, Any
 
-from inferedge_moss import MossClient, SearchResult
 from loguru import logger
-from pipecat.frames.frames import ErrorFrame, Frame, LLMContextFrame, LLMMessagesFrame, MetricsFrame
+from pipecat.frames.frames import (
+    BotStartedSpeakingFrame,
+    CancelFrame,
+    EndFrame,
+    Frame,
+    InterimTranscriptionFrame,
+    InterruptionFrame,
+    LLMContextFrame,
+    LLMMessagesFrame,
+    MetricsFrame,
+    TranscriptionFrame,
+    TTSSpeakFrame,
+    UserStartedSpeakingFrame,
+)
 from pipecat.metrics.metrics import ProcessingMetricsData
 from pipecat.processors.aggregators.llm_context import LLMContext
-from pipecat.processors.aggregators.openai_llm_context import OpenAILLMContextFrame
 from pipecat.processors.frame_processor import FrameDirection, FrameProcessor
 
+from .moss_circuit_breaker import MossCircuitBreaker
+from .moss_document_packer import DocumentPacker, estimate_tokens
+from .moss_metrics import (
+    MossContextWindowMetricsData,
+    MossGateMetricsData,
+    MossRetrievalMetricsData,
+    MossShortCircuitMetricsData,
+    MossSpeculationMetricsData,
+)
+from .moss_query_batcher import QueryClient
+from .moss_query_builder import ConversationQuery, ConversationQueryBuilder
+from .moss_query_cache import MossQueryCache, normalize_query
+from .moss_query_embedding import QueryEmbeddingCache, QueryEmbeddingStats, combine_embeddings
+from .moss_retrieval_gate import RetrievalGate
+from .moss_retrieval_trace import RetrievalSink, RetrievalTrace
+
+if TYPE_CHECKING:
+    from inferedge_moss import SearchResult
+
 __all__ = ["MossIndexProcessor"]
 
+# Not imported here: the deprecated OpenAI context is only loaded by pipelines that use it.
+_OPENAI_CONTEXT_MODULE = "pipecat.processors.aggregators.openai_llm_context"
+
+
+def _is_context_frame(frame: Frame) -> bool:
+    """Return whether ``frame`` carries an LLM context, universal or OpenAI-specific."""
+    if isinstance(frame, LLMContextFrame):
+        return True
+    module = sys.modules.get(_OPENAI_CONTEXT_MODULE)
+    return module is not None and isinstance(frame, module.OpenAILLMContextFrame)
+
+
+@dataclass
+class _ContextBlock:
+    """A retrieval message this processor injected into the LLM context."""
+
+    message: dict[str, Any]
+    doc_ids: set[str]
+    tokens: int
+
 
 class MossIndexProcessor(FrameProcessor):
     """Pipeline processor that handles retrieval for a specific index."""
 
     def __init__(
         self,
-        client: MossClient,
+        client: QueryClient,
         index_name: str,
         top_k: int = 5,
         alpha: float = 0.8,
         system_prompt: str = "Here is additional context retrieved from database:\n\n",
+        speculative: bool = False,
+        speculative_min_similarity: float = 0.8,
+        cache: MossQueryCache | None = None,
+        query_timeout: float | None = None,
+        circuit_breaker: MossCircuitBreaker | None = None,
+        max_context_blocks: int | None = None,
+        packer: DocumentPacker | None = None,
+        gate: RetrievalGate | None = None,
+        faq_answer_threshold: float | None = None,
+        faq_answer_key: str = "answer",
+        sinks: Sequence[RetrievalSink] = (),
+        query_builder: ConversationQueryBuilder | None = None,
+        embedding_cache_size: int = 64,
         **kwargs,
     ):
-        """Configure processor defaults for the specified index."""
+        """Configure processor defaults for the specified index.
+
+        When ``speculative`` is enabled the processor starts a query as soon as
+        interim or final transcriptions arrive and reuses it for the turn if the
+        final user text is at least ``speculative_min_similarity`` similar to the
+        speculated text. No speculative query starts while the
+        ``circuit_breaker`` is not closed or the ``gate`` would skip the text.
+        Placed after the user aggregator, the processor only sees interim
+        transcriptions; the text of earlier segments is taken from their last
+        interim.
+
+        A shared ``cache`` lets identical queries from other processors reuse
+        results instead of querying Moss again.
+
+        If retrieval takes longer than ``query_timeout`` seconds, fails, or the
+        ``circuit_breaker`` is open, the context is forwarded without retrieved
+        passages.
+
+        By default every retrieval appends a new system message to the context.
+        Setting ``max_context_blocks`` keeps only that many of this processor's
+        retrieval messages in the context, removing older ones, and skips
+        passages whose document IDs are already present in a kept message.
+
+        A ``packer`` drops low-scoring documents and trims the rest to fit a
+        token budget before they are formatted into the context.
+
+        A ``gate`` decides, before any query runs, whether a user turn is worth
+        retrieving for; skipped turns go to the LLM unchanged.
+
+        With ``faq_answer_threshold`` set, a turn whose top result scores at
+        least that much and carries a canned answer in its ``faq_answer_key``
+        metadata field skips the LLM: the answer is pushed to TTS as a
+        ``TTSSpeakFrame`` and appended to the context as the assistant turn.
+
+        Every turn produces a ``RetrievalTrace`` with per-stage timings, result
+        scores and the injected size. It is passed to each of ``sinks`` and,
+        with metrics enabled, pushed as ``MossRetrievalMetricsData``.
+
+        A ``query_builder`` folds recent turns, or a rolling summary of older
+        ones, into each query instead of sending only the latest user message.
+        The gate and speculation still judge the latest message alone. Each
+        part of the query is embedded once and kept in a per-session cache of
+        ``embedding_cache_size`` entries (``0`` disables it), so a turn only
+        embeds what is new and searches with the combined embedding.
+        """
         super().__init__(name=kwargs.get("name", f"MossRetrieval-{index_name}"))
         self._client = client
         self._index_name = index_name
@@ -42,21 +154,120 @@ class MossIndexProcessor(FrameProcessor):
         self._alpha = alpha
         self._system_prompt = system_prompt
         self._last_query = None
+        self._cache = cache
+        self._query_timeout = query_timeout
+        self._circuit_breaker = circuit_breaker
+        if max_context_blocks is not None and max_context_blocks < 1:
+            raise ValueError("max_context_blocks must be at least 1")
+        self._max_context_blocks = max_context_blocks
+        self._packer = packer
+        self._count_tokens = packer.tokenizer if packer else estimate_tokens
+        self._gate = gate
+        self._gate_passed = 0
+        self._gate_skipped = 0
+        self._context_blocks: list[_ContextBlock] = []
+        self._expired_tokens = 0
+        self._retrieval_task: asyncio.Task | None = None
+        self._sinks = list(sinks)
+        self._query_builder = query_builder
+        # Clients that cannot embed without searching just get the query text.
+        self._embeddings = (
+            QueryEmbeddingCache(embedding_cache_size)
+            if query_builder is not None
+            and embedding_cache_size > 0
+            and hasattr(client, "embed_queries")
+            else None
+        )
+        self._history: Sequence[dict[str, Any]] = ()
+
+        self._faq_answer_threshold = faq_answer_threshold
+        self._faq_answer_key = faq_answer_key
+        self._faq_turns = 0
+        self._faq_short_circuits = 0
+        # Context-push-to-bot-speech latency, as [total seconds, count], keyed by
+        # whether the turn was short-circuited.
+        self._response_latency = {False: [0.0, 0], True: [0.0, 0]}
+        self._pending_response: tuple[bool, float] | None = None
+
+        self._speculative = speculative
+        self._speculative_min_similarity = speculative_min_similarity
+        self._speculative_task: asyncio.Task | None = None
+        self._speculative_query: str | None = None
+        self._transcript_segments: list[str] = []
+        self._last_interim: str | None = None
+        self._speculative_turns = 0
+        self._speculative_started = 0
+        self._speculative_hits = 0
+        self._speculative_wasted = 0
 
     def can_generate_metrics(self) -> bool:
         """Signal that this processor emits metrics frames."""
         return True
 
-    async def retrieve_documents(self, query: str) -> SearchResult:
-        """Retrieve documents for a given query."""
-        # Perform the query against the Moss index
-        result = await self._client.query(
-            self._index_name,
+    @property
+    def embedding_stats(self) -> QueryEmbeddingStats | None:
+        """Return the query-embedding cache counters, if the cache is enabled."""
+        return self._embeddings.stats if self._embeddings else None
+
+    async def retrieve_documents(self, query: str, top_k: int | None = None) -> SearchResult:
+        """Retrieve documents for a given query, optionally overriding ``top_k``."""
+        top_k = self._top_k if top_k is None else top_k
+        return await self._search(self._index_name, query, top_k, self._alpha)
+
+    def pack_documents(self, query: str, documents: Sequence[Any]) -> Sequence[Any]:
+        """Fit documents into the packer's budget, if one is configured."""
+        if self._packer is None:
+            return documents
+        return self._packer.pack(query, documents)
+
+    def format_documents(self, documents: Sequence[Any]) -> str:
+        """Format retrieved documents from Moss into a single string for LLM context."""
+        lines = [self._system_prompt.rstrip(), ""]
+        for idx, doc in enumerate(documents, start=1):
+            meta = doc.metadata or {}
+            extras = []
+
+            if source := meta.get("source"):
+                extras.append(f"source={source}")
+            if (score := getattr(doc, "score", None)) is not None:
+                extras.append(f"score={score}")
+
+            suffix = f" ({', '.join(extras)})" if extras else ""
+            text = getattr(doc, "text", "") or ""
+
+            lines.append(f"{idx}. {text}{suffix}")
+        return "\n".join(lines).strip()
+
+    async def _search(self, index_name: str, query: str, top_k: int, alpha: float) -> SearchResult:
+        """Query an index through the shared cache, if there is one."""
+        if self._cache is None:
+            return await self._query_index(index_name, query, top_k, alpha)
+
+        return await self._cache.get_or_query(
+            index_name,
             query,
-            top_k=self._top_k,
-            alpha=self._alpha,
+            top_k,
+            alpha,
+            lambda: self._query_index(index_name, query, top_k, alpha),
         )
 
+    async def _query_index(
+        self, index_name: str, query: str, top_k: int, alpha: float
+    ) -> SearchResult:
+        """Query the Moss index and emit retrieval latency metrics."""
+        embedding = await self._embed_query(index_name, query)
+        if embedding is not None:
+            client: Any = self._client
+            result = await client.query_with_embedding(index_name, query, embedding, top_k, alpha)
+        else:
+            # Perform the query against the Moss index
+            result = await self._client.query(
+                index_name,
+                query,
+                top_k=top_k,
+                alpha=alpha,
+            )
+
         # Emit retrieval latency metrics
         if self.metrics_enabled:
             time_taken = getattr(result, "time_taken_ms", None)
@@ -76,14 +287,52 @@ class MossIndexProcessor(FrameProcessor):
                 )
         return result
 
+    async def _embed_query(self, index_name: str, query: str) -> list[float] | None:
+        """Combine cached segment embeddings into one embedding for ``query``.
+
+        Returns ``None`` to let the client embed the query itself: for queries
+        not built from the conversation, or when the client cannot embed them.
+        """
+        if self._embeddings is None or not isinstance(query, ConversationQuery):
+            return None
+        client: Any = self._client
+        try:
+            embeddings = await self._embeddings.get_or_embed(
+                index_name,
+                [segment.text for segment in query.segments],
+                lambda texts: client.embed_queries(index_name, texts),
+            )
+        except NotImplementedError as exc:
+            logger.info(f"{self}: Query embedding cache disabled: {exc}")
+            self._embeddings = None
+            return None
+        return combine_embeddings(embeddings, [segment.weight for segment in query.segments])
+
+    async def cleanup(self):
+        """Cancel any outstanding retrieval and speculative queries."""
+        await super().cleanup()
+        await self._cancel_retrieval()
+        await self._cancel_speculation()
+
     async def process_frame(self, frame: Frame, direction: FrameDirection):
         """Process frames to extract queries and augment LLM context."""
         await super().process_frame(frame, direction)
 
+        if self._speculative and isinstance(frame, (InterimTranscriptionFrame, TranscriptionFrame)):
+            await self._speculate(frame)
+
+        if isinstance(frame, (InterruptionFrame, UserStartedSpeakingFrame, CancelFrame)):
+            await self._cancel_retrieval()
+            self._pending_response = None
+        elif isinstance(frame, BotStartedSpeakingFrame):
+            self._record_response_latency()
+        elif isinstance(frame, EndFrame):
+            await self._wait_for_retrieval()
+
         context = None
         messages = None
 
-        if isinstance(frame, (LLMContextFrame, OpenAILLMContextFrame)):
+        if _is_context_frame(frame):
             context = frame.context
         elif isinstance(frame, LLMMessagesFrame):
             messages = frame.messages
@@ -93,45 +342,552 @@ class MossIndexProcessor(FrameProcessor):
             await self.push_frame(frame, direction)
             return
 
+        trace = RetrievalTrace(self._index_name, self.name)
+        # A newer context supersedes any retrieval still running for an older one.
+        await self._cancel_retrieval()
+        self._retrieval_task = self.create_task(
+            self._retrieve_and_push(frame, context, messages, trace), "retrieve"
+        )
+
+    async def _retrieve_and_push(
+        self,
+        frame: Frame,
+        context: LLMContext,
+        messages: list[dict[str, Any]] | None,
+        trace: RetrievalTrace,
+    ):
+        """Augment the context with retrieved documents and push it downstream."""
+        answer = None
+        # Whatever this turn's outcome, its transcript must not seed the next turn.
+        speculation = self._start_speculative_turn()
         try:
-            context_messages = context.get_messages()
-            latest_user_message = self._get_latest_user_text(context_messages)
+            try:
+                context_messages = context.get_messages()
+                latest_user_message = self._get_latest_user_text(context_messages)
+                query = self._build_query(context_messages, latest_user_message)
 
-            if latest_user_message:
-                if self._last_query == latest_user_message:
+                if not latest_user_message:
+                    trace.outcome = "skipped"
+                elif self._last_query == query:
+                    trace.outcome = "duplicate"
                     logger.debug(
                         f"{self}: Skipping retrieval; duplicate query -> {latest_user_message}"
                     )
+                elif await self._should_retrieve(latest_user_message):
+                    answer = await self._augment_context(context, query, trace)
                 else:
-                    logger.debug(
-                        f"{self}: Retrieving documents for query -> {latest_user_message}"
-                    )
-                    search_result = await self.retrieve_documents(latest_user_message)
-                    logger.debug(f"{self}: Retrieved {len(search_result.docs)} documents in {search_result.time_taken_ms} ms")
-
-                    documents = search_result.docs
-                    content: str | None = None
-                    if documents:
-                        content = self._format_documents(documents)
-                        context.add_message({"role": "system", "content": content})
-                        logger.debug(f"{self}: Added context to the LLM ->\n{content}")
-                    else:
-                        logger.debug(
-                            f"{self}: No documents retrieved for query -> {latest_user_message}"
-                        )
-
-                    self._last_query = latest_user_message
+                    trace.outcome = "skipped"
+            except Exception as exc:  # pragma: no cover - defensive logging
+                trace.outcome = "error"
+                logger.exception(f"{self}: error while running retrieval: {exc}")
+                await self.push_error(f"{self} retrieval error: {exc}", exception=exc)
 
-            if messages is not None:
+            if answer is not None:
+                # Answer directly; the context stays here so the LLM does not run.
+                context.add_message({"role": "assistant", "content": answer})
+                await self.push_frame(TTSSpeakFrame(answer))
+            # Otherwise the context goes forward, with or without retrieved passages.
+            elif messages is not None:
                 await self.push_frame(LLMMessagesFrame(context.get_messages()))
-            elif isinstance(frame, (LLMContextFrame, OpenAILLMContextFrame)):
+            elif _is_context_frame(frame):
                 await self.push_frame(type(frame)(context=context))  # type: ignore[arg-type]
             else:
                 await self.push_frame(frame)
+            if trace.format is not None:
+                trace.mark("inject")
+            if self._faq_answer_threshold is not None:
+                self._pending_response = (answer is not None, time.perf_counter())
+            if speculation is not None and self._speculative_task is speculation:
+                # The turn ended without using its speculative query.
+                await self._cancel_speculation()
+        except asyncio.CancelledError:
+            trace.outcome = "cancelled"
+            self._record_trace(trace)
+            raise
+        finally:
+            if self._retrieval_task is asyncio.current_task():
+                self._retrieval_task = None
+
+        await self._emit_trace(trace)
+
+    def _build_query(
+        self, messages: Sequence[dict[str, Any]], latest_user_message: str | None
+    ) -> str | None:
+        """Return the query for this turn, with conversation context if configured."""
+        if self._query_builder is None or not latest_user_message:
+            return latest_user_message
+        self._history = messages
+        return self._query_builder.build(messages) or latest_user_message
+
+    async def _should_retrieve(self, query: str) -> bool:
+        """Ask the retrieval gate whether this turn is worth a Moss query."""
+        if self._gate is None:
+            return True
+
+        reason = await self._gate.skip_reason(query)
+        if reason is None:
+            self._gate_passed += 1
+        else:
+            self._gate_skipped += 1
+            logger.debug(f"{self}: Skipping retrieval ({reason}) for query -> {query}")
+
+        if self.metrics_enabled:
+            await self.push_frame(
+                MetricsFrame(
+                    data=[
+                        MossGateMetricsData(
+                            processor=self.name,
+                            passed=self._gate_passed,
+                            skipped=self._gate_skipped,
+                            reason=reason,
+                        )
+                    ]
+                )
+            )
+        return reason is None
+
+    async def _augment_context(
+        self, context: LLMContext, query: str, trace: RetrievalTrace
+    ) -> str | None:
+        """Retrieve documents for ``query`` and add them to ``context``.
+
+        Returns:
+            A canned answer to speak instead of running the LLM, if the top
+            result qualifies for a short-circuit.
+        """
+        logger.debug(f"{self}: Retrieving documents for query -> {query}")
+        search_result = await self._retrieve_with_fallback(query, trace)
+        if search_result is None:
+            return None
+        if self._gate is not None:
+            self._gate.mark_retrieved(getattr(query, "latest", query))
+        logger.debug(
+            f"{self}: Retrieved {len(search_result.docs)} documents "
+            f"in {(trace.query or 0.0) * 1000:.0f} ms"
+        )
+        self._trace_search_result(trace, search_result)
+
+        if self._faq_answer_threshold is not None:
+            answer = self._canned_answer(search_result.docs)
+            await self._push_short_circuit_metrics(answer is not None)
+            if answer is not None:
+                logger.debug(f"{self}: Answering from canned answer for query -> {query}")
+                trace.outcome = "short_circuit"
+                trace.mark("format")
+                self._last_query = query
+                return answer
+
+        documents = search_result.docs
+        deduped_tokens = 0
+        if self._max_context_blocks is not None:
+            documents, deduped_tokens = self._dedupe_documents(context, documents)
+        documents = self.pack_documents(query, documents)
+
+        content: str | None = None
+        if documents:
+            content = self.format_documents(documents)
+            trace.mark("format")
+            trace.outcome = "injected"
+            trace.injected_tokens = self._count_tokens(content)
+            message = {"role": "system", "content": content}
+            context.add_message(message)
+            if self._max_context_blocks is not None:
+                doc_ids = {doc_id for doc in documents if (doc_id := getattr(doc, "id", None))}
+                self._context_blocks.append(_ContextBlock(message, doc_ids, trace.injected_tokens))
+                self._expire_context_blocks(context, documents)
+            logger.debug(f"{self}: Added context to the LLM ->\n{content}")
+        else:
+            trace.mark("format")
+            logger.debug(f"{self}: No new documents retrieved for query -> {query}")
+
+        if self._max_context_blocks is not None:
+            await self._push_context_window_metrics(deduped_tokens)
+
+        self._last_query = query
+        return None
+
+    def _trace_search_result(self, trace: RetrievalTrace, search_result: SearchResult):
+        """Record the result count, scores and Moss-reported search time of a turn."""
+        trace.results = len(search_result.docs)
+        trace.scores = [
+            score
+            for doc in search_result.docs
+            if (score := getattr(doc, "score", None)) is not None
+        ]
+        time_taken = getattr(search_result, "time_taken_ms", None)
+        if time_taken is not None:
+            trace.server_time = time_taken / 1000.0
+
+    def _canned_answer(self, documents: Sequence[Any]) -> str | None:
+        """Return the top document's canned answer if it scores above the threshold."""
+        if not documents:
+            return None
+        top = documents[0]
+        score = getattr(top, "score", None)
+        if score is None or score < self._faq_answer_threshold:
+            return None
+        answer = (getattr(top, "metadata", None) or {}).get(self._faq_answer_key)
+        if not isinstance(answer, str) or not answer.strip():
+            return None
+        return answer.strip()
+
+    def _record_response_latency(self):
+        """Attribute the time until the bot started speaking to the last turn."""
+        if self._pending_response is None:
+            return
+        short_circuited, pushed_at = self._pending_response
+        self._pending_response = None
+        totals = self._response_latency[short_circuited]
+        totals[0] += time.perf_counter() - pushed_at
+        totals[1] += 1
+
+    async def _push_short_circuit_metrics(self, short_circuited: bool):
+        """Emit the short-circuit rate and the response latency it saves."""
+        self._faq_turns += 1
+        if short_circuited:
+            self._faq_short_circuits += 1
+        if not self.metrics_enabled:
+            return
 
-        except Exception as exc:  # pragma: no cover - defensive logging
-            logger.exception(f"{self}: error while running retrieval: {exc}")
-            await self.push_error(ErrorFrame(error=f"{self} retrieval error: {exc}"))
+        llm_total, llm_count = self._response_latency[False]
+        faq_total, faq_count = self._response_latency[True]
+        latency_saved = None
+        if llm_count and faq_count:
+            latency_saved = llm_total / llm_count - faq_total / faq_count
+        await self.push_frame(
+            MetricsFrame(
+                data=[
+                    MossShortCircuitMetricsData(
+                        processor=self.name,
+                        short_circuits=self._faq_short_circuits,
+                        turns=self._faq_turns,
+                        rate=self._faq_short_circuits / self._faq_turns,
+                        latency_saved=latency_saved,
+                    )
+                ]
+            )
+        )
+
+    def _dedupe_documents(
+        self, context: LLMContext, documents: Sequence[Any]
+    ) -> tuple[list[Any], int]:
+        """Drop documents that are already present in a retrieval block.
+
+        If every document is already present, nothing is injected and no
+        block expires. Otherwise a new block will push out the oldest one, so
+        documents only found in blocks about to expire are kept.
+
+        Returns the documents still worth injecting and the estimated tokens
+        saved by skipping duplicates.
+        """
+        present = {id(m) for m in context.get_messages()}
+        # Forget blocks removed by someone else, e.g. when the context was reset.
+        self._context_blocks = [b for b in self._context_blocks if id(b.message) in present]
+
+        known_ids = set().union(*(b.doc_ids for b in self._context_blocks))
+        if any(getattr(doc, "id", None) not in known_ids for doc in documents):
+            expiring = max(len(self._context_blocks) - self._max_context_blocks + 1, 0)
+            known_ids = set().union(*(b.doc_ids for b in self._context_blocks[expiring:]))
+
+        fresh = []
+        deduped_tokens = 0
+        for doc in documents:
+            if getattr(doc, "id", None) in known_ids:
+                deduped_tokens += self._count_tokens(getattr(doc, "text", "") or "")
+            else:
+                fresh.append(doc)
+        return fresh, deduped_tokens
+
+    def _expire_context_blocks(self, context: LLMContext, injected: Sequence[Any]):
+        """Remove the oldest retrieval blocks beyond ``max_context_blocks``.
+
+        Only tokens that leave the prompt count as saved: passages of an
+        expired block that were just injected again are subtracted.
+        """
+        expired = self._context_blocks[: -self._max_context_blocks]
+        if not expired:
+            return
+        self._context_blocks = self._context_blocks[len(expired) :]
+        expired_ids = {id(b.message) for b in expired}
+        context.set_messages([m for m in context.get_messages() if id(m) not in expired_ids])
+
+        expired_doc_ids = set().union(*(b.doc_ids for b in expired))
+        reinjected = sum(
+            self._count_tokens(getattr(doc, "text", "") or "")
+            for doc in injected
+            if getattr(doc, "id", None) in expired_doc_ids
+        )
+        self._expired_tokens += max(sum(b.tokens for b in expired) - reinjected, 0)
+        logger.debug(f"{self}: Removed {len(expired)} expired retrieval blocks")
+
+    async def _push_context_window_metrics(self, deduped_tokens: int):
+        """Emit the size of the managed retrieval window and the tokens it saved."""
+        if not self.metrics_enabled:
+            return
+
+        await self.push_frame(
+            MetricsFrame(
+                data=[
+                    MossContextWindowMetricsData(
+                        processor=self.name,
+                        blocks=len(self._context_blocks),
+                        injected_tokens=sum(b.tokens for b in self._context_blocks),
+                        saved_tokens=self._expired_tokens + deduped_tokens,
+                    )
+                ]
+            )
+        )
+
+    async def _retrieve_with_fallback(
+        self, query: str, trace: RetrievalTrace | None = None
+    ) -> SearchResult | None:
+        """Retrieve documents within the deadline, or return ``None`` to skip them.
+
+        If given, ``trace`` records the wait and query timings and why
+        retrieval was skipped.
+        """
+        if trace:
+            trace.mark("wait")
+        breaker = self._circuit_breaker
+        if breaker and not breaker.allow_request():
+            logger.debug(f"{self}: Circuit open; skipping retrieval for query -> {query}")
+            if trace:
+                trace.outcome = "circuit_open"
+            return None
+
+        retrieval = asyncio.ensure_future(self._retrieve_for_turn(query))
+        try:
+            result = await asyncio.wait_for(asyncio.shield(retrieval), self._query_timeout)
+        except asyncio.TimeoutError:
+            if trace:
+                trace.outcome = "timeout"
+            # Let the query finish in the background: with a shared cache its
+            # result is reused if the next turn asks the same thing.
+            retrieval.add_done_callback(self._discard_late_result)
+            if breaker:
+                breaker.record_failure()
+            logger.warning(
+                f"{self}: retrieval exceeded {self._query_timeout}s deadline; "
+                "continuing without retrieved passages"
+            )
+            return None
+        except asyncio.CancelledError:
+            retrieval.cancel()
+            raise
+        except Exception as exc:
+            if trace:
+                trace.outcome = "error"
+            if breaker:
+                breaker.record_failure()
+            logger.warning(
+                f"{self}: retrieval failed, continuing without retrieved passages: {exc}"
+            )
+            return None
+        else:
+            if breaker:
+                breaker.record_success()
+            return result
+        finally:
+            if trace:
+                trace.mark("query")
+            if breaker:
+                # A cancelled turn says nothing about the index; hand back its probe.
+                breaker.release_probe()
+
+    def _record_trace(self, trace: RetrievalTrace):
+        """Hand a finished trace to every sink; a failing sink never fails the turn."""
+        for sink in self._sinks:
+            try:
+                sink.record(trace)
+            except Exception as exc:
+                logger.warning(f"{self}: retrieval sink {type(sink).__name__} failed: {exc}")
+
+    async def _emit_trace(self, trace: RetrievalTrace):
+        """Record a trace in the sinks and emit it as retrieval metrics."""
+        self._record_trace(trace)
+        if not self.metrics_enabled:
+            return
+
+        scores = trace.scores
+        await self.push_frame(
+            MetricsFrame(
+                data=[
+                    MossRetrievalMetricsData(
+                        processor=self.name,
+                        outcome=trace.outcome,
+                        total=trace.total,
+                        wait=trace.wait,
+                        query=trace.query,
+                        format=trace.format,
+                        inject=trace.inject,
+                        server_time=trace.server_time,
+                        results=trace.results,
+                        top_score=max(scores) if scores else None,
+                        mean_score=sum(scores) / len(scores) if scores else None,
+                        injected_tokens=trace.injected_tokens,
+                    )
+                ]
+            )
+        )
+
+    def _discard_late_result(self, task: asyncio.Task):
+        """Consume the outcome of a retrieval that missed its deadline."""
+        if task.cancelled():
+            return
+        if exc := task.exception():
+            logger.debug(f"{self}: late retrieval failed: {exc}")
+        else:
+            logger.debug(f"{self}: late retrieval finished after the deadline")
+
+    async def _cancel_retrieval(self):
+        """Cancel the retrieval running for a superseded or interrupted turn."""
+        task = self._retrieval_task
+        self._retrieval_task = None
+        if task and not task.done():
+            logger.debug(f"{self}: Cancelling stale retrieval")
+            await self.cancel_task(task)
+
+    async def _wait_for_retrieval(self):
+        """Let a pending retrieval push its context before the pipeline ends."""
+        task = self._retrieval_task
+        if task and not task.done():
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+
+    async def _speculate(self, frame: InterimTranscriptionFrame | TranscriptionFrame):
+        """Start a speculative query for the transcription seen so far."""
+        if isinstance(frame, TranscriptionFrame):
+            self._transcript_segments.append(frame.text)
+            self._last_interim = None
+            text = " ".join(self._transcript_segments)
+        else:
+            # After the user aggregator, which consumes final transcriptions,
+            # only interim frames arrive. An interim that does not continue the
+            # previous one starts a new segment, so the previous one was final.
+            if self._last_interim and not self._continues(self._last_interim, frame.text):
+                self._transcript_segments.append(self._last_interim)
+            self._last_interim = frame.text
+            text = " ".join([*self._transcript_segments, frame.text])
+
+        text = text.strip()
+        if not text:
+            return
+
+        if self._speculative_task and self._speculative_query is not None:
+            similarity = self._similarity(self._speculative_query, text)
+            if similarity >= self._speculative_min_similarity:
+                return
+            await self._cancel_speculation()
+
+        if not await self._may_speculate(text):
+            return
+
+        logger.debug(f"{self}: Speculative retrieval for partial query -> {text}")
+        self._speculative_query = text
+        query = text
+        if self._query_builder is not None:
+            messages = [*self._history, {"role": "user", "content": text}]
+            query = self._query_builder.build(messages) or text
+        self._speculative_task = self.create_task(self.retrieve_documents(query), "speculate")
+        self._speculative_started += 1
+
+    def _start_speculative_turn(self) -> asyncio.Task | None:
+        """Forget the transcript of the turn that just ended; return its speculative task."""
+        if not self._speculative:
+            return None
+        self._transcript_segments.clear()
+        self._last_interim = None
+        return self._speculative_task
+
+    async def _may_speculate(self, text: str) -> bool:
+        """Return whether the turn itself would be allowed to query Moss for ``text``."""
+        breaker = self._circuit_breaker
+        # An open breaker skips retrieval, and a half-open one's single probe
+        # belongs to the turn.
+        if breaker is not None and breaker.state != "closed":
+            return False
+        return self._gate is None or await self._gate.skip_reason(text) is None
+
+    async def _cancel_speculation(self):
+        """Cancel the in-flight speculative query, counting it as wasted."""
+        task = self._speculative_task
+        self._speculative_task = None
+        self._speculative_query = None
+        if task is None:
+            return
+
+        self._speculative_wasted += 1
+        if not task.done():
+            await self.cancel_task(task)
+
+    async def _retrieve_for_turn(self, query: str) -> SearchResult:
+        """Retrieve documents for a turn, reusing a matching speculative query."""
+        if not self._speculative:
+            return await self.retrieve_documents(query)
+
+        self._speculative_turns += 1
+        task = self._speculative_task
+        speculative_query = self._speculative_query
+
+        result = None
+        if task is not None and speculative_query is not None:
+            # Compare what the user said; the conversation context is shared.
+            similarity = self._similarity(speculative_query, getattr(query, "latest", query))
+            if similarity >= self._speculative_min_similarity:
+                self._speculative_task = None
+                self._speculative_query = None
+                # Managed tasks log their own exceptions and resolve to None.
+                result = await task
+                if result is not None:
+                    self._speculative_hits += 1
+                    logger.debug(
+                        f"{self}: Speculative hit ({similarity:.2f}) -> {speculative_query}"
+                    )
+                else:
+                    self._speculative_wasted += 1
+            else:
+                await self._cancel_speculation()
+
+        await self._push_speculation_metrics()
+
+        if result is None:
+            result = await self.retrieve_documents(query)
+        return result
+
+    async def _push_speculation_metrics(self):
+        """Emit speculative hit and waste rates."""
+        if not self.metrics_enabled:
+            return
+
+        turns = self._speculative_turns
+        started = self._speculative_started
+        await self.push_frame(
+            MetricsFrame(
+                data=[
+                    MossSpeculationMetricsData(
+                        processor=self.name,
+                        started=started,
+                        hits=self._speculative_hits,
+                        wasted=self._speculative_wasted,
+                        hit_rate=self._speculative_hits / turns if turns else 0.0,
+                        waste_rate=self._speculative_wasted / started if started else 0.0,
+                    )
+                ]
+            )
+        )
+
+    @staticmethod
+    def _continues(previous: str, text: str) -> bool:
+        """Return whether interim ``text`` revises or extends interim ``previous``."""
+        a, b = normalize_query(previous), normalize_query(text)
+        return SequenceMatcher(None, a, b[: len(a)]).ratio() >= 0.6
+
+    @staticmethod
+    def _similarity(a: str, b: str) -> float:
+        """Return a 0..1 similarity ratio between two normalized texts."""
+        return SequenceMatcher(None, normalize_query(a), normalize_query(b)).ratio()
 
     @staticmethod
     def _get_latest_user_text(messages: Sequence[dict[str, Any]]) -> str | None:
@@ -146,21 +902,3 @@ class MossIndexProcessor(FrameProcessor):
                         c["text"] for c in content if c.get("type") == "text"
                     ).strip()
         return None
-
-    def _format_documents(self, documents: Sequence[Any]) -> str:
-        """Format retrieved documents from Moss into a single string for LLM context."""
-        lines = [self._system_prompt.rstrip(), ""]
-        for idx, doc in enumerate(documents, start=1):
-            meta = doc.metadata or {}
-            extras = []
-
-            if source := meta.get("source"):
-                extras.append(f"source={source}")
-            if (score := getattr(doc, "score", None)) is not None:
-                extras.append(f"score={score}")
-
-            suffix = f" ({', '.join(extras)})" if extras else ""
-            text = getattr(doc, "text", "") or ""
-
-            lines.append(f"{idx}. {text}{suffix}")
-        return "\n".join(lines).strip()
@@ -0,0 +1,204 @@
+#
+# Copyright (c) 2024-2025, Daily
+#
+# SPDX-License-Identifier: BSD 2-Clause License
+#
+
+"""Persistent on-disk snapshots of Moss indexes for fast cold starts."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import mmap
+import os
+import re
+import struct
+import time
+import zlib
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+from loguru import logger
+
+from .moss_sdk_adapter import sdk_internals
+
+if TYPE_CHECKING:
+    from inferedge_moss import MossClient
+
+__all__ = ["MossIndexSnapshotCache", "SnapshotCacheStats"]
+
+_MAGIC = b"MOSSSNP1"
+# magic, index length, documents length, CRC32 of both payloads
+_HEADER = struct.Struct("<8sQQI")
+
+
+@dataclass
+class SnapshotCacheStats:
+    """Counters for the on-disk snapshot cache.
+
+    Parameters:
+        hits: Loads served from a local snapshot.
+        misses: Loads that had to download the index.
+        stale: Snapshots replaced because the remote index has a newer version.
+        corrupt: Snapshots discarded because they failed validation.
+        bytes_read: Snapshot bytes read from disk.
+        bytes_written: Snapshot bytes written to disk.
+        last_load_time: Seconds the most recent ``load_index`` took.
+        total_load_time: Seconds spent in ``load_index`` since startup.
+    """
+
+    hits: int = 0
+    misses: int = 0
+    stale: int = 0
+    corrupt: int = 0
+    bytes_read: int = 0
+    bytes_written: int = 0
+    last_load_time: float = 0.0
+    total_load_time: float = 0.0
+
+
+class MossIndexSnapshotCache:
+    """Keep the serialized form of loaded indexes on local disk.
+
+    Snapshots are keyed by index name and remote version and stored as one
+    file each: a fixed header, the index binary exactly as Moss serves it,
+    and the document JSON, protected by a CRC32. Worker processes on one host
+    can share the directory, but each one still deserializes the index into
+    its own memory. Reading, checksumming and decoding a snapshot, and writing
+    one, run in a worker thread so the event loop stays free while a large
+    index loads. Before a snapshot is used, its version is checked against
+    ``MossClient.get_index``; stale or corrupt snapshots are replaced by a
+    normal download. Snapshots need the raw index bytes, which only supported
+    SDK versions give access to (see ``moss_sdk_adapter``); with other
+    versions indexes are loaded through ``MossClient.load_index`` uncached.
+    """
+
+    def __init__(self, directory: str | os.PathLike[str]):
+        """Create the cache.
+
+        Args:
+            directory: Directory holding the snapshots; created if missing.
+        """
+        self._directory = Path(directory)
+        self._directory.mkdir(parents=True, exist_ok=True)
+        self._stats = SnapshotCacheStats()
+
+    @property
+    def stats(self) -> SnapshotCacheStats:
+        """Return a snapshot of the cache counters."""
+        return SnapshotCacheStats(**vars(self._stats))
+
+    async def load_index(self, client: MossClient, index_name: str, version: str | None = None):
+        """Load ``index_name`` into ``client``, from disk when the snapshot is fresh.
+
+        Args:
+            client: Client to load the index into.
+            index_name: Name of the index.
+            version: Current remote version, if the caller already fetched it.
+        """
+        start = time.perf_counter()
+        try:
+            await self._load_index(client, index_name, version)
+        finally:
+            elapsed = time.perf_counter() - start
+            self._stats.last_load_time = elapsed
+            self._stats.total_load_time += elapsed
+            logger.debug(f"Loaded index {index_name} in {elapsed * 1000:.0f} ms")
+
+    async def _load_index(self, client: MossClient, index_name: str, version: str | None):
+        internal = sdk_internals(client)
+        if internal is None:
+            # The SDK does not expose its raw index data; nothing to snapshot.
+            await client.load_index(index_name)
+            return
+        if internal.has_index(index_name):
+            return
+
+        if version is None:
+            version = (await client.get_index(index_name)).version
+        path = self._path(index_name, version)
+        payload = await self._read_snapshot(path) if path.exists() else None
+        if payload is not None:
+            try:
+                await internal.install_index(*payload)
+            except Exception as exc:
+                logger.warning(f"Discarding unreadable index snapshot {path}: {exc}")
+                self._stats.corrupt += 1
+                path.unlink(missing_ok=True)
+            else:
+                self._stats.hits += 1
+                return
+
+        self._stats.misses += 1
+        if self._evict_other_versions(keep=path):
+            self._stats.stale += 1
+        payload = await internal.download_index(index_name)
+        self._stats.bytes_written += await asyncio.to_thread(self._write, path, *payload)
+        await internal.install_index(*payload)
+
+    def _path(self, index_name: str, version: str) -> Path:
+        safe_name = re.sub(r"[^A-Za-z0-9._-]", "_", index_name)
+        safe_version = re.sub(r"[^A-Za-z0-9._-]", "_", str(version)) or "unversioned"
+        return self._directory / safe_name / f"{safe_version}.snap"
+
+    async def _read_snapshot(self, path: Path) -> tuple[bytes, list[dict[str, Any]]] | None:
+        """Return the snapshot payload, or ``None`` (and delete it) if it is invalid."""
+        try:
+            index_bytes, documents, size = await asyncio.to_thread(self._read, path)
+        except (OSError, ValueError, struct.error) as exc:
+            logger.warning(f"Discarding corrupt index snapshot {path}: {exc}")
+            self._stats.corrupt += 1
+            path.unlink(missing_ok=True)
+            return None
+        self._stats.bytes_read += size
+        return index_bytes, documents
+
+    @staticmethod
+    def _read(path: Path) -> tuple[bytes, list[dict[str, Any]], int]:
+        """Read and validate a snapshot; return its payload and size in bytes."""
+        # mmap lets the checksum run over the file without reading it into a buffer first.
+        with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            magic, index_len, docs_len, crc = _HEADER.unpack_from(mm)
+            end = _HEADER.size + index_len + docs_len
+            if magic != _MAGIC or end != len(mm):
+                raise ValueError("bad header")
+            view = memoryview(mm)
+            try:
+                if zlib.crc32(view[_HEADER.size : end]) != crc:
+                    raise ValueError("checksum mismatch")
+                index_bytes = bytes(view[_HEADER.size : _HEADER.size + index_len])
+                documents = json.loads(bytes(view[_HEADER.size + index_len : end]))
+            finally:
+                view.release()
+            return index_bytes, documents, end
+
+    @staticmethod
+    def _write(path: Path, index_bytes: bytes, documents: list[dict[str, Any]]) -> int:
+        """Write a snapshot atomically; return the bytes written, or ``0`` on failure."""
+        docs_bytes = json.dumps(documents, separators=(",", ":")).encode()
+        crc = zlib.crc32(docs_bytes, zlib.crc32(index_bytes))
+        header = _HEADER.pack(_MAGIC, len(index_bytes), len(docs_bytes), crc)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Write beside the target and rename, so readers never see a partial file.
+        tmp = path.with_suffix(f".{os.getpid()}.tmp")
+        try:
+            with open(tmp, "wb") as f:
+                f.write(header)
+                f.write(index_bytes)
+                f.write(docs_bytes)
+            os.replace(tmp, path)
+        except OSError as exc:
+            logger.warning(f"Could not write index snapshot {path}: {exc}")
+            tmp.unlink(missing_ok=True)
+            return 0
+        return len(header) + len(index_bytes) + len(docs_bytes)
+
+    def _evict_other_versions(self, keep: Path) -> bool:
+        removed = False
+        for old in keep.parent.glob("*.snap") if keep.parent.exists() else ():
+            if old != keep:
+                old.unlink(missing_ok=True)
+                removed = True
+        return removed
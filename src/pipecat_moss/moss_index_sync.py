@@ -0,0 +1,222 @@
+#
+# Copyright (c) 2024-2025, Daily
+#
+# SPDX-License-Identifier: BSD 2-Clause License
+#
+
+"""Incremental sync of a document set into a Moss index by content hash."""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import os
+import random
+import time
+from collections.abc import Awaitable, Callable, Iterable
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from inferedge_moss import AddDocumentsOptions, DocumentInfo, MossClient
+from loguru import logger
+
+from .moss_ingest import IngestRecord, chunk_text
+
+__all__ = ["MossIndexSync", "SyncResult", "content_hash"]
+
+
+@dataclass
+class SyncResult:
+    """What a sync changed (or would change, for a dry run).
+
+    Parameters:
+        added: IDs of documents that were not in the index.
+        updated: IDs of documents whose text or metadata changed.
+        deleted: IDs of documents no longer in the desired set.
+        unchanged: Number of documents left as they were.
+        elapsed: Seconds the sync took.
+    """
+
+    added: list[str] = field(default_factory=list)
+    updated: list[str] = field(default_factory=list)
+    deleted: list[str] = field(default_factory=list)
+    unchanged: int = 0
+    elapsed: float = 0.0
+
+    @property
+    def changed(self) -> int:
+        """Number of documents sent to Moss."""
+        return len(self.added) + len(self.updated) + len(self.deleted)
+
+
+def content_hash(text: str, metadata: dict[str, str] | None) -> str:
+    """Return a stable hash of a document's text and metadata."""
+    payload = json.dumps([text, metadata or {}], sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class MossIndexSync:
+    """Bring an index in line with a desired document set, sending only changes.
+
+    Each desired document is hashed and compared with the hash recorded for
+    its ID, either in a local JSON manifest or, without one, in the documents
+    fetched from the index with ``get_docs``. New and changed documents are
+    upserted and documents missing from the desired set are deleted, in
+    batches with bounded concurrency. The manifest is updated as batches
+    succeed, so a failed sync only resends what did not land.
+    """
+
+    def __init__(
+        self,
+        client: MossClient,
+        index_name: str,
+        *,
+        manifest_path: str | os.PathLike[str] | None = None,
+        batch_size: int = 256,
+        max_concurrency: int = 4,
+        max_retries: int = 5,
+        chunk_size: int | None = None,
+        chunk_overlap: int = 200,
+        delete_missing: bool = True,
+    ):
+        """Configure the sync.
+
+        Args:
+            client: Moss client used for reads and writes.
+            index_name: Index to sync.
+            manifest_path: JSON file mapping document IDs to content hashes.
+                Without one, the index's current documents are fetched instead.
+            batch_size: Documents per upsert or delete request.
+            max_concurrency: Maximum concurrent requests.
+            max_retries: Attempts per batch before the sync fails.
+            chunk_size: Split records into chunks like ``MossIngestor`` does.
+            chunk_overlap: Characters of overlap between chunks.
+            delete_missing: Delete indexed documents not in the desired set.
+        """
+        self._client = client
+        self._index_name = index_name
+        self._manifest_path = Path(manifest_path) if manifest_path else None
+        self._batch_size = batch_size
+        self._max_concurrency = max_concurrency
+        self._max_retries = max_retries
+        self._chunk_size = chunk_size
+        self._chunk_overlap = chunk_overlap
+        self._delete_missing = delete_missing
+
+    async def sync(self, records: Iterable[IngestRecord], *, dry_run: bool = False) -> SyncResult:
+        """Compare ``records`` with the index and apply the difference.
+
+        With ``dry_run`` set, nothing is sent and the result lists what would change.
+        """
+        start = time.perf_counter()
+        known = await self._known_hashes()
+        result = SyncResult()
+        upserts: list[tuple[DocumentInfo, str]] = []
+        seen: set[str] = set()
+
+        for doc_id, text, metadata in self._documents(records):
+            seen.add(doc_id)
+            digest = content_hash(text, metadata)
+            previous = known.get(doc_id)
+            if previous == digest:
+                result.unchanged += 1
+                continue
+            (result.updated if previous else result.added).append(doc_id)
+            upserts.append((DocumentInfo(id=doc_id, text=text, metadata=metadata or None), digest))
+        if self._delete_missing:
+            result.deleted = [doc_id for doc_id in known if doc_id not in seen]
+
+        logger.info(
+            f"Sync of {self._index_name}: {len(result.added)} added, {len(result.updated)} "
+            f"updated, {len(result.deleted)} deleted, {result.unchanged} unchanged"
+        )
+        if not dry_run:
+            try:
+                await self._apply(upserts, result.deleted, known)
+            finally:
+                self._write_manifest(known)
+        result.elapsed = time.perf_counter() - start
+        return result
+
+    def _documents(self, records: Iterable[IngestRecord]):
+        for record in records:
+            if self._chunk_size is None:
+                yield record.id, record.text, record.metadata
+                continue
+            chunks = chunk_text(
+                record.text, chunk_size=self._chunk_size, overlap=self._chunk_overlap
+            )
+            if len(chunks) == 1:
+                yield record.id, chunks[0], record.metadata
+                continue
+            for i, chunk in enumerate(chunks):
+                yield f"{record.id}#{i}", chunk, {**record.metadata, "parent_id": record.id}
+
+    async def _known_hashes(self) -> dict[str, str]:
+        if self._manifest_path:
+            if not self._manifest_path.exists():
+                return {}
+            data = json.loads(self._manifest_path.read_text())
+            if data.get("index_name") != self._index_name:
+                raise ValueError(
+                    f"Manifest {self._manifest_path} belongs to index {data.get('index_name')}"
+                )
+            return data["hashes"]
+
+        docs = await self._client.get_docs(self._index_name)
+        return {doc.id: content_hash(doc.text, doc.metadata) for doc in docs}
+
+    def _write_manifest(self, hashes: dict[str, str]):
+        if not self._manifest_path:
+            return
+        tmp = self._manifest_path.with_suffix(".tmp")
+        tmp.write_text(json.dumps({"index_name": self._index_name, "hashes": hashes}))
+        os.replace(tmp, self._manifest_path)
+
+    async def _apply(
+        self,
+        upserts: list[tuple[DocumentInfo, str]],
+        deletes: list[str],
+        known: dict[str, str],
+    ):
+        slots = asyncio.Semaphore(self._max_concurrency)
+
+        async def upsert(batch: list[tuple[DocumentInfo, str]]):
+            async with slots:
+                await self._with_retries(
+                    lambda: self._client.add_docs(
+                        self._index_name,
+                        [doc for doc, _ in batch],
+                        AddDocumentsOptions(upsert=True),
+                    )
+                )
+            known.update((doc.id, digest) for doc, digest in batch)
+
+        async def delete(batch: list[str]):
+            async with slots:
+                await self._with_retries(lambda: self._client.delete_docs(self._index_name, batch))
+            for doc_id in batch:
+                known.pop(doc_id, None)
+
+        size = self._batch_size
+        tasks = [upsert(upserts[i : i + size]) for i in range(0, len(upserts), size)]
+        tasks += [delete(deletes[i : i + size]) for i in range(0, len(deletes), size)]
+        results = await asyncio.gather(*tasks, return_exceptions=True)
+        for error in results:
+            if isinstance(error, BaseException):
+                raise error
+
+    async def _with_retries(self, call: Callable[[], Awaitable]):
+        for attempt in range(1, self._max_retries + 1):
+            try:
+                return await call()
+            except Exception as exc:
+                if attempt == self._max_retries:
+                    raise
+                delay = min(30.0, 0.5 * 2 ** (attempt - 1)) * random.uniform(0.5, 1.5)
+                logger.warning(
+                    f"Sync request to {self._index_name} failed "
+                    f"(attempt {attempt}/{self._max_retries}), retrying in {delay:.1f}s: {exc}"
+                )
+                await asyncio.sleep(delay)
@@ -0,0 +1,542 @@
+#
+# Copyright (c) 2024-2025, Daily
+#
+# SPDX-License-Identifier: BSD 2-Clause License
+#
+
+"""Streaming bulk ingestion of documents into a Moss index."""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import csv
+import itertools
+import json
+import os
+import random
+import re
+import sys
+import time
+from collections import deque
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import Executor, ProcessPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from inferedge_moss import AddDocumentsOptions, DocumentInfo, MossClient
+from loguru import logger
+
+__all__ = [
+    "IngestRecord",
+    "IngestStats",
+    "MossIngestor",
+    "chunk_text",
+    "read_csv",
+    "read_jsonl",
+    "read_text_files",
+]
+
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+
+
+@dataclass
+class IngestRecord:
+    """A source document before chunking.
+
+    Parameters:
+        id: Stable document ID; chunk IDs are derived from it.
+        text: Full document text.
+        metadata: String metadata copied to every chunk.
+    """
+
+    id: str
+    text: str
+    metadata: dict[str, str] = field(default_factory=dict)
+
+
+@dataclass
+class IngestStats:
+    """Progress counters for an ingestion run.
+
+    Parameters:
+        records: Source records read (including ones skipped by a checkpoint).
+        skipped: Source records skipped because a checkpoint covered them.
+        chunks: Chunks uploaded.
+        bytes: Text bytes uploaded.
+        batches: Batches uploaded.
+        retries: Upload attempts that were retried.
+        batch_size: Current adaptive batch size.
+        elapsed: Seconds since the run started.
+    """
+
+    records: int = 0
+    skipped: int = 0
+    chunks: int = 0
+    bytes: int = 0
+    batches: int = 0
+    retries: int = 0
+    batch_size: int = 0
+    elapsed: float = 0.0
+
+    @property
+    def docs_per_second(self) -> float:
+        """Chunks uploaded per second."""
+        return self.chunks / self.elapsed if self.elapsed else 0.0
+
+    @property
+    def bytes_per_second(self) -> float:
+        """Text bytes uploaded per second."""
+        return self.bytes / self.elapsed if self.elapsed else 0.0
+
+
+def read_jsonl(
+    path: str | os.PathLike[str],
+    *,
+    id_field: str = "id",
+    text_field: str = "text",
+    metadata_field: str | None = "metadata",
+) -> Iterator[IngestRecord]:
+    """Stream records from a JSON Lines file, one object per line."""
+    with open(path, encoding="utf-8") as f:
+        for line_no, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            row = json.loads(line)
+            metadata = row.get(metadata_field) if metadata_field else None
+            yield IngestRecord(
+                id=str(row.get(id_field) or f"{Path(path).stem}-{line_no}"),
+                text=str(row[text_field]),
+                metadata={k: str(v) for k, v in (metadata or {}).items()},
+            )
+
+
+def read_csv(
+    path: str | os.PathLike[str],
+    *,
+    id_field: str = "id",
+    text_field: str = "text",
+) -> Iterator[IngestRecord]:
+    """Stream records from a CSV file with a header row.
+
+    Columns other than ``id_field`` and ``text_field`` become metadata.
+    """
+    with open(path, encoding="utf-8", newline="") as f:
+        for row_no, row in enumerate(csv.DictReader(f), 1):
+            text = row.pop(text_field)
+            doc_id = row.pop(id_field, None) or f"{Path(path).stem}-{row_no}"
+            yield IngestRecord(
+                id=doc_id,
+                text=text,
+                metadata={k: v for k, v in row.items() if k and v is not None},
+            )
+
+
+def read_text_files(
+    directory: str | os.PathLike[str], *, pattern: str = "**/*.txt"
+) -> Iterator[IngestRecord]:
+    """Stream one record per text file under ``directory``, in path order."""
+    root = Path(directory)
+    for path in sorted(root.glob(pattern)):
+        if path.is_file():
+            relative = path.relative_to(root).as_posix()
+            yield IngestRecord(
+                id=relative,
+                text=path.read_text(encoding="utf-8", errors="replace"),
+                metadata={"path": relative},
+            )
+
+
+def chunk_text(text: str, *, chunk_size: int = 1000, overlap: int = 200) -> list[str]:
+    """Split ``text`` into chunks of about ``chunk_size`` characters.
+
+    Chunks end on sentence boundaries where possible, and each chunk repeats
+    up to ``overlap`` characters of trailing sentences from the previous one.
+    Sentences longer than ``chunk_size`` are split at whitespace.
+    """
+    text = text.strip()
+    if len(text) <= chunk_size:
+        return [text] if text else []
+
+    sentences: list[str] = []
+    for sentence in _SENTENCE_END.split(text):
+        while len(sentence) > chunk_size:
+            cut = sentence.rfind(" ", 0, chunk_size)
+            cut = cut if cut > 0 else chunk_size
+            sentences.append(sentence[:cut])
+            sentence = sentence[cut:].lstrip()
+        if sentence:
+            sentences.append(sentence)
+
+    chunks: list[str] = []
+    current: list[str] = []
+    length = 0
+    for sentence in sentences:
+        if current and length + len(sentence) + 1 > chunk_size:
+            chunks.append(" ".join(current))
+            # Carry trailing sentences that fit in the overlap into the next chunk.
+            carried: list[str] = []
+            carried_length = 0
+            for previous in reversed(current):
+                if carried_length + len(previous) + 1 > overlap:
+                    break
+                carried.insert(0, previous)
+                carried_length += len(previous) + 1
+            if carried_length + len(sentence) + 1 > chunk_size:
+                carried, carried_length = [], 0
+            current, length = carried, carried_length
+        current.append(sentence)
+        length += len(sentence) + 1
+    if current:
+        chunks.append(" ".join(current))
+    return chunks
+
+
+def _chunk_records(
+    records: list[IngestRecord], chunk_size: int, overlap: int
+) -> list[list[tuple[str, str, dict[str, str]]]]:
+    """Chunk records in a worker process; returns plain tuples that pickle cheaply."""
+    result = []
+    for record in records:
+        chunks = chunk_text(record.text, chunk_size=chunk_size, overlap=overlap)
+        if len(chunks) == 1:
+            result.append([(record.id, chunks[0], record.metadata)])
+            continue
+        result.append(
+            [
+                (f"{record.id}#{i}", chunk, {**record.metadata, "parent_id": record.id})
+                for i, chunk in enumerate(chunks)
+            ]
+        )
+    return result
+
+
+@dataclass
+class _Batch:
+    docs: list[DocumentInfo]
+    size_bytes: int
+    # Source records whose chunks are all in this batch or an earlier one.
+    records_done: int
+    uploaded: bool = False
+
+
+class MossIngestor:
+    """Upload a stream of documents to a Moss index with bounded memory.
+
+    Records are read lazily, chunked in a process pool a window at a time, and
+    uploaded with ``add_docs`` by at most ``max_concurrency`` concurrent
+    requests. The batch size adapts to how long uploads take, failed uploads
+    are retried with backoff, and a checkpoint records how many source records
+    are fully uploaded so an interrupted run can resume where it stopped.
+    Uploaded batches release their documents at once, and at most four times
+    ``max_concurrency`` batches can be outstanding behind the oldest
+    unfinished one, so a slow or retrying upload does not let memory grow.
+    """
+
+    def __init__(
+        self,
+        client: MossClient,
+        index_name: str,
+        *,
+        chunk_size: int = 1000,
+        chunk_overlap: int = 200,
+        batch_size: int = 128,
+        min_batch_size: int = 16,
+        max_batch_size: int = 1024,
+        target_batch_seconds: float = 2.0,
+        max_concurrency: int = 4,
+        max_retries: int = 5,
+        processes: int | None = None,
+        checkpoint_path: str | os.PathLike[str] | None = None,
+        create_model_id: str | None = None,
+        progress_interval: float = 5.0,
+        on_progress: Callable[[IngestStats], None] | None = None,
+    ):
+        """Configure the ingestion run.
+
+        Args:
+            client: Moss client used for uploads.
+            index_name: Index to upload into.
+            chunk_size: Target chunk length in characters.
+            chunk_overlap: Characters of trailing sentences repeated in the next chunk.
+            batch_size: Initial number of chunks per upload.
+            min_batch_size: Smallest batch size the adaptation may pick.
+            max_batch_size: Largest batch size the adaptation may pick.
+            target_batch_seconds: Upload duration the batch size is adapted towards.
+            max_concurrency: Maximum concurrent uploads.
+            max_retries: Attempts per batch before the run fails.
+            processes: Chunking worker processes; defaults to the CPU count, and
+                ``0`` chunks in the calling process.
+            checkpoint_path: File recording progress for resuming a run.
+            create_model_id: Create the index with this model from the first
+                batch instead of adding to an existing index.
+            progress_interval: Seconds between progress reports.
+            on_progress: Called with the current stats at each progress report.
+        """
+        self._client = client
+        self._index_name = index_name
+        self._chunk_size = chunk_size
+        self._chunk_overlap = chunk_overlap
+        self._batch_size = batch_size
+        self._min_batch_size = min_batch_size
+        self._max_batch_size = max_batch_size
+        self._target_batch_seconds = target_batch_seconds
+        self._max_concurrency = max_concurrency
+        self._max_retries = max_retries
+        self._processes = (os.cpu_count() or 1) if processes is None else processes
+        self._checkpoint_path = Path(checkpoint_path) if checkpoint_path else None
+        self._create_model_id = create_model_id
+        self._progress_interval = progress_interval
+        self._on_progress = on_progress
+        self._stats = IngestStats()
+
+    @property
+    def stats(self) -> IngestStats:
+        """Return a snapshot of the progress counters."""
+        return IngestStats(**vars(self._stats))
+
+    async def ingest(self, records: Iterable[IngestRecord]) -> IngestStats:
+        """Chunk and upload ``records``, resuming from the checkpoint if there is one."""
+        self._stats = IngestStats(batch_size=self._batch_size)
+        start = time.perf_counter()
+        checkpoint = self._read_checkpoint()
+        skip = checkpoint or 0
+        records = iter(records)
+        if skip:
+            logger.info(f"Resuming ingestion into {self._index_name} after {skip} records")
+            self._stats.skipped = sum(1 for _ in itertools.islice(records, skip))
+            self._stats.records = self._stats.skipped
+
+        pool = ProcessPoolExecutor(self._processes) if self._processes > 0 else None
+        slots = asyncio.Semaphore(self._max_concurrency)
+        uploads: set[asyncio.Task] = set()
+        failures: list[BaseException] = []
+        pending: deque[_Batch] = deque()
+        max_pending = self._max_concurrency * 4
+        progressed = asyncio.Event()
+        docs: list[DocumentInfo] = []
+        size_bytes = 0
+        # A checkpoint is only written once the first upload, which creates the
+        # index, has succeeded, so a resumed run must not create it again.
+        created = self._create_model_id is None or checkpoint is not None
+        last_report = time.perf_counter()
+
+        async def flush():
+            nonlocal docs, size_bytes, created
+            batch = _Batch(docs, size_bytes, self._stats.records)
+            docs, size_bytes = [], 0
+            # Do not run ahead of a slow head batch; the checkpoint waits for it anyway.
+            while len(pending) >= max_pending and not failures:
+                progressed.clear()
+                await progressed.wait()
+            if failures:
+                raise failures[0]
+            pending.append(batch)
+            if not created:
+                # Every other upload needs the index to exist first.
+                await self._upload(batch, pending, create=True)
+                created = True
+                return
+            await slots.acquire()
+            task = asyncio.create_task(self._upload(batch, pending))
+            uploads.add(task)
+            task.add_done_callback(on_upload_done)
+
+        def on_upload_done(task: asyncio.Task):
+            uploads.discard(task)
+            slots.release()
+            progressed.set()
+            if not task.cancelled() and task.exception():
+                failures.append(task.exception())
+
+        try:
+            window = max(1, self._processes) * 16
+            while True:
+                chunk = list(itertools.islice(records, window))
+                if not chunk:
+                    break
+                for record_chunks in await self._chunk(pool, chunk):
+                    for doc_id, text, metadata in record_chunks:
+                        docs.append(DocumentInfo(id=doc_id, text=text, metadata=metadata or None))
+                        size_bytes += len(text.encode())
+                        if len(docs) >= self._batch_size:
+                            await flush()
+                    self._stats.records += 1
+                    if failures:
+                        raise failures[0]
+
+                if time.perf_counter() - last_report >= self._progress_interval:
+                    last_report = time.perf_counter()
+                    self._stats.elapsed = last_report - start
+                    self._report()
+
+            if docs or not created:
+                await flush()
+            if uploads:
+                await asyncio.gather(*uploads, return_exceptions=True)
+            if failures:
+                raise failures[0]
+        finally:
+            for task in uploads:
+                task.cancel()
+            if pool:
+                pool.shutdown(cancel_futures=True)
+            self._stats.elapsed = time.perf_counter() - start
+
+        self._report()
+        return self.stats
+
+    async def _chunk(
+        self, pool: Executor | None, records: list[IngestRecord]
+    ) -> list[list[tuple[str, str, dict[str, str]]]]:
+        if pool is None:
+            return _chunk_records(records, self._chunk_size, self._chunk_overlap)
+        loop = asyncio.get_running_loop()
+        size = -(-len(records) // self._processes)
+        parts = await asyncio.gather(
+            *(
+                loop.run_in_executor(
+                    pool,
+                    _chunk_records,
+                    records[i : i + size],
+                    self._chunk_size,
+                    self._chunk_overlap,
+                )
+                for i in range(0, len(records), size)
+            )
+        )
+        return [record_chunks for part in parts for record_chunks in part]
+
+    async def _upload(self, batch: _Batch, pending: deque[_Batch], create: bool = False):
+        for attempt in range(1, self._max_retries + 1):
+            start = time.perf_counter()
+            try:
+                if create:
+                    await self._client.create_index(
+                        self._index_name, batch.docs, self._create_model_id
+                    )
+                elif batch.docs:
+                    await self._client.add_docs(
+                        self._index_name, batch.docs, AddDocumentsOptions(upsert=True)
+                    )
+                break
+            except Exception as exc:
+                if attempt == self._max_retries:
+                    raise
+                self._stats.retries += 1
+                self._resize(grow=False)
+                delay = min(30.0, 0.5 * 2 ** (attempt - 1)) * random.uniform(0.5, 1.5)
+                logger.warning(
+                    f"Upload of {len(batch.docs)} docs to {self._index_name} failed "
+                    f"(attempt {attempt}/{self._max_retries}), retrying in {delay:.1f}s: {exc}"
+                )
+                await asyncio.sleep(delay)
+
+        elapsed = time.perf_counter() - start
+        if elapsed < self._target_batch_seconds / 2:
+            self._resize(grow=True)
+        elif elapsed > self._target_batch_seconds * 2:
+            self._resize(grow=False)
+
+        self._stats.chunks += len(batch.docs)
+        self._stats.bytes += batch.size_bytes
+        self._stats.batches += 1
+        batch.uploaded = True
+        # Only the record count is needed until the batches before this one finish.
+        batch.docs = []
+        # Batches can finish out of order; checkpoint only the uploaded prefix.
+        done = None
+        while pending and pending[0].uploaded:
+            done = pending.popleft().records_done
+        if done is not None:
+            self._write_checkpoint(done)
+
+    def _resize(self, grow: bool):
+        if grow:
+            self._batch_size = min(self._max_batch_size, self._batch_size * 2)
+        else:
+            self._batch_size = max(self._min_batch_size, self._batch_size // 2)
+        self._stats.batch_size = self._batch_size
+
+    def _read_checkpoint(self) -> int | None:
+        if not self._checkpoint_path or not self._checkpoint_path.exists():
+            return None
+        try:
+            data = json.loads(self._checkpoint_path.read_text())
+        except (OSError, ValueError) as exc:
+            logger.warning(f"Ignoring unreadable checkpoint {self._checkpoint_path}: {exc}")
+            return None
+        if data.get("index_name") != self._index_name:
+            logger.warning(f"Ignoring checkpoint for another index: {data.get('index_name')}")
+            return None
+        return int(data.get("records", 0))
+
+    def _write_checkpoint(self, records: int):
+        if not self._checkpoint_path:
+            return
+        tmp = self._checkpoint_path.with_suffix(".tmp")
+        tmp.write_text(json.dumps({"index_name": self._index_name, "records": records}))
+        os.replace(tmp, self._checkpoint_path)
+
+    def _report(self):
+        stats = self._stats
+        logger.info(
+            f"Ingested {stats.chunks} chunks from {stats.records} records into "
+            f"{self._index_name}: {stats.docs_per_second:.0f} docs/s, "
+            f"{stats.bytes_per_second / 1e6:.2f} MB/s, batch size {stats.batch_size}"
+        )
+        if self._on_progress:
+            self._on_progress(self.stats)
+
+
+def _open_source(path: str, id_field: str, text_field: str) -> Iterator[IngestRecord]:
+    if os.path.isdir(path):
+        return read_text_files(path)
+    if path.endswith(".csv"):
+        return read_csv(path, id_field=id_field, text_field=text_field)
+    return read_jsonl(path, id_field=id_field, text_field=text_field)
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Run the ``pipecat-moss-ingest`` command."""
+    parser = argparse.ArgumentParser(
+        prog="pipecat-moss-ingest",
+        description="Stream documents from JSONL, CSV or a directory of .txt files into Moss.",
+    )
+    parser.add_argument("source", help="JSONL file, CSV file or directory of .txt files")
+    parser.add_argument("index_name", help="Moss index to upload into")
+    parser.add_argument("--id-field", default="id")
+    parser.add_argument("--text-field", default="text")
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    parser.add_argument("--chunk-overlap", type=int, default=200)
+    parser.add_argument("--batch-size", type=int, default=128)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--processes", type=int, default=None)
+    parser.add_argument("--checkpoint", help="File for resuming an interrupted run")
+    parser.add_argument("--create", metavar="MODEL_ID", help="Create the index with this model")
+    args = parser.parse_args(argv)
+
+    client = MossClient(
+        project_id=os.getenv("MOSS_PROJECT_ID"), project_key=os.getenv("MOSS_PROJECT_KEY")
+    )
+    ingestor = MossIngestor(
+        client,
+        args.index_name,
+        chunk_size=args.chunk_size,
+        chunk_overlap=args.chunk_overlap,
+        batch_size=args.batch_size,
+        max_concurrency=args.concurrency,
+        processes=args.processes,
+        checkpoint_path=args.checkpoint,
+        create_model_id=args.create,
+    )
+    try:
+        asyncio.run(ingestor.ingest(_open_source(args.source, args.id_field, args.text_field)))
+    except Exception as exc:
+        logger.error(f"Ingestion failed: {exc}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
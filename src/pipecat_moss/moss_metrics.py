@@ -0,0 +1,115 @@
+#
+# Copyright (c) 2024-2025, Daily
+#
+# SPDX-License-Identifier: BSD 2-Clause License
+#
+
+"""Metrics data models emitted by Moss retrieval processors."""
+
+from __future__ import annotations
+
+from pipecat.metrics.metrics import MetricsData
+
+__all__ = [
+    "MossContextWindowMetricsData",
+    "MossGateMetricsData",
+    "MossRetrievalMetricsData",
+    "MossShortCircuitMetricsData",
+    "MossSpeculationMetricsData",
+]
+
+
+class MossSpeculationMetricsData(MetricsData):
+    """Speculative retrieval counters for a Moss index processor.
+
+    Parameters:
+        started: Number of speculative queries launched from transcriptions.
+        hits: Number of turns served by a speculative query.
+        wasted: Number of speculative queries cancelled or discarded.
+        hit_rate: Fraction of retrieval turns served by a speculative query.
+        waste_rate: Fraction of speculative queries that were never used.
+    """
+
+    started: int
+    hits: int
+    wasted: int
+    hit_rate: float
+    waste_rate: float
+
+
+class MossContextWindowMetricsData(MetricsData):
+    """Size of the retrieval blocks a processor keeps in the LLM context.
+
+    Parameters:
+        blocks: Number of retrieval blocks currently in the context.
+        injected_tokens: Estimated tokens held by those blocks.
+        saved_tokens: Estimated tokens kept out of this turn's prompt by
+            expiring older blocks and skipping duplicate passages.
+    """
+
+    blocks: int
+    injected_tokens: int
+    saved_tokens: int
+
+
+class MossGateMetricsData(MetricsData):
+    """Retrieval gate decisions for a Moss index processor.
+
+    Parameters:
+        passed: Number of turns the gate let through to retrieval.
+        skipped: Number of turns the gate skipped.
+        reason: Why the latest turn was skipped, or ``None`` if it passed.
+    """
+
+    passed: int
+    skipped: int
+    reason: str | None = None
+
+
+class MossShortCircuitMetricsData(MetricsData):
+    """Canned-answer short-circuit counters for a Moss index processor.
+
+    Parameters:
+        short_circuits: Number of turns answered directly from a canned answer.
+        turns: Number of retrieval turns eligible for a canned answer.
+        rate: Fraction of those turns that were short-circuited.
+        latency_saved: Mean seconds from context push to bot speech saved by a
+            short-circuit, or ``None`` until both kinds of turn were measured.
+    """
+
+    short_circuits: int
+    turns: int
+    rate: float
+    latency_saved: float | None = None
+
+
+class MossRetrievalMetricsData(MetricsData):
+    """Stage timings and results of one retrieval turn.
+
+    Durations are in seconds and ``None`` for stages that did not run.
+
+    Parameters:
+        outcome: What happened to the turn, e.g. ``"injected"`` or ``"timeout"``.
+        total: Sum of the stages that ran.
+        wait: From the context frame arriving to the query starting.
+        query: Client-side query time, including queueing and the cache.
+        format: Pruning, packing and formatting of the results.
+        inject: Adding the passages to the context and pushing it on.
+        server_time: Search time reported by Moss, if any.
+        results: Number of documents returned.
+        top_score: Score of the best document, if any.
+        mean_score: Mean score of the returned documents, if any.
+        injected_tokens: Estimated tokens added to the context.
+    """
+
+    outcome: str
+    total: float
+    wait: float | None = None
+    query: float | None = None
+    format: float | None = None
+    inject: float | None = None
+    server_time: float | None = None
+    results: int = 0
+    top_score: float | None = None
+    mean_score: float | None = None
+    injected_tokens: int = 0
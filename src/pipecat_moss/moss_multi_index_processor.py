@@ -0,0 +1,254 @@
+#
+# Copyright (c) 2024-2025, Daily
+#
+# SPDX-License-Identifier: BSD 2-Clause License
+#
+
+"""Pipeline processor that retrieves from several Moss indexes concurrently."""
+
+from __future__ import annotations
+
+import asyncio
+import dataclasses
+import hashlib
+import time
+from collections.abc import Sequence
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any, Literal
+
+from loguru import logger
+
+from .moss_circuit_breaker import MossCircuitBreaker
+from .moss_index_processor import MossIndexProcessor
+from .moss_query_batcher import QueryClient
+from .moss_query_cache import normalize_query
+from .moss_retrieval_trace import RetrievalOutcome, RetrievalTrace
+
+if TYPE_CHECKING:
+    from inferedge_moss import SearchResult
+
+__all__ = ["FusedSearchResult", "MossIndexQuery", "MossMultiIndexProcessor"]
+
+FusionMethod = Literal["rrf", "score"]
+DedupeKey = Literal["id", "text"]
+
+
+@dataclass
+class MossIndexQuery:
+    """Per-index retrieval settings for a fan-out query.
+
+    Parameters:
+        index_name: Name of a loaded Moss index.
+        top_k: Number of documents to request from this index.
+        alpha: Semantic vs keyword blend for this index.
+        timeout: Seconds to wait for this index before fusing without it.
+    """
+
+    index_name: str
+    top_k: int = 5
+    alpha: float = 0.8
+    timeout: float | None = None
+
+
+@dataclass
+class FusedDocument:
+    """A document ranked across several indexes."""
+
+    id: str
+    text: str
+    metadata: dict[str, Any] | None
+    score: float
+    index_name: str
+
+
+@dataclass
+class FusedSearchResult:
+    """Merged results of a fan-out query, shaped like a Moss ``SearchResult``.
+
+    ``time_taken_ms`` is always ``None``: Moss reports a search time per index,
+    in ``index_results``. ``index_query_times`` holds the seconds each index
+    took as seen by the client, and ``index_failures`` why an index was left
+    out (``"timeout"``, ``"error"`` or ``"circuit_open"``).
+    """
+
+    docs: list[FusedDocument]
+    query: str
+    index_name: str | None = None
+    time_taken_ms: int | None = None
+    index_results: dict[str, SearchResult] = field(default_factory=dict)
+    index_query_times: dict[str, float] = field(default_factory=dict)
+    index_failures: dict[str, RetrievalOutcome] = field(default_factory=dict)
+
+
+class MossMultiIndexProcessor(MossIndexProcessor):
+    """Pipeline processor that fans a query out to several indexes.
+
+    All indexes are queried concurrently and their results are merged with
+    reciprocal-rank fusion (``"rrf"``) or per-index normalized scores
+    (``"score"``), deduplicated, and injected as a single context block.
+
+    Each turn is passed to the retrieval sinks as one trace per index, with
+    that index's own query time, outcome, results and search time.
+    """
+
+    def __init__(
+        self,
+        client: QueryClient,
+        indexes: Sequence[MossIndexQuery],
+        *,
+        fusion: FusionMethod = "rrf",
+        rrf_k: int = 60,
+        dedupe_by: DedupeKey = "text",
+        top_k: int | None = None,
+        circuit_breakers: dict[str, MossCircuitBreaker] | None = None,
+        **kwargs,
+    ):
+        """Configure the indexes to fan out to and how to merge their results.
+
+        Args:
+            client: Moss client with every index loaded.
+            indexes: Per-index query settings.
+            fusion: ``"rrf"`` for reciprocal-rank fusion or ``"score"`` to merge
+                min-max normalized scores.
+            rrf_k: Rank offset used by reciprocal-rank fusion.
+            dedupe_by: Merge duplicates by document ``"id"`` or by a hash of the
+                normalized ``"text"`` (safe when indexes reuse IDs).
+            top_k: Number of fused documents to keep; defaults to the largest
+                per-index ``top_k``.
+            circuit_breakers: Optional per-index circuit breakers.
+            **kwargs: Options forwarded to ``MossIndexProcessor``.
+        """
+        if not indexes:
+            raise ValueError("MossMultiIndexProcessor needs at least one index")
+        names = "+".join(spec.index_name for spec in indexes)
+        kwargs.setdefault("name", f"MossRetrieval-{names}")
+        super().__init__(
+            client,
+            names,
+            top_k=max(spec.top_k for spec in indexes) if top_k is None else top_k,
+            **kwargs,
+        )
+        self._indexes = list(indexes)
+        self._fusion = fusion
+        self._rrf_k = rrf_k
+        self._dedupe_by = dedupe_by
+        self._circuit_breakers = circuit_breakers or {}
+        # Fused result of each turn whose trace has not been recorded yet.
+        self._turn_results: dict[int, FusedSearchResult] = {}
+
+    async def retrieve_documents(self, query: str, top_k: int | None = None) -> FusedSearchResult:
+        """Query every index concurrently and fuse their rankings."""
+        fused = FusedSearchResult(docs=[], query=query)
+        await asyncio.gather(*(self._search_one(spec, query, fused) for spec in self._indexes))
+        fused.docs = self._fuse(fused.index_results)[: self._top_k if top_k is None else top_k]
+        return fused
+
+    async def _search_one(self, spec: MossIndexQuery, query: str, fused: FusedSearchResult):
+        """Query one index into ``fused``, leaving it out if it fails or misses its deadline."""
+        index_name = spec.index_name
+        breaker = self._circuit_breakers.get(index_name)
+        if breaker and not breaker.allow_request():
+            logger.debug(f"{self}: Circuit open; skipping index {index_name}")
+            fused.index_failures[index_name] = "circuit_open"
+            return
+
+        start = time.perf_counter()
+        try:
+            result = await asyncio.wait_for(
+                self._search(index_name, query, spec.top_k, spec.alpha), spec.timeout
+            )
+        except asyncio.TimeoutError:
+            logger.warning(f"{self}: index {index_name} exceeded {spec.timeout}s deadline")
+            fused.index_failures[index_name] = "timeout"
+            if breaker:
+                breaker.record_failure()
+        except Exception as exc:
+            logger.warning(f"{self}: index {index_name} failed: {exc}")
+            fused.index_failures[index_name] = "error"
+            if breaker:
+                breaker.record_failure()
+        else:
+            if breaker:
+                breaker.record_success()
+            fused.index_results[index_name] = result
+        finally:
+            fused.index_query_times[index_name] = time.perf_counter() - start
+            if breaker:
+                # A cancelled search says nothing about the index; hand back its probe.
+                breaker.release_probe()
+
+    def _trace_search_result(self, trace: RetrievalTrace, search_result: FusedSearchResult):
+        """Keep the per-index results until the turn's trace is recorded."""
+        super()._trace_search_result(trace, search_result)
+        self._turn_results[id(trace)] = search_result
+
+    def _record_trace(self, trace: RetrievalTrace):
+        """Record the turn as one trace per index, so sinks can tell indexes apart."""
+        fused = self._turn_results.pop(id(trace), None)
+        for spec in self._indexes:
+            super()._record_trace(self._index_trace(trace, spec.index_name, fused))
+
+    @staticmethod
+    def _index_trace(
+        trace: RetrievalTrace, index_name: str, fused: FusedSearchResult | None
+    ) -> RetrievalTrace:
+        """Return the part of a turn's ``trace`` that concerns ``index_name``."""
+        index_trace = dataclasses.replace(trace, index_name=index_name)
+        if fused is None:
+            # The turn never got a fused result (skipped, timed out, cancelled).
+            return index_trace
+
+        index_trace.query = fused.index_query_times.get(index_name)
+        index_trace.outcome = fused.index_failures.get(index_name, trace.outcome)
+        result = fused.index_results.get(index_name)
+        docs = result.docs if result is not None else []
+        index_trace.results = len(docs)
+        index_trace.scores = [
+            score for doc in docs if (score := getattr(doc, "score", None)) is not None
+        ]
+        time_taken = getattr(result, "time_taken_ms", None)
+        index_trace.server_time = time_taken / 1000.0 if time_taken is not None else None
+        return index_trace
+
+    def _fuse(self, index_results: dict[str, SearchResult]) -> list[FusedDocument]:
+        """Merge per-index rankings into one list, best first."""
+        fused: dict[str, FusedDocument] = {}
+        for index_name, result in index_results.items():
+            for doc, score in zip(result.docs, self._fusion_scores(result.docs), strict=True):
+                key = self._dedupe_key(doc)
+                existing = fused.get(key)
+                if existing is None:
+                    metadata = dict(doc.metadata or {})
+                    metadata.setdefault("source", index_name)
+                    fused[key] = FusedDocument(
+                        id=doc.id,
+                        text=doc.text,
+                        metadata=metadata,
+                        score=score,
+                        index_name=index_name,
+                    )
+                elif self._fusion == "rrf":
+                    # Agreement between indexes is what reciprocal-rank fusion rewards.
+                    existing.score += score
+                else:
+                    existing.score = max(existing.score, score)
+
+        return sorted(fused.values(), key=lambda d: d.score, reverse=True)
+
+    def _fusion_scores(self, docs: Sequence[Any]) -> list[float]:
+        if self._fusion == "rrf":
+            return [1.0 / (self._rrf_k + rank) for rank in range(1, len(docs) + 1)]
+
+        scores = [getattr(doc, "score", 0.0) or 0.0 for doc in docs]
+        if not scores:
+            return []
+        low, high = min(scores), max(scores)
+        if high == low:
+            # No spread to normalize: a lone weak hit must not outrank real matches.
+            return [min(max(s, 0.0), 1.0) for s in scores]
+        return [(s - low) / (high - low) for s in scores]
+
+    def _dedupe_key(self, doc: Any) -> str:
+        if self._dedupe_by == "id":
+            return str(doc.id)
+        return hashlib.sha1(normalize_query(doc.text or "").encode()).hexdigest()
@@ -0,0 +1,76 @@
+#
+# Copyright (c) 2024-2025, Daily
+#
+# SPDX-License-Identifier: BSD 2-Clause License
+#
+
+"""OpenTelemetry exporter for Moss retrieval traces."""
+
+from __future__ import annotations
+
+from loguru import logger
+
+from .moss_retrieval_trace import STAGES, RetrievalTrace
+
+try:
+    from opentelemetry import trace as otel_trace
+    from opentelemetry.trace import Status, StatusCode, Tracer
+except ModuleNotFoundError as e:
+    logger.error(f"Exception: {e}")
+    logger.error(
+        "In order to use OpenTelemetry tracing, you need to `pip install pipecat-moss[otel]`."
+    )
+    raise Exception(f"Missing module: {e}") from e
+
+__all__ = ["OpenTelemetryRetrievalSink"]
+
+_FAILED_OUTCOMES = {"timeout", "error", "circuit_open"}
+
+
+class OpenTelemetryRetrievalSink:
+    """Record each retrieval turn as a ``moss.retrieval`` span with one child per stage.
+
+    Spans are created after the turn finishes with the timestamps the trace
+    measured, so exporting never adds latency to the turn itself. They are
+    parented to the span current when the turn was recorded, if any.
+    """
+
+    def __init__(self, tracer: Tracer | None = None):
+        """Create the sink.
+
+        Args:
+            tracer: Tracer to create spans with; defaults to the global
+                tracer provider's ``pipecat_moss`` tracer.
+        """
+        self._tracer = tracer or otel_trace.get_tracer("pipecat_moss")
+
+    def record(self, trace: RetrievalTrace):
+        """Export ``trace`` as a span tree."""
+        start = trace.started_at_ns
+        attributes = {
+            "moss.index": trace.index_name,
+            "moss.processor": trace.processor,
+            "moss.outcome": trace.outcome,
+            "moss.results": trace.results,
+            "moss.injected_tokens": trace.injected_tokens,
+        }
+        if trace.scores:
+            attributes["moss.top_score"] = max(trace.scores)
+        if trace.server_time is not None:
+            attributes["moss.server_time"] = trace.server_time
+
+        span = self._tracer.start_span("moss.retrieval", start_time=start, attributes=attributes)
+        if trace.outcome in _FAILED_OUTCOMES:
+            span.set_status(Status(StatusCode.ERROR, trace.outcome))
+        parent = otel_trace.set_span_in_context(span)
+
+        offset = start
+        for stage in STAGES[:-1]:
+            duration = getattr(trace, stage)
+            if duration is None:
+                continue
+            end = offset + int(duration * 1e9)
+            child = self._tracer.start_span(f"moss.{stage}", context=parent, start_time=offset)
+            child.end(end_time=end)
+            offset = end
+        span.end(end_time=start + int(trace.total * 1e9))
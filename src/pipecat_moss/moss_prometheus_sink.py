@@ -0,0 +1,97 @@
+#
+# Copyright (c) 2024-2025, Daily
+#
+# SPDX-License-Identifier: BSD 2-Clause License
+#
+
+"""Prometheus exporter for Moss retrieval traces."""
+
+from __future__ import annotations
+
+from loguru import logger
+
+from .moss_retrieval_trace import STAGES, RetrievalTrace
+
+try:
+    from prometheus_client import REGISTRY, CollectorRegistry, Counter, Histogram
+except ModuleNotFoundError as e:
+    logger.error(f"Exception: {e}")
+    logger.error(
+        "In order to use Prometheus metrics, you need to `pip install pipecat-moss[prometheus]`."
+    )
+    raise Exception(f"Missing module: {e}") from e
+
+__all__ = ["PrometheusRetrievalSink"]
+
+# Voice turns care about the 5-500 ms range far more than the long tail.
+_LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+_SCORE_BUCKETS = (0.1, 0.2, 0.3, 0.4, 0.5, 0.6, 0.7, 0.8, 0.9, 1.0)
+_TOKEN_BUCKETS = (0, 50, 100, 250, 500, 1000, 2000, 4000)
+
+
+class PrometheusRetrievalSink:
+    """Export retrieval traces as Prometheus histograms and counters.
+
+    Metrics:
+        ``moss_retrieval_stage_seconds{index,stage}``: Duration of each stage
+        and of the whole turn (``stage="total"``).
+        ``moss_retrieval_top_score{index}``: Score of the best result.
+        ``moss_retrieval_injected_tokens{index}``: Estimated tokens injected.
+        ``moss_retrieval_outcomes_total{index,outcome}``: Turns by outcome.
+    """
+
+    def __init__(self, registry: CollectorRegistry | None = None, namespace: str = "moss"):
+        """Create and register the metrics.
+
+        Args:
+            registry: Registry to register with; defaults to the global one.
+                Use a separate registry per sink when creating several.
+            namespace: Prefix of the metric names.
+        """
+        registry = registry or REGISTRY
+        self._stages = Histogram(
+            "retrieval_stage_seconds",
+            "Duration of each Moss retrieval stage.",
+            ["index", "stage"],
+            namespace=namespace,
+            buckets=_LATENCY_BUCKETS,
+            registry=registry,
+        )
+        self._top_score = Histogram(
+            "retrieval_top_score",
+            "Score of the best Moss result per turn.",
+            ["index"],
+            namespace=namespace,
+            buckets=_SCORE_BUCKETS,
+            registry=registry,
+        )
+        self._injected_tokens = Histogram(
+            "retrieval_injected_tokens",
+            "Estimated tokens of retrieved passages injected per turn.",
+            ["index"],
+            namespace=namespace,
+            buckets=_TOKEN_BUCKETS,
+            registry=registry,
+        )
+        self._outcomes = Counter(
+            "retrieval_outcomes",
+            "Moss retrieval turns by outcome.",
+            ["index", "outcome"],
+            namespace=namespace,
+            registry=registry,
+        )
+
+    def record(self, trace: RetrievalTrace):
+        """Observe ``trace`` in the histograms and count its outcome."""
+        index = trace.index_name
+        self._outcomes.labels(index, trace.outcome).inc()
+        if trace.query is None or trace.outcome == "cancelled":
+            return
+        for stage in STAGES:
+            value = getattr(trace, stage)
+            if value is not None:
+                self._stages.labels(index, stage).observe(value)
+        if trace.scores:
+            self._top_score.labels(index).observe(max(trace.scores))
+        if trace.outcome == "injected":
+            self._injected_tokens.labels(index).observe(trace.injected_tokens)
@@ -0,0 +1,211 @@
+#
+# Copyright (c) 2024-2025, Daily
+#
+# SPDX-License-Identifier: BSD 2-Clause License
+#
+
+"""Micro-batching scheduler for Moss queries issued by many sessions."""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Protocol
+
+from loguru import logger
+
+if TYPE_CHECKING:
+    from inferedge_moss import SearchResult
+
+__all__ = ["MossQueryBatcher", "QueryBatcherStats", "QueryClient"]
+
+
+class QueryClient(Protocol):
+    """Anything that answers queries like ``MossClient.query``."""
+
+    async def query(
+        self, index_name: str, query: str, top_k: int = 5, alpha: float | None = None
+    ) -> SearchResult:
+        """Search ``index_name`` for ``query``."""
+        ...
+
+
+@dataclass
+class QueryBatcherStats:
+    """Counters for tuning the batching window.
+
+    Parameters:
+        queue_depth: Queries currently waiting for the next batch.
+        max_queue_depth: Largest number of queries seen waiting at once.
+        batches: Number of batches dispatched.
+        queries: Number of queries dispatched.
+        max_batch_size: Largest batch dispatched.
+        total_wait: Total seconds queries spent waiting for their batch.
+        max_wait: Longest time a single query waited for its batch.
+    """
+
+    queue_depth: int = 0
+    max_queue_depth: int = 0
+    batches: int = 0
+    queries: int = 0
+    max_batch_size: int = 0
+    total_wait: float = 0.0
+    max_wait: float = 0.0
+
+    @property
+    def mean_batch_size(self) -> float:
+        """Average number of queries per batch."""
+        return self.queries / self.batches if self.batches else 0.0
+
+    @property
+    def mean_wait(self) -> float:
+        """Average seconds a query waited for its batch."""
+        return self.total_wait / self.queries if self.queries else 0.0
+
+
+@dataclass
+class _PendingQuery:
+    index_name: str
+    query: str
+    top_k: int
+    alpha: float | None
+    future: asyncio.Future
+    enqueued_at: float
+
+
+class MossQueryBatcher:
+    """Collect queries for a short window and dispatch them together.
+
+    Queries are held for at most ``max_wait`` seconds, or until
+    ``max_batch_size`` are waiting, and then dispatched as one batch. Queries
+    that share an index, ``top_k`` and ``alpha`` go through the client's
+    ``query_batch(index_name, queries, top_k=..., alpha=...)`` when it has one,
+    as ``MossIndexManager`` does, so they are embedded in one model call.
+    Otherwise the batch is dispatched concurrently. Each result, or the
+    exception its search raised, is routed back to its caller.
+    """
+
+    def __init__(self, client: QueryClient, *, max_batch_size: int = 16, max_wait: float = 0.002):
+        """Configure the batching window.
+
+        Args:
+            client: Client that executes the queries.
+            max_batch_size: Dispatch as soon as this many queries are waiting.
+            max_wait: Longest time in seconds a query waits for its batch.
+        """
+        self._client = client
+        self._max_batch_size = max_batch_size
+        self._max_wait = max_wait
+        self._pending: list[_PendingQuery] = []
+        self._flush_handle: asyncio.TimerHandle | None = None
+        self._dispatch_tasks: set[asyncio.Task] = set()
+        self._stats = QueryBatcherStats()
+
+    @property
+    def stats(self) -> QueryBatcherStats:
+        """Return a snapshot of the batching counters."""
+        stats = QueryBatcherStats(**vars(self._stats))
+        stats.queue_depth = len(self._pending)
+        return stats
+
+    async def query(
+        self, index_name: str, query: str, top_k: int = 5, alpha: float | None = None
+    ) -> SearchResult:
+        """Queue a query for the next batch and wait for its result."""
+        loop = asyncio.get_running_loop()
+        pending = _PendingQuery(
+            index_name, query, top_k, alpha, loop.create_future(), time.perf_counter()
+        )
+        self._pending.append(pending)
+        self._stats.max_queue_depth = max(self._stats.max_queue_depth, len(self._pending))
+
+        if len(self._pending) >= self._max_batch_size:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self._max_wait, self._flush)
+
+        return await pending.future
+
+    async def embed_queries(self, index_name: str, texts: list[str]) -> list[list[float]]:
+        """Embed ``texts`` with the wrapped client, without waiting for a batch."""
+        embed_queries = getattr(self._client, "embed_queries", None)
+        if embed_queries is None:
+            raise NotImplementedError(f"{type(self._client).__name__} cannot embed queries")
+        return await embed_queries(index_name, texts)
+
+    async def query_with_embedding(
+        self,
+        index_name: str,
+        query: str,
+        embedding: list[float],
+        top_k: int = 5,
+        alpha: float | None = None,
+    ) -> SearchResult:
+        """Search with a precomputed embedding; there is nothing left to batch."""
+        query_with_embedding = getattr(self._client, "query_with_embedding", None)
+        if query_with_embedding is None:
+            raise NotImplementedError(f"{type(self._client).__name__} cannot search by embedding")
+        return await query_with_embedding(index_name, query, embedding, top_k, alpha)
+
+    async def close(self):
+        """Dispatch queued queries and wait for in-flight batches."""
+        self._flush()
+        if self._dispatch_tasks:
+            await asyncio.gather(*self._dispatch_tasks, return_exceptions=True)
+
+    def _flush(self):
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+
+        batch = [p for p in self._pending if not p.future.cancelled()]
+        self._pending = []
+        if not batch:
+            return
+
+        now = time.perf_counter()
+        for pending in batch:
+            wait = now - pending.enqueued_at
+            self._stats.total_wait += wait
+            self._stats.max_wait = max(self._stats.max_wait, wait)
+        self._stats.batches += 1
+        self._stats.queries += len(batch)
+        self._stats.max_batch_size = max(self._stats.max_batch_size, len(batch))
+
+        task = asyncio.create_task(self._dispatch(batch))
+        self._dispatch_tasks.add(task)
+        task.add_done_callback(self._dispatch_tasks.discard)
+
+    async def _dispatch(self, batch: list[_PendingQuery]):
+        groups: dict[tuple[str, int, Any], list[_PendingQuery]] = defaultdict(list)
+        for pending in batch:
+            groups[(pending.index_name, pending.top_k, pending.alpha)].append(pending)
+
+        await asyncio.gather(*(self._dispatch_group(key, group) for key, group in groups.items()))
+
+    async def _dispatch_group(self, key: tuple[str, int, Any], group: list[_PendingQuery]):
+        index_name, top_k, alpha = key
+        query_batch = getattr(self._client, "query_batch", None)
+        if query_batch is not None and len(group) > 1:
+            try:
+                results = await query_batch(
+                    index_name, [p.query for p in group], top_k=top_k, alpha=alpha
+                )
+            except Exception as exc:
+                logger.warning(f"Batched Moss query against {index_name} failed: {exc}")
+                results = [exc] * len(group)
+        else:
+            results = await asyncio.gather(
+                *(self._client.query(index_name, p.query, top_k, alpha) for p in group),
+                return_exceptions=True,
+            )
+
+        for pending, result in zip(group, results, strict=True):
+            if pending.future.done():
+                continue
+            if isinstance(result, BaseException):
+                pending.future.set_exception(result)
+            else:
+                pending.future.set_result(result)
@@ -0,0 +1,207 @@
+#
+# Copyright (c) 2024-2025, Daily
+#
+# SPDX-License-Identifier: BSD 2-Clause License
+#
+
+"""Conversation-aware retrieval queries built from recent turns, without an LLM."""
+
+from __future__ import annotations
+
+import re
+from collections import defaultdict
+from collections.abc import Sequence
+from dataclasses import dataclass
+from typing import Any
+
+__all__ = ["ConversationQuery", "ConversationQueryBuilder", "QuerySegment"]
+
+_TERM_RE = re.compile(r"[a-z0-9][a-z0-9'-]*")
+
+# Function words that say nothing about a conversation's topic.
+_STOP_WORDS = frozenset(
+    """
+    a about above after again all also am an and any are as at be because been before being
+    below between both but by can could did do does doing down during each few for from
+    further had has have having he her here hers him his how i if in into is it it's its
+    just let me more most my no nor not now of off on once only or other our ours out over
+    own same she should so some such than that that's the their theirs them then there
+    these they this those through to too under until up very was we were what when where
+    which while who whom why will with would you your yours yourself i'm i'd i'll i've
+    don't can't want need like know get got please thanks thank okay ok yes yeah hi hello
+    tell say said one also really much many still well
+    """.split()
+)
+
+# Candidate summary terms kept per requested term, so decayed ones can resurface.
+_SUMMARY_HEADROOM = 4
+
+
+@dataclass(frozen=True)
+class QuerySegment:
+    """One part of a conversation query and its weight in the query embedding.
+
+    Parameters:
+        text: Turn text, or the rolling summary's keywords.
+        weight: Relative weight; the latest user turn has ``1.0``.
+    """
+
+    text: str
+    weight: float
+
+
+class ConversationQuery(str):
+    """Query text that remembers the conversation segments it was built from.
+
+    Everything that only needs text (keyword scoring, the shared result cache,
+    document packing) treats it as the joined segment texts. A processor with
+    a query-embedding cache embeds each segment separately instead, so turns
+    still in the window are not embedded again.
+    """
+
+    segments: tuple[QuerySegment, ...]
+    latest: str
+
+    def __new__(cls, segments: Sequence[QuerySegment], latest: str):
+        """Join ``segments`` into the query text; ``latest`` is the user's own turn."""
+        query = super().__new__(cls, " ".join(segment.text for segment in segments))
+        query.segments = tuple(segments)
+        query.latest = latest
+        return query
+
+
+class ConversationQueryBuilder:
+    """Build retrieval queries that carry the conversation's recent context.
+
+    The latest user turn is combined with up to ``window_turns`` earlier turns
+    (user turns only, unless ``include_assistant``). Each step back multiplies
+    a turn's weight by ``decay``, so a follow-up such as "and how long does that
+    take?" keeps what "that" refers to without outweighing the question itself.
+
+    With ``summary_terms`` set, turns that leave the window are folded into a
+    rolling keyword summary: every folded turn decays the existing term weights
+    by ``summary_decay`` and adds its own content words. The top terms form one
+    more segment with weight ``summary_weight``, keeping the conversation's
+    topic in the query at a fixed size however long the call runs.
+
+    The summary is per conversation; give each processor its own builder.
+    """
+
+    def __init__(
+        self,
+        *,
+        window_turns: int = 2,
+        include_assistant: bool = False,
+        decay: float = 0.5,
+        summary_terms: int = 0,
+        summary_decay: float = 0.8,
+        summary_weight: float = 0.25,
+        max_turn_chars: int = 300,
+    ):
+        """Configure how much of the conversation goes into each query.
+
+        Args:
+            window_turns: Earlier turns included verbatim before the latest one.
+            include_assistant: Also include the assistant's turns.
+            decay: Weight multiplier per turn back from the latest user turn.
+            summary_terms: Keywords kept from turns older than the window;
+                ``0`` disables the rolling summary.
+            summary_decay: Weight multiplier applied to summary terms per turn.
+            summary_weight: Weight of the summary segment.
+            max_turn_chars: Earlier turns are cut to about this many characters.
+        """
+        if window_turns < 0 or summary_terms < 0:
+            raise ValueError("window_turns and summary_terms must not be negative")
+        self._window_turns = window_turns
+        self._roles = ("user", "assistant") if include_assistant else ("user",)
+        self._decay = decay
+        self._summary_terms = summary_terms
+        self._summary_decay = summary_decay
+        self._summary_weight = summary_weight
+        self._max_turn_chars = max_turn_chars
+        self._summary: dict[str, float] = defaultdict(float)
+        self._folded = 0
+
+    def build(self, messages: Sequence[dict[str, Any]]) -> ConversationQuery | None:
+        """Return the query for the latest user turn in ``messages``, if there is one."""
+        turns = [
+            (message["role"], text)
+            for message in messages
+            if message.get("role") in self._roles and (text := _message_text(message))
+        ]
+        latest_index = next(
+            (i for i in range(len(turns) - 1, -1, -1) if turns[i][0] == "user"), None
+        )
+        if latest_index is None:
+            return None
+
+        latest = turns[latest_index][1]
+        earlier = [text for _, text in turns[:latest_index]]
+        window_start = max(0, len(earlier) - self._window_turns)
+        if self._summary_terms:
+            self._fold(earlier[:window_start])
+
+        segments = []
+        if summary := self._summary_text():
+            segments.append(QuerySegment(summary, self._summary_weight))
+        window = earlier[window_start:]
+        for steps_back, text in zip(range(len(window), 0, -1), window, strict=True):
+            segments.append(QuerySegment(self._clip(text), self._decay**steps_back))
+        segments.append(QuerySegment(latest, 1.0))
+        return ConversationQuery(segments, latest)
+
+    def reset(self):
+        """Forget the rolling summary, e.g. when a new conversation starts."""
+        self._summary.clear()
+        self._folded = 0
+
+    def _fold(self, older: list[str]):
+        """Fold turns that left the window into the rolling summary."""
+        if len(older) < self._folded:
+            # The history was rewritten or replaced; start over from what is there.
+            self.reset()
+        for text in older[self._folded :]:
+            for term in self._summary:
+                self._summary[term] *= self._summary_decay
+            for term in _content_terms(text):
+                self._summary[term] += 1.0
+            limit = self._summary_terms * _SUMMARY_HEADROOM
+            if len(self._summary) > limit:
+                kept = sorted(self._summary, key=self._rank)[:limit]
+                self._summary = defaultdict(float, {term: self._summary[term] for term in kept})
+        self._folded = len(older)
+
+    def _summary_text(self) -> str:
+        if not self._summary_terms or not self._summary:
+            return ""
+        ranked = sorted(self._summary, key=self._rank)
+        return " ".join(ranked[: self._summary_terms])
+
+    def _rank(self, term: str) -> tuple[float, str]:
+        # Ties are broken by the term itself; set order would vary between runs.
+        return -self._summary[term], term
+
+    def _clip(self, text: str) -> str:
+        if len(text) <= self._max_turn_chars:
+            return text
+        clipped = text[: self._max_turn_chars]
+        return clipped.rsplit(" ", 1)[0] if " " in clipped else clipped
+
+
+def _message_text(message: dict[str, Any]) -> str:
+    """Return the text of a message whose content is a string or a list of parts."""
+    content = message.get("content")
+    if isinstance(content, str):
+        return content.strip()
+    if isinstance(content, list):
+        return "\n".join(c["text"] for c in content if c.get("type") == "text").strip()
+    return ""
+
+
+def _content_terms(text: str) -> set[str]:
+    """Return the distinct topical words of ``text``."""
+    return {
+        term
+        for term in _TERM_RE.findall(text.lower())
+        if len(term) > 2 and term not in _STOP_WORDS and not term.isdigit()
+    }
@@ -0,0 +1,206 @@
+#
+# Copyright (c) 2024-2025, Daily
+#
+# SPDX-License-Identifier: BSD 2-Clause License
+#
+
+"""Shared query-result cache for Moss retrieval processors."""
+
+from __future__ import annotations
+
+import asyncio
+import re
+import time
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+from loguru import logger
+
+if TYPE_CHECKING:
+    from inferedge_moss import SearchResult
+
+__all__ = ["MossQueryCache", "QueryCacheStats", "normalize_query"]
+
+_PUNCTUATION_RE = re.compile(r"[^\w\s]")
+_WHITESPACE_RE = re.compile(r"\s+")
+
+CacheKey = tuple[str, str, int, float]
+
+
+def normalize_query(text: str) -> str:
+    """Lowercase text and strip punctuation and repeated whitespace."""
+    text = _PUNCTUATION_RE.sub(" ", text.lower())
+    return _WHITESPACE_RE.sub(" ", text).strip()
+
+
+@dataclass
+class QueryCacheStats:
+    """Counters describing cache effectiveness.
+
+    Parameters:
+        hits: Lookups answered from a cached result.
+        misses: Lookups that triggered a Moss query.
+        coalesced: Lookups that joined an identical in-flight query.
+        evictions: Entries dropped because the cache was full.
+        expirations: Entries dropped because their TTL elapsed.
+        size: Number of entries currently cached.
+    """
+
+    hits: int = 0
+    misses: int = 0
+    coalesced: int = 0
+    evictions: int = 0
+    expirations: int = 0
+    size: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        """Fraction of lookups that did not need their own Moss query."""
+        total = self.hits + self.misses + self.coalesced
+        return (self.hits + self.coalesced) / total if total else 0.0
+
+
+class _InFlight:
+    """Shared Moss query that identical concurrent lookups wait on."""
+
+    def __init__(self, task: asyncio.Task):
+        self.task = task
+        self.waiters = 0
+
+
+class MossQueryCache:
+    """LRU + TTL cache of Moss search results with single-flight coalescing.
+
+    Results are keyed by index name, normalized query text, ``top_k`` and
+    ``alpha``. Identical lookups issued while a query is in flight share that
+    query instead of calling Moss again.
+    """
+
+    def __init__(self, max_size: int = 1024, ttl: float | None = 300.0):
+        """Configure the cache bounds.
+
+        Args:
+            max_size: Maximum number of results kept before evicting the least
+                recently used entry.
+            ttl: Seconds a result stays valid, or ``None`` to never expire.
+        """
+        self._max_size = max_size
+        self._ttl = ttl
+        self._entries: OrderedDict[CacheKey, tuple[float, SearchResult]] = OrderedDict()
+        self._in_flight: dict[CacheKey, _InFlight] = {}
+        self._generations: dict[str, int] = {}
+        self._stats = QueryCacheStats()
+
+    def __len__(self) -> int:
+        """Return the number of cached results."""
+        return len(self._entries)
+
+    @property
+    def stats(self) -> QueryCacheStats:
+        """Return a snapshot of the cache counters."""
+        return QueryCacheStats(
+            hits=self._stats.hits,
+            misses=self._stats.misses,
+            coalesced=self._stats.coalesced,
+            evictions=self._stats.evictions,
+            expirations=self._stats.expirations,
+            size=len(self._entries),
+        )
+
+    @staticmethod
+    def make_key(index_name: str, query: str, top_k: int, alpha: float) -> CacheKey:
+        """Build the cache key for a query."""
+        return (index_name, normalize_query(query), top_k, alpha)
+
+    async def get_or_query(
+        self,
+        index_name: str,
+        query: str,
+        top_k: int,
+        alpha: float,
+        loader: Callable[[], Awaitable[SearchResult]],
+    ) -> SearchResult:
+        """Return a cached result or run ``loader`` once for all identical callers."""
+        key = self.make_key(index_name, query, top_k, alpha)
+
+        cached = self._get(key)
+        if cached is not None:
+            self._stats.hits += 1
+            return cached
+
+        in_flight = self._in_flight.get(key)
+        if in_flight is not None:
+            self._stats.coalesced += 1
+        else:
+            self._stats.misses += 1
+            generation = self._generations.get(index_name, 0)
+            task = asyncio.create_task(self._load(key, generation, loader))
+            in_flight = _InFlight(task)
+            self._in_flight[key] = in_flight
+
+        in_flight.waiters += 1
+        try:
+            return await asyncio.shield(in_flight.task)
+        except asyncio.CancelledError:
+            # Only abandon the shared query once nobody is waiting on it.
+            if in_flight.waiters == 1 and not in_flight.task.done():
+                in_flight.task.cancel()
+            raise
+        finally:
+            in_flight.waiters -= 1
+
+    def invalidate(self, index_name: str | None = None):
+        """Drop cached results for one index, or for every index."""
+        if index_name is None:
+            self._entries.clear()
+            names = set(self._generations) | {key[0] for key in self._in_flight}
+            for name in names:
+                self._generations[name] = self._generations.get(name, 0) + 1
+            logger.debug("Invalidated Moss query cache for all indexes")
+            return
+
+        self._generations[index_name] = self._generations.get(index_name, 0) + 1
+        for key in [k for k in self._entries if k[0] == index_name]:
+            del self._entries[key]
+        logger.debug(f"Invalidated Moss query cache for index: {index_name}")
+
+    async def _load(
+        self,
+        key: CacheKey,
+        generation: int,
+        loader: Callable[[], Awaitable[SearchResult]],
+    ) -> SearchResult:
+        try:
+            result = await loader()
+            # Skip results computed against an index that was reloaded meanwhile.
+            if self._generations.get(key[0], 0) == generation:
+                self._put(key, result)
+            return result
+        finally:
+            self._in_flight.pop(key, None)
+
+    def _get(self, key: CacheKey) -> SearchResult | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        stored_at, result = entry
+        if self._ttl is not None and time.monotonic() - stored_at > self._ttl:
+            del self._entries[key]
+            self._stats.expirations += 1
+            return None
+
+        self._entries.move_to_end(key)
+        return result
+
+    def _put(self, key: CacheKey, result: SearchResult):
+        if self._max_size <= 0:
+            return
+
+        self._entries[key] = (time.monotonic(), result)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._max_size:
+            self._entries.popitem(last=False)
+            self._stats.evictions += 1
@@ -0,0 +1,116 @@
+#
+# Copyright (c) 2024-2025, Daily
+#
+# SPDX-License-Identifier: BSD 2-Clause License
+#
+
+"""Per-session cache of query-segment embeddings."""
+
+from __future__ import annotations
+
+import math
+import time
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable, Sequence
+from dataclasses import dataclass
+
+__all__ = ["QueryEmbeddingCache", "QueryEmbeddingStats", "combine_embeddings"]
+
+Embedding = list[float]
+EmbedFunction = Callable[[list[str]], Awaitable[list[Embedding]]]
+
+
+@dataclass
+class QueryEmbeddingStats:
+    """Counters describing how much query embedding a session avoided.
+
+    Parameters:
+        hits: Segments whose embedding was reused.
+        misses: Segments that had to be embedded.
+        embed_calls: Calls to the embedding model (one per query with misses).
+        embed_time: Seconds spent in those calls.
+        size: Number of embeddings currently cached.
+    """
+
+    hits: int = 0
+    misses: int = 0
+    embed_calls: int = 0
+    embed_time: float = 0.0
+    size: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        """Fraction of segments that did not need embedding."""
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+class QueryEmbeddingCache:
+    """LRU cache of query-segment embeddings for one conversation.
+
+    Conversation queries repeat most of their text from turn to turn: the
+    turns in the window and the rolling summary are shared with the previous
+    query. Embedding each segment once and combining the cached vectors means
+    a turn only pays to embed what is new, usually just the latest user turn.
+    """
+
+    def __init__(self, max_size: int = 64):
+        """Configure the cache bound.
+
+        Args:
+            max_size: Maximum number of embeddings kept before evicting the
+                least recently used one.
+        """
+        self._max_size = max_size
+        self._entries: OrderedDict[tuple[str, str], Embedding] = OrderedDict()
+        self._stats = QueryEmbeddingStats()
+
+    @property
+    def stats(self) -> QueryEmbeddingStats:
+        """Return a snapshot of the cache counters."""
+        stats = QueryEmbeddingStats(**vars(self._stats))
+        stats.size = len(self._entries)
+        return stats
+
+    async def get_or_embed(
+        self, index_name: str, texts: Sequence[str], embed: EmbedFunction
+    ) -> list[Embedding]:
+        """Return an embedding per text, embedding the uncached ones in one call.
+
+        Embeddings are keyed by index as well as text, since indexes may use
+        different embedding models.
+        """
+        keys = [(index_name, text) for text in texts]
+        missing = list(dict.fromkeys(key[1] for key in keys if key not in self._entries))
+        self._stats.hits += len(keys) - len(missing)
+        self._stats.misses += len(missing)
+
+        if missing:
+            start = time.perf_counter()
+            vectors = await embed(missing)
+            self._stats.embed_calls += 1
+            self._stats.embed_time += time.perf_counter() - start
+            for text, vector in zip(missing, vectors, strict=True):
+                self._entries[(index_name, text)] = vector
+
+        embeddings = []
+        for key in keys:
+            self._entries.move_to_end(key)
+            embeddings.append(self._entries[key])
+        while len(self._entries) > self._max_size:
+            self._entries.popitem(last=False)
+        return embeddings
+
+    def clear(self):
+        """Drop every cached embedding."""
+        self._entries.clear()
+
+
+def combine_embeddings(embeddings: Sequence[Embedding], weights: Sequence[float]) -> Embedding:
+    """Return the unit-length weighted mean of ``embeddings``."""
+    combined = [0.0] * len(embeddings[0])
+    for vector, weight in zip(embeddings, weights, strict=True):
+        for i, value in enumerate(vector):
+            combined[i] += weight * value
+    norm = math.sqrt(sum(value * value for value in combined))
+    return [value / norm for value in combined] if norm else combined
@@ -0,0 +1,238 @@
+#
+# Copyright (c) 2024-2025, Daily
+#
+# SPDX-License-Identifier: BSD 2-Clause License
+#
+
+"""Run Moss queries off the event loop and measure event-loop lag."""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from collections import deque
+from collections.abc import Awaitable, Callable
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, TypeVar
+
+from loguru import logger
+
+from .moss_query_batcher import QueryClient
+
+if TYPE_CHECKING:
+    from inferedge_moss import SearchResult
+
+__all__ = ["EventLoopLagMonitor", "LoopLagStats", "MossQueryExecutor", "QueryExecutorStats"]
+
+T = TypeVar("T")
+
+
+@dataclass
+class QueryExecutorStats:
+    """Counters for sizing the worker pool.
+
+    Parameters:
+        workers: Number of worker threads.
+        running: Queries currently executing or queued on the pool.
+        waiting: Callers blocked by backpressure because the pool is saturated.
+        completed: Queries finished since startup.
+        max_running: Highest number of queries on the pool at once.
+        total_wait: Total seconds callers spent blocked by backpressure.
+    """
+
+    workers: int = 0
+    running: int = 0
+    waiting: int = 0
+    completed: int = 0
+    max_running: int = 0
+    total_wait: float = 0.0
+
+
+class MossQueryExecutor:
+    """Execute Moss queries on a bounded thread pool.
+
+    Embedding and vector search are CPU-bound and would otherwise run on the
+    event loop that moves audio frames. Each worker thread drives the client's
+    coroutines on its own private event loop, while the indexes the client has
+    loaded stay shared in memory. Once ``max_pending`` queries are on the pool,
+    further callers wait for a free slot instead of growing the queue. A
+    query whose caller was cancelled keeps its slot until its thread is done.
+    """
+
+    def __init__(
+        self,
+        client: QueryClient | None = None,
+        *,
+        max_workers: int = 4,
+        max_pending: int | None = None,
+    ):
+        """Create the worker pool.
+
+        Args:
+            client: Client queried by ``query()``; ``run()`` takes the client per call.
+            max_workers: Number of worker threads.
+            max_pending: Queries allowed on the pool (running plus queued) before
+                callers are held back. Defaults to twice ``max_workers``.
+        """
+        self._client = client
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="moss-query")
+        self._slots = asyncio.Semaphore(max_pending or max_workers * 2)
+        self._local = threading.local()
+        self._stats = QueryExecutorStats(workers=max_workers)
+
+    @property
+    def stats(self) -> QueryExecutorStats:
+        """Return a snapshot of the pool counters."""
+        return QueryExecutorStats(**vars(self._stats))
+
+    async def query(
+        self, index_name: str, query: str, top_k: int = 5, alpha: float | None = None
+    ) -> SearchResult:
+        """Query the executor's client on a worker thread."""
+        if self._client is None:
+            raise ValueError("MossQueryExecutor was created without a client; use run()")
+        return await self.run(self._client, index_name, query, top_k, alpha)
+
+    async def run(
+        self,
+        client: QueryClient,
+        index_name: str,
+        query: str,
+        top_k: int = 5,
+        alpha: float | None = None,
+    ) -> SearchResult:
+        """Query ``client`` on a worker thread, waiting for a slot if the pool is full."""
+        return await self.submit(lambda: client.query(index_name, query, top_k, alpha))
+
+    async def submit(self, call: Callable[[], Awaitable[T]]) -> T:
+        """Run the coroutine ``call()`` creates on a worker thread, like ``run()``."""
+        if self._slots.locked():
+            self._stats.waiting += 1
+            start = time.perf_counter()
+            try:
+                await self._slots.acquire()
+            finally:
+                self._stats.waiting -= 1
+                self._stats.total_wait += time.perf_counter() - start
+        else:
+            await self._slots.acquire()
+
+        self._stats.running += 1
+        self._stats.max_running = max(self._stats.max_running, self._stats.running)
+        loop = asyncio.get_running_loop()
+        try:
+            future = self._pool.submit(self._run_call, call)
+        except BaseException:
+            self._release_slot()
+            raise
+        # A cancelled caller stops waiting, but the thread keeps running the
+        # query: the slot is only free once the work itself is done.
+        future.add_done_callback(lambda _: self._call_soon(loop, self._release_slot))
+        return await asyncio.wrap_future(future)
+
+    def shutdown(self):
+        """Stop accepting work and release the worker threads."""
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+    def _release_slot(self):
+        self._stats.running -= 1
+        self._stats.completed += 1
+        self._slots.release()
+
+    @staticmethod
+    def _call_soon(loop: asyncio.AbstractEventLoop, callback: Callable[[], None]):
+        try:
+            loop.call_soon_threadsafe(callback)
+        except RuntimeError:
+            # The event loop is closed; nobody is left to wait for the slot.
+            pass
+
+    def _run_call(self, call: Callable[[], Awaitable[T]]) -> T:
+        loop = getattr(self._local, "loop", None)
+        if loop is None:
+            loop = asyncio.new_event_loop()
+            self._local.loop = loop
+        return loop.run_until_complete(call())
+
+
+@dataclass
+class LoopLagStats:
+    """Event-loop scheduling delay measured by ``EventLoopLagMonitor``.
+
+    Parameters:
+        samples: Number of measurements in the window.
+        mean: Mean lag in seconds.
+        p99: 99th percentile lag in seconds.
+        max: Largest lag in seconds.
+    """
+
+    samples: int = 0
+    mean: float = 0.0
+    p99: float = 0.0
+    max: float = 0.0
+
+
+class EventLoopLagMonitor:
+    """Measure how late the event loop wakes up a periodic timer.
+
+    Lag is the time a ``sleep(interval)`` overshoots its deadline, i.e. how
+    long ready callbacks (such as audio frames) wait behind other work.
+    """
+
+    def __init__(self, interval: float = 0.05, window: int = 1200, warn_threshold: float = 0.05):
+        """Configure the sampling.
+
+        Args:
+            interval: Seconds between measurements.
+            window: Number of recent measurements kept for the statistics.
+            warn_threshold: Lag in seconds above which a warning is logged.
+        """
+        self._interval = interval
+        self._samples: deque[float] = deque(maxlen=window)
+        self._warn_threshold = warn_threshold
+        self._task: asyncio.Task | None = None
+
+    @property
+    def running(self) -> bool:
+        """Return whether the monitor is sampling."""
+        return self._task is not None and not self._task.done()
+
+    @property
+    def stats(self) -> LoopLagStats:
+        """Return lag statistics over the recent window."""
+        if not self._samples:
+            return LoopLagStats()
+        ordered = sorted(self._samples)
+        return LoopLagStats(
+            samples=len(ordered),
+            mean=sum(ordered) / len(ordered),
+            p99=ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))],
+            max=ordered[-1],
+        )
+
+    def start(self):
+        """Start sampling on the running event loop."""
+        if not self.running:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        """Stop sampling."""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + self._interval
+            await asyncio.sleep(self._interval)
+            lag = max(0.0, loop.time() - expected)
+            self._samples.append(lag)
+            if lag > self._warn_threshold:
+                logger.warning(f"Event loop lag {lag * 1000:.1f} ms")
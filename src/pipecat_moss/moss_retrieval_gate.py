@@ -0,0 +1,128 @@
+#
+# Copyright (c) 2024-2025, Daily
+#
+# SPDX-License-Identifier: BSD 2-Clause License
+#
+
+"""Cheap heuristics that decide whether a user turn is worth retrieving for."""
+
+from __future__ import annotations
+
+from collections import deque
+from collections.abc import Awaitable, Callable, Iterable
+from difflib import SequenceMatcher
+
+from .moss_query_cache import normalize_query
+
+__all__ = ["DEFAULT_STOP_PHRASES", "RetrievalGate", "RetrievalPredicate"]
+
+RetrievalPredicate = Callable[[str], Awaitable[bool]]
+
+DEFAULT_STOP_PHRASES = frozenset(
+    {
+        "bye",
+        "cool",
+        "go ahead",
+        "goodbye",
+        "got it",
+        "great",
+        "hang on",
+        "hello",
+        "hey",
+        "hi",
+        "hold on",
+        "mm hmm",
+        "no",
+        "no thanks",
+        "nope",
+        "ok",
+        "okay",
+        "one moment",
+        "one second",
+        "perfect",
+        "right",
+        "sure",
+        "thank you",
+        "thanks",
+        "uh huh",
+        "wait",
+        "yeah",
+        "yep",
+        "yes",
+    }
+)
+
+
+class RetrievalGate:
+    """Decide before querying Moss whether a user turn needs retrieval.
+
+    A turn is skipped when it has fewer than ``min_tokens`` words, when it is
+    only a backchannel or stop phrase (possibly repeated, e.g. "okay okay
+    thanks"), or when it is nearly identical to one of the last
+    ``repeat_window`` queries that were retrieved for. If all built-in checks
+    pass, the optional async ``predicate`` gets the final say.
+
+    A query only counts as retrieved for once the caller reports it with
+    ``mark_retrieved()``, so a turn whose retrieval timed out or failed can be
+    asked again. The recent queries belong to one conversation: give each
+    processor its own gate and never share one across pipelines.
+    """
+
+    def __init__(
+        self,
+        *,
+        min_tokens: int = 1,
+        stop_phrases: Iterable[str] = DEFAULT_STOP_PHRASES,
+        repeat_window: int = 3,
+        repeat_similarity: float = 0.9,
+        predicate: RetrievalPredicate | None = None,
+    ):
+        """Configure the gating heuristics.
+
+        Args:
+            min_tokens: Minimum number of words a turn needs to be retrieved for.
+            stop_phrases: Phrases that never need retrieval on their own.
+            repeat_window: Number of recent retrieved queries to compare against.
+            repeat_similarity: Similarity (0..1) above which a turn repeats a
+                recent query.
+            predicate: Async callable returning ``False`` to skip a turn.
+        """
+        self._min_tokens = min_tokens
+        self._stop_phrases = {normalize_query(p) for p in stop_phrases}
+        self._recent: deque[str] = deque(maxlen=repeat_window)
+        self._repeat_similarity = repeat_similarity
+        self._predicate = predicate
+
+    async def skip_reason(self, query: str) -> str | None:
+        """Return why ``query`` should be skipped, or ``None`` to retrieve."""
+        normalized = normalize_query(query)
+        words = normalized.split()
+
+        if len(words) < self._min_tokens:
+            return "too_short"
+        if self._is_stop_phrase(words):
+            return "stop_phrase"
+        for previous in self._recent:
+            if SequenceMatcher(None, previous, normalized).ratio() >= self._repeat_similarity:
+                return "repeated"
+        if self._predicate is not None and not await self._predicate(query):
+            return "predicate"
+        return None
+
+    def mark_retrieved(self, query: str):
+        """Remember ``query`` for the repeated-intent check once it was retrieved for."""
+        self._recent.append(normalize_query(query))
+
+    def _is_stop_phrase(self, words: list[str]) -> bool:
+        """Return whether the words are made up entirely of stop phrases."""
+        # Greedy longest-match over the words, so "ok thanks" and "yes yes" count.
+        longest = max((len(p.split()) for p in self._stop_phrases), default=0)
+        i = 0
+        while i < len(words):
+            for size in range(min(longest, len(words) - i), 0, -1):
+                if " ".join(words[i : i + size]) in self._stop_phrases:
+                    i += size
+                    break
+            else:
+                return False
+        return True
@@ -8,10 +8,46 @@
 
 from __future__ import annotations
 
-from inferedge_moss import MossClient
+import asyncio
+import os
+from collections.abc import Callable, Sequence
+from typing import TYPE_CHECKING
+
 from loguru import logger
 
-from .moss_index_processor import MossIndexProcessor
+from .moss_circuit_breaker import MossCircuitBreaker
+from .moss_document_packer import DocumentPacker
+from .moss_index_manager import IndexEvent, IndexStats, MossIndexManager
+from .moss_index_snapshot import MossIndexSnapshotCache, SnapshotCacheStats
+from .moss_query_batcher import MossQueryBatcher, QueryBatcherStats, QueryClient
+from .moss_query_builder import ConversationQueryBuilder
+from .moss_query_cache import MossQueryCache, QueryCacheStats
+from .moss_query_executor import (
+    EventLoopLagMonitor,
+    LoopLagStats,
+    MossQueryExecutor,
+    QueryExecutorStats,
+)
+from .moss_retrieval_gate import RetrievalGate
+from .moss_retrieval_trace import (
+    IndexLatencySummary,
+    RetrievalLatencyAggregator,
+    RetrievalSink,
+)
+from .moss_sdk_adapter import sdk_internals
+
+if TYPE_CHECKING:
+    from inferedge_moss import MossClient
+    from pipecat.adapters.schemas.function_schema import FunctionSchema
+    from pipecat.services.llm_service import LLMService
+
+    from .moss_index_processor import MossIndexProcessor
+    from .moss_multi_index_processor import (
+        DedupeKey,
+        FusionMethod,
+        MossIndexQuery,
+        MossMultiIndexProcessor,
+    )
 
 __all__ = ["MossRetrievalService"]
 
@@ -25,35 +61,397 @@ class MossRetrievalService:
         project_id: str | None = None,
         project_key: str | None = None,
         system_prompt: str = "Here is additional context retrieved from database:\n\n",
+        cache_max_size: int = 1024,
+        cache_ttl: float | None = 300.0,
+        circuit_breaker_threshold: int | None = 5,
+        circuit_breaker_reset: float = 30.0,
+        batch_window: float | None = None,
+        batch_max_size: int = 16,
+        query_workers: int | None = None,
+        query_max_pending: int | None = None,
+        monitor_loop_lag: bool = False,
+        snapshot_dir: str | os.PathLike[str] | None = None,
+        refresh_interval: float | None = None,
+        max_index_memory: int | None = None,
+        on_index_event: Callable[[IndexEvent], None] | None = None,
+        retrieval_sinks: Sequence[RetrievalSink] = (),
+        client_factory: Callable[[], MossClient] | None = None,
     ):
-        """Store shared client and default retrieval settings."""
-        self._client = MossClient(project_id=project_id, project_key=project_key)
+        """Store shared client and default retrieval settings.
+
+        Every processor created by this service shares one query-result cache
+        holding up to ``cache_max_size`` results for ``cache_ttl`` seconds. Set
+        ``cache_max_size`` to ``0`` to disable caching.
+
+        Retrieval against an index is skipped after ``circuit_breaker_threshold``
+        consecutive failures or timeouts and re-probed after
+        ``circuit_breaker_reset`` seconds. Set the threshold to ``None`` to
+        disable the circuit breaker.
+
+        With ``batch_window`` set, queries from every processor are collected for
+        up to that many seconds (or until ``batch_max_size`` are waiting) and
+        dispatched together as one batch.
+
+        With ``query_workers`` set, searches run on a pool of that many threads
+        instead of the event loop. At most ``query_max_pending`` queries are
+        handed to the pool at once; further callers wait for a free slot. Set
+        ``monitor_loop_lag`` to sample event-loop lag once an index is loaded.
+
+        With ``snapshot_dir`` set, loaded indexes are kept on local disk keyed by
+        name and version, and later loads of an unchanged index read them from
+        there instead of downloading them again.
+
+        With ``refresh_interval`` set, loaded indexes, including those loaded on
+        a processor's first query, are checked for a newer version every that
+        many seconds. A new version is loaded next to the
+        one being queried and swapped in atomically, and cached results for the
+        index are dropped.
+
+        Indexes that were not loaded with ``load_index`` are loaded the first
+        time a processor queries them. With ``max_index_memory`` set (in bytes),
+        least-recently-used indexes are unloaded once the approximate memory of
+        the loaded indexes exceeds it; indexes loaded with ``pin=True`` stay.
+        ``on_index_event`` is called for every load, refresh and eviction.
+
+        Every retrieval turn's stage timings are kept for ``retrieval_latency``
+        and passed to each of ``retrieval_sinks``, e.g. an
+        ``OpenTelemetryRetrievalSink`` or ``PrometheusRetrievalSink``.
+
+        ``client_factory`` creates the Moss clients the service uses; pass one
+        returning a ``FakeMossClient`` to run without a Moss project.
+
+        Construction is cheap: the Moss SDK is imported and the first client
+        created when an index is first loaded, or ahead of time by ``warmup()``.
+        """
+        self._project_id = project_id
+        self._project_key = project_key
+        self._client_factory = client_factory
+        # Created on first use; later clients share its embedding models.
+        self._client: MossClient | None = None
         self._system_prompt = system_prompt
+        self._cache = (
+            MossQueryCache(max_size=cache_max_size, ttl=cache_ttl) if cache_max_size > 0 else None
+        )
+        self._circuit_breaker_threshold = circuit_breaker_threshold
+        self._circuit_breaker_reset = circuit_breaker_reset
+        self._circuit_breakers: dict[str, MossCircuitBreaker] = {}
+        self._snapshots = MossIndexSnapshotCache(snapshot_dir) if snapshot_dir else None
+        self._executor = (
+            MossQueryExecutor(max_workers=query_workers, max_pending=query_max_pending)
+            if query_workers
+            else None
+        )
+        self._indexes = MossIndexManager(
+            None,
+            self._new_client,
+            snapshots=self._snapshots,
+            executor=self._executor,
+            max_memory=max_index_memory,
+            refresh_interval=refresh_interval,
+            on_swap=self.invalidate_cache,
+            on_event=on_index_event,
+        )
+        self._batcher = (
+            MossQueryBatcher(
+                self._indexes,
+                max_batch_size=batch_max_size,
+                max_wait=batch_window,
+            )
+            if batch_window is not None
+            else None
+        )
+        self._loop_lag_monitor = EventLoopLagMonitor() if monitor_loop_lag else None
+        self._latency = RetrievalLatencyAggregator()
+        self._sinks: list[RetrievalSink] = [self._latency, *retrieval_sinks]
         logger.debug("Initialized MossRetrievalService for project")
 
-    async def load_index(self, index_name: str):
-        """Explicitly load an index before using the pipeline."""
+    async def warmup(self, index_names: Sequence[str] = (), *, pin: bool = False):
+        """Do the Moss setup the first turn would otherwise wait for.
+
+        Imports the Moss SDK and creates the client in a worker thread, so the
+        event loop stays free (e.g. to connect the transport), then loads
+        ``index_names`` concurrently.
+        """
+        if self._client is None:
+            await asyncio.to_thread(self._shared_client)
+        await asyncio.gather(*(self.load_index(name, pin=pin) for name in index_names))
+
+    async def load_index(self, index_name: str, *, pin: bool = False):
+        """Explicitly load an index before using the pipeline.
+
+        With ``pin`` set, the index is never unloaded to stay under
+        ``max_index_memory``.
+        """
+        if self._loop_lag_monitor:
+            self._loop_lag_monitor.start()
         try:
             logger.debug(f"Loading index: {index_name}")
-            await self._client.load_index(index_name)
+            if pin:
+                self._indexes.pin(index_name)
+            await self._indexes.load(index_name)
             logger.debug(f"Index loaded: {index_name}")
         except Exception as exc:  # pragma: no cover - pass-through
             logger.error(f"Failed to load index {index_name}: {exc}")
             raise exc
 
+    async def refresh_index(self, index_name: str, *, force: bool = False) -> bool:
+        """Swap in the latest version of ``index_name`` if it changed.
+
+        Processors keep querying the current version until the new one is fully
+        loaded. Returns whether a new version was swapped in.
+        """
+        return await self._indexes.refresh(index_name, force=force)
+
+    def unload_index(self, index_name: str) -> bool:
+        """Unload ``index_name``; it is loaded again if a processor queries it."""
+        self._indexes.unpin(index_name)
+        return self._indexes.evict(index_name)
+
+    async def close(self):
+        """Stop background work, flush pending batches and release worker threads."""
+        await self._indexes.stop_refresh()
+        if self._batcher:
+            await self._batcher.close()
+        if self._loop_lag_monitor:
+            await self._loop_lag_monitor.stop()
+        if self._executor:
+            self._executor.shutdown()
+
+    @property
+    def cache_stats(self) -> QueryCacheStats | None:
+        """Return hit/miss counters for the shared query cache, if enabled."""
+        return self._cache.stats if self._cache is not None else None
+
+    @property
+    def batch_stats(self) -> QueryBatcherStats | None:
+        """Return queue depth, batch size and added wait counters, if batching."""
+        return self._batcher.stats if self._batcher else None
+
+    @property
+    def index_stats(self) -> dict[str, IndexStats]:
+        """Return memory, usage, version and refresh counters for each loaded index."""
+        return self._indexes.stats
+
+    @property
+    def index_events(self) -> list[IndexEvent]:
+        """Return recent index load, refresh and eviction events."""
+        return self._indexes.events
+
+    @property
+    def snapshot_stats(self) -> SnapshotCacheStats | None:
+        """Return hit, bytes read and load time counters for index snapshots."""
+        return self._snapshots.stats if self._snapshots else None
+
+    @property
+    def executor_stats(self) -> QueryExecutorStats | None:
+        """Return worker-pool occupancy and backpressure counters, if enabled."""
+        return self._executor.stats if self._executor else None
+
+    @property
+    def loop_lag_stats(self) -> LoopLagStats | None:
+        """Return event-loop lag statistics, if monitoring is enabled."""
+        return self._loop_lag_monitor.stats if self._loop_lag_monitor else None
+
+    @property
+    def retrieval_latency(self) -> dict[str, IndexLatencySummary]:
+        """Return p50/p95/p99 stage latencies and outcome counts for each index."""
+        return self._latency.summary()
+
+    @property
+    def _query_client(self) -> QueryClient:
+        """Return the client processors send their queries through."""
+        return self._batcher or self._indexes
+
+    def _create_client(self) -> MossClient:
+        if self._client_factory:
+            return self._client_factory()
+        from inferedge_moss import MossClient
+
+        return MossClient(project_id=self._project_id, project_key=self._project_key)
+
+    def _shared_client(self) -> MossClient:
+        """Return the client whose embedding models every other client shares."""
+        if self._client is None:
+            self._client = self._create_client()
+        return self._client
+
+    def _new_client(self) -> MossClient:
+        """Create a client to hold one loaded index, sharing embedding models."""
+        shared_client = self._shared_client()
+        client = self._create_client()
+        shared = sdk_internals(shared_client)
+        target = sdk_internals(client)
+        if shared is not None and target is not None:
+            # Each client would otherwise load its own copy of the embedding model.
+            target.share_embedding_models(shared)
+        return client
+
+    def invalidate_cache(self, index_name: str | None = None):
+        """Drop cached results after an index was loaded or updated."""
+        if self._cache is not None:
+            self._cache.invalidate(index_name)
+
+    def circuit_breaker(self, index_name: str) -> MossCircuitBreaker | None:
+        """Return the circuit breaker shared by processors of an index."""
+        if self._circuit_breaker_threshold is None:
+            return None
+        breaker = self._circuit_breakers.get(index_name)
+        if breaker is None:
+            breaker = MossCircuitBreaker(
+                index_name,
+                failure_threshold=self._circuit_breaker_threshold,
+                reset_timeout=self._circuit_breaker_reset,
+            )
+            self._circuit_breakers[index_name] = breaker
+        return breaker
+
     def query(
         self,
         index_name: str,
         *,
         top_k: int = 5,
         alpha: float = 0.8,
+        speculative: bool = False,
+        speculative_min_similarity: float = 0.8,
+        query_timeout: float | None = None,
+        max_context_blocks: int | None = None,
+        packer: DocumentPacker | None = None,
+        gate: RetrievalGate | None = None,
+        faq_answer_threshold: float | None = None,
+        faq_answer_key: str = "answer",
+        query_builder: ConversationQueryBuilder | None = None,
+        embedding_cache_size: int = 64,
     ) -> MossIndexProcessor:
-        """Create a pipeline processor for a specific Moss index."""
+        """Create a pipeline processor for a specific Moss index.
+
+        Set ``speculative`` to start retrieval from interim transcriptions so the
+        query is already running (or finished) when the user turn ends.
+
+        With ``query_timeout`` set, a turn whose retrieval takes longer than that
+        many seconds goes to the LLM without retrieved passages.
+
+        ``max_context_blocks`` bounds how many retrieval messages the processor
+        keeps in the shared context; older ones are removed as new ones arrive.
+        A ``packer`` fits retrieved passages into a token budget by score, and
+        a ``gate`` skips retrieval for turns that do not need it.
+
+        With ``faq_answer_threshold`` set, a top result scoring at least that
+        much whose metadata holds a canned answer under ``faq_answer_key`` is
+        spoken directly, without running the LLM.
+
+        A ``query_builder`` adds recent turns, or a rolling summary of older
+        ones, to each query. Its parts are embedded once per session and cached
+        (up to ``embedding_cache_size``), so follow-up turns only embed what is
+        new. Give every processor its own builder.
+        """
+        from .moss_index_processor import MossIndexProcessor
+
         logger.debug(f"Creating MossIndexProcessor for index: {index_name}")
         return MossIndexProcessor(
-            client=self._client,
+            client=self._query_client,
             index_name=index_name,
             top_k=top_k,
             alpha=alpha,
             system_prompt=self._system_prompt,
+            speculative=speculative,
+            speculative_min_similarity=speculative_min_similarity,
+            cache=self._cache,
+            query_timeout=query_timeout,
+            circuit_breaker=self.circuit_breaker(index_name),
+            max_context_blocks=max_context_blocks,
+            packer=packer,
+            gate=gate,
+            faq_answer_threshold=faq_answer_threshold,
+            faq_answer_key=faq_answer_key,
+            sinks=self._sinks,
+            query_builder=query_builder,
+            embedding_cache_size=embedding_cache_size,
+        )
+
+    def query_many(
+        self,
+        indexes: Sequence[str | MossIndexQuery],
+        *,
+        fusion: FusionMethod = "rrf",
+        dedupe_by: DedupeKey = "text",
+        top_k: int | None = None,
+        speculative: bool = False,
+        speculative_min_similarity: float = 0.8,
+        query_timeout: float | None = None,
+        max_context_blocks: int | None = None,
+        packer: DocumentPacker | None = None,
+        gate: RetrievalGate | None = None,
+        query_builder: ConversationQueryBuilder | None = None,
+        embedding_cache_size: int = 64,
+    ) -> MossMultiIndexProcessor:
+        """Create a pipeline processor that queries several indexes concurrently.
+
+        Each entry is an index name or a ``MossIndexQuery`` with its own
+        ``top_k``, ``alpha`` and deadline. Results are merged with ``fusion``,
+        deduplicated by ``dedupe_by`` and injected as one context block.
+        ``query_builder`` and ``embedding_cache_size`` work as in ``query()``.
+        """
+        from .moss_multi_index_processor import MossIndexQuery, MossMultiIndexProcessor
+
+        specs = [
+            spec if isinstance(spec, MossIndexQuery) else MossIndexQuery(spec) for spec in indexes
+        ]
+        logger.debug(
+            f"Creating MossMultiIndexProcessor for indexes: {[s.index_name for s in specs]}"
+        )
+        breakers = {
+            spec.index_name: breaker
+            for spec in specs
+            if (breaker := self.circuit_breaker(spec.index_name))
+        }
+        return MossMultiIndexProcessor(
+            client=self._query_client,
+            indexes=specs,
+            fusion=fusion,
+            dedupe_by=dedupe_by,
+            top_k=top_k,
+            circuit_breakers=breakers,
+            system_prompt=self._system_prompt,
+            speculative=speculative,
+            speculative_min_similarity=speculative_min_similarity,
+            cache=self._cache,
+            query_timeout=query_timeout,
+            max_context_blocks=max_context_blocks,
+            packer=packer,
+            gate=gate,
+            sinks=self._sinks,
+            query_builder=query_builder,
+            embedding_cache_size=embedding_cache_size,
+        )
+
+    def register_tool(
+        self,
+        llm: LLMService,
+        index_names: str | Sequence[str],
+        *,
+        function_name: str = "search_knowledge_base",
+        description: str | None = None,
+        top_k: int = 5,
+        alpha: float = 0.8,
+        max_top_k: int = 10,
+        packer: DocumentPacker | None = None,
+    ) -> FunctionSchema:
+        """Let ``llm`` query Moss through function calling instead of every turn.
+
+        Registers a handler on ``llm`` and returns the tool schema, which must
+        be added to the context's tools (e.g. ``ToolsSchema(standard_tools=[schema])``).
+        The LLM passes the query text, and optionally an index and ``top_k``.
+        """
+        from .moss_retrieval_tool import MossRetrievalTool
+
+        if isinstance(index_names, str):
+            index_names = [index_names]
+        logger.debug(f"Registering Moss retrieval tool '{function_name}' for: {index_names}")
+        processors = {
+            name: self.query(name, top_k=top_k, alpha=alpha, packer=packer) for name in index_names
+        }
+        kwargs = {"description": description} if description else {}
+        tool = MossRetrievalTool(
+            processors, function_name=function_name, max_top_k=max_top_k, **kwargs
         )
+        return tool.register(llm)
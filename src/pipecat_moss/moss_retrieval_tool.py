@@ -0,0 +1,145 @@
+#
+# Copyright (c) 2024-2025, Daily
+#
+# SPDX-License-Identifier: BSD 2-Clause License
+#
+
+"""LLM function-calling tool that queries Moss only when the model asks for it."""
+
+from __future__ import annotations
+
+import time
+from collections.abc import Mapping
+from typing import TYPE_CHECKING
+
+from loguru import logger
+from pipecat.adapters.schemas.function_schema import FunctionSchema
+from pipecat.frames.frames import MetricsFrame
+from pipecat.metrics.metrics import ProcessingMetricsData
+
+from .moss_index_processor import MossIndexProcessor
+
+if TYPE_CHECKING:
+    from pipecat.services.llm_service import FunctionCallParams, LLMService
+
+__all__ = ["MossRetrievalTool"]
+
+
+class MossRetrievalTool:
+    """Expose Moss retrieval to an LLM as a function-calling tool.
+
+    Each index is served by a ``MossIndexProcessor`` that is used only for its
+    query path (cache, packing and formatting); it is not placed in the
+    pipeline. Results are returned to the LLM as the formatted passages the
+    processor would otherwise inject into the context.
+    """
+
+    def __init__(
+        self,
+        processors: Mapping[str, MossIndexProcessor],
+        *,
+        function_name: str = "search_knowledge_base",
+        description: str = (
+            "Search the knowledge base for passages that help answer the user's question. "
+            "Only call this when the answer depends on information you do not already have."
+        ),
+        max_top_k: int = 10,
+    ):
+        """Configure the tool schema.
+
+        Args:
+            processors: Processor to query for each index name the LLM may choose.
+            function_name: Name the LLM uses to call the tool.
+            description: Tool description shown to the LLM.
+            max_top_k: Largest ``top_k`` the LLM may request.
+        """
+        if not processors:
+            raise ValueError("MossRetrievalTool needs at least one index")
+        self._processors = dict(processors)
+        self._default_index = next(iter(self._processors))
+        self._function_name = function_name
+        self._description = description
+        self._max_top_k = max_top_k
+
+    @property
+    def schema(self) -> FunctionSchema:
+        """Return the function schema to add to the LLM context's tools."""
+        properties: dict = {
+            "query": {
+                "type": "string",
+                "description": "Self-contained search query describing what to look up.",
+            },
+            "top_k": {
+                "type": "integer",
+                "description": "Number of passages to retrieve.",
+                "minimum": 1,
+                "maximum": self._max_top_k,
+            },
+        }
+        if len(self._processors) > 1:
+            properties["index"] = {
+                "type": "string",
+                "description": "Knowledge base to search.",
+                "enum": list(self._processors),
+            }
+        return FunctionSchema(
+            name=self._function_name,
+            description=self._description,
+            properties=properties,
+            required=["query"],
+        )
+
+    def register(self, llm: LLMService) -> FunctionSchema:
+        """Register the tool handler with ``llm`` and return its schema."""
+        llm.register_function(self._function_name, self.handle_function_call)
+        return self.schema
+
+    async def handle_function_call(self, params: FunctionCallParams):
+        """Run the search requested by the LLM and return formatted passages."""
+        arguments = params.arguments
+        query = str(arguments.get("query") or "").strip()
+        index_name = arguments.get("index") or self._default_index
+        processor = self._processors.get(index_name)
+        if not query or processor is None:
+            await params.result_callback({"error": f"Invalid search request: {dict(arguments)}"})
+            return
+
+        top_k = self._parse_top_k(arguments.get("top_k"))
+
+        logger.debug(f"{processor}: Tool retrieval for query -> {query}")
+        start = time.perf_counter()
+        try:
+            result = await processor.retrieve_documents(query, top_k=top_k)
+        except Exception as exc:
+            logger.warning(f"{processor}: tool retrieval failed: {exc}")
+            await params.result_callback({"error": "Knowledge base search failed."})
+            return
+
+        if params.llm.metrics_enabled:
+            await params.llm.push_frame(
+                MetricsFrame(
+                    data=[
+                        ProcessingMetricsData(
+                            processor=processor.name,
+                            value=time.perf_counter() - start,
+                        )
+                    ]
+                )
+            )
+
+        documents = processor.pack_documents(query, result.docs)
+        if not documents:
+            await params.result_callback("No relevant passages found.")
+            return
+        await params.result_callback(processor.format_documents(documents))
+
+    def _parse_top_k(self, value: object) -> int | None:
+        """Clamp the LLM's ``top_k`` to the allowed range, or ``None`` for the default."""
+        if value is None:
+            return None
+        try:
+            top_k = int(value)  # type: ignore[call-overload]
+        except (TypeError, ValueError, OverflowError):
+            logger.debug(f"Ignoring invalid top_k {value!r} from the LLM")
+            return None
+        return max(1, min(top_k, self._max_top_k))
@@ -0,0 +1,186 @@
+#
+# Copyright (c) 2024-2025, Daily
+#
+# SPDX-License-Identifier: BSD 2-Clause License
+#
+
+"""Per-turn retrieval traces, trace sinks and latency percentile aggregation."""
+
+from __future__ import annotations
+
+import time
+from collections import Counter, defaultdict, deque
+from dataclasses import dataclass, field
+from typing import Literal, Protocol
+
+__all__ = [
+    "STAGES",
+    "IndexLatencySummary",
+    "RetrievalLatencyAggregator",
+    "RetrievalOutcome",
+    "RetrievalSink",
+    "RetrievalTrace",
+    "StagePercentiles",
+]
+
+RetrievalOutcome = Literal[
+    "injected",
+    "empty",
+    "short_circuit",
+    "skipped",
+    "duplicate",
+    "timeout",
+    "circuit_open",
+    "error",
+    "cancelled",
+]
+
+STAGES = ("wait", "query", "format", "inject", "total")
+
+
+@dataclass
+class RetrievalTrace:
+    """Timings and results of retrieval for one user turn.
+
+    Stage durations are in seconds and ``None`` when the stage did not run.
+
+    Parameters:
+        index_name: Index the trace covers; a multi-index turn has one trace per index.
+        processor: Name of the processor that produced the trace.
+        started_at_ns: Wall-clock time the context frame arrived, in ns.
+        received_at: ``time.perf_counter()`` when the context frame arrived.
+        outcome: What happened to the turn.
+        wait: From the context frame arriving to the query starting
+            (scheduling and gating).
+        query: Client-side wall time of the query, including queueing,
+            batching and the cache.
+        format: Pruning, packing and formatting of the results.
+        inject: Adding the passages to the context and pushing it on.
+        server_time: Search time reported by Moss, if any.
+        results: Number of documents returned.
+        scores: Scores of the returned documents, best first.
+        injected_tokens: Estimated tokens added to the context.
+    """
+
+    index_name: str
+    processor: str
+    started_at_ns: int = field(default_factory=time.time_ns)
+    received_at: float = field(default_factory=time.perf_counter)
+    outcome: RetrievalOutcome = "empty"
+    wait: float | None = None
+    query: float | None = None
+    format: float | None = None
+    inject: float | None = None
+    server_time: float | None = None
+    results: int = 0
+    scores: list[float] = field(default_factory=list)
+    injected_tokens: int = 0
+    _last_mark: float = field(init=False, repr=False)
+
+    def __post_init__(self):
+        """Start the first stage when the context frame arrived."""
+        self._last_mark = self.received_at
+
+    def mark(self, stage: str):
+        """Record the time since the previous stage ended as ``stage``'s duration."""
+        now = time.perf_counter()
+        setattr(self, stage, now - self._last_mark)
+        self._last_mark = now
+
+    @property
+    def total(self) -> float:
+        """Sum of the stages that ran."""
+        return sum(getattr(self, stage) or 0.0 for stage in STAGES[:-1])
+
+
+class RetrievalSink(Protocol):
+    """Receives a trace for every retrieval turn, e.g. to export it."""
+
+    def record(self, trace: RetrievalTrace):
+        """Handle one finished trace. Must not block the event loop."""
+        ...
+
+
+@dataclass
+class StagePercentiles:
+    """Latency percentiles of one stage, in seconds.
+
+    Parameters:
+        count: Number of samples in the window.
+        p50: Median.
+        p95: 95th percentile.
+        p99: 99th percentile.
+    """
+
+    count: int = 0
+    p50: float = 0.0
+    p95: float = 0.0
+    p99: float = 0.0
+
+
+@dataclass
+class IndexLatencySummary:
+    """Latency percentiles and outcome counts for one index.
+
+    Parameters:
+        stages: Percentiles for ``wait``, ``query``, ``format``, ``inject`` and ``total``.
+        outcomes: Number of turns per outcome since startup.
+    """
+
+    stages: dict[str, StagePercentiles]
+    outcomes: dict[str, int]
+
+
+class RetrievalLatencyAggregator:
+    """Keep recent stage latencies per index and report p50/p95/p99.
+
+    Percentiles are computed over the last ``window`` traces of each index
+    that ran a query to completion; cancelled turns only count as outcomes.
+    """
+
+    def __init__(self, window: int = 1024):
+        """Create the aggregator.
+
+        Args:
+            window: Number of recent samples kept per index and stage.
+        """
+        self._window = window
+        self._samples: dict[str, dict[str, deque[float]]] = defaultdict(
+            lambda: {stage: deque(maxlen=self._window) for stage in STAGES}
+        )
+        self._outcomes: dict[str, Counter[str]] = defaultdict(Counter)
+
+    def record(self, trace: RetrievalTrace):
+        """Add a trace to the window of its index."""
+        self._outcomes[trace.index_name][trace.outcome] += 1
+        if trace.query is None or trace.outcome == "cancelled":
+            return
+        samples = self._samples[trace.index_name]
+        for stage in STAGES:
+            value = getattr(trace, stage)
+            if value is not None:
+                samples[stage].append(value)
+
+    def summary(self) -> dict[str, IndexLatencySummary]:
+        """Return percentiles and outcome counts for every index seen."""
+        return {
+            index_name: IndexLatencySummary(
+                stages={
+                    stage: self._percentiles(values)
+                    for stage, values in self._samples.get(index_name, {}).items()
+                },
+                outcomes=dict(outcomes),
+            )
+            for index_name, outcomes in self._outcomes.items()
+        }
+
+    @staticmethod
+    def _percentiles(values: deque[float]) -> StagePercentiles:
+        if not values:
+            return StagePercentiles()
+        ordered = sorted(values)
+
+        def pick(q: float) -> float:
+            return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+        return StagePercentiles(len(ordered), pick(0.50), pick(0.95), pick(0.99))
@@ -0,0 +1,169 @@
+#
+# Copyright (c) 2024-2025, Daily
+#
+# SPDX-License-Identifier: BSD 2-Clause License
+#
+
+"""Version-checked access to Moss SDK internals.
+
+Some optimizations need state that ``inferedge_moss`` does not expose
+publicly: the serialized index bytes that on-disk snapshots store, the
+embedding model of a loaded index for batched and cached query embeddings,
+the loaded documents for memory estimates, and the embedding models that
+clients share. Every such access lives in this module, and it is only used
+with SDK versions whose private layout was checked against it. With any other
+version, or with a client that is not a ``MossClient`` (such as
+``FakeMossClient``), :func:`sdk_internals` returns ``None`` and callers use
+the public client API.
+"""
+
+from __future__ import annotations
+
+import sys
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any
+
+from loguru import logger
+
+if TYPE_CHECKING:
+    from inferedge_moss import DocumentInfo, MossClient
+
+__all__ = ["SUPPORTED_SDK_VERSIONS", "MossSdkInternals", "sdk_internals"]
+
+# inferedge-moss releases whose private layout this module matches.
+SUPPORTED_SDK_VERSIONS = frozenset({"1.0.0b8"})
+
+_warned_versions: set[str] = set()
+
+
+def sdk_internals(client: Any) -> MossSdkInternals | None:
+    """Return the private state of ``client``, or ``None`` if it is unsupported.
+
+    ``None`` is returned for objects that are not ``inferedge_moss.MossClient``
+    instances and for SDK versions outside :data:`SUPPORTED_SDK_VERSIONS`.
+    An unsupported version is logged once.
+    """
+    sdk = sys.modules.get("inferedge_moss")
+    if sdk is None or not isinstance(client, sdk.MossClient):
+        return None
+    version = getattr(sdk, "__version__", "unknown")
+    if version not in SUPPORTED_SDK_VERSIONS:
+        if version not in _warned_versions:
+            _warned_versions.add(version)
+            supported = ", ".join(sorted(SUPPORTED_SDK_VERSIONS))
+            logger.warning(
+                f"inferedge-moss {version} is not supported by pipecat-moss internals "
+                f"(supported: {supported}); using the public client API only"
+            )
+        return None
+    return MossSdkInternals(client)
+
+
+@dataclass
+class _Document:
+    id: str
+    text: str
+    metadata: dict[str, Any] | None
+    score: float
+
+
+@dataclass
+class _SearchResult:
+    docs: list[_Document]
+    query: str
+    index_name: str
+    time_taken_ms: int | None
+
+
+class MossSdkInternals:
+    """Private state of one ``MossClient`` from a supported SDK version.
+
+    Create instances with :func:`sdk_internals`, which checks the version.
+    """
+
+    def __init__(self, client: MossClient):
+        """Wrap ``client``.
+
+        Args:
+            client: Client from one of :data:`SUPPORTED_SDK_VERSIONS`.
+        """
+        self._service = client._internal
+        self._index_service = client._internal._index_service
+
+    def has_index(self, index_name: str) -> bool:
+        """Return whether ``index_name`` is loaded in this client."""
+        return self._service.has_index(index_name)
+
+    def index_documents(self, index_name: str) -> dict[str, DocumentInfo]:
+        """Return the documents of a loaded index, keyed by ID."""
+        return self._index_service._index_documents.get(index_name, {})
+
+    def index_model(self, index_name: str) -> str | None:
+        """Return the embedding model ID of a loaded index."""
+        return self._index_service._index_models.get(index_name)
+
+    async def embed(self, index_name: str, texts: list[str]) -> list[list[float]]:
+        """Embed ``texts`` in one call with the model of loaded index ``index_name``."""
+        model = await self._index_service._get_embedding_service(
+            self._index_service._index_models[index_name]
+        )
+        return await model.create_embeddings(texts)
+
+    def query_with_embedding(
+        self,
+        index_name: str,
+        query: str,
+        embedding: list[float],
+        top_k: int,
+        alpha: float | None,
+    ) -> _SearchResult:
+        """Search loaded index ``index_name`` without embedding ``query`` again."""
+        # Mirrors MossClient.query() after its embedding step.
+        index = self._index_service._indexes[index_name]
+        raw_result = index.query(query, top_k, embedding, alpha)
+        documents = self.index_documents(index_name)
+        docs = [
+            _Document(id=hit.id, text=doc.text, metadata=doc.metadata, score=hit.score)
+            for hit in raw_result.docs
+            if (doc := documents.get(hit.id)) is not None
+        ]
+        return _SearchResult(
+            docs=docs,
+            query=query,
+            index_name=index_name,
+            # Moss did not time this search; the caller measures its own latency.
+            time_taken_ms=None,
+        )
+
+    def share_embedding_models(self, other: MossSdkInternals):
+        """Use the embedding models ``other`` loads instead of loading separate copies."""
+        self._index_service._embedding_services = other._index_service._embedding_services
+
+    async def download_index(self, index_name: str) -> tuple[bytes, list[dict[str, Any]]]:
+        """Fetch the serialized index and its documents the way ``load_index`` does."""
+        import httpx
+
+        response = await self._service._cloud_client.make_request(
+            "getIndexUrl", {"indexName": index_name}
+        )
+        if not response or not response.get("indexUrl"):
+            raise ValueError(f"Index '{index_name}' not found or has no associated URL")
+
+        async with httpx.AsyncClient() as http:
+            index_response = await http.get(response["indexUrl"])
+            index_response.raise_for_status()
+            docs_response = await http.get(response["jsonUrl"])
+            docs_response.raise_for_status()
+        return index_response.content, docs_response.json() or []
+
+    async def install_index(self, index_bytes: bytes, documents: list[dict[str, Any]]):
+        """Load a serialized index and its documents into this client."""
+        from inferedge_moss import DocumentInfo
+        from moss_core import deserializeFromBinary
+
+        docs = [
+            DocumentInfo(id=d["id"], text=d["text"], metadata=d.get("metadata")) for d in documents
+        ]
+        await self._index_service.create_index_from_serialized(
+            deserializeFromBinary(index_bytes), docs
+        )
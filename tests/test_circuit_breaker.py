@@ -0,0 +1,152 @@
+#
+# Copyright (c) 2024-2025, Daily
+#
+# SPDX-License-Identifier: BSD 2-Clause License
+#
+
+import asyncio
+
+from pipecat_moss.moss_circuit_breaker import MossCircuitBreaker
+from pipecat_moss.moss_fake_client import FakeMossClient
+from pipecat_moss.moss_index_processor import MossIndexProcessor
+from pipecat_moss.moss_multi_index_processor import (
+    FusedSearchResult,
+    MossIndexQuery,
+    MossMultiIndexProcessor,
+)
+
+
+class HangingClient(FakeMossClient):
+    """Fake client whose queries never finish until cancelled."""
+
+    def __init__(self):
+        super().__init__(corpus_size=10)
+        self.started = asyncio.Event()
+
+    async def query(self, index_name, query, top_k=5, alpha=None):
+        self.started.set()
+        await asyncio.Event().wait()
+
+
+def half_open_breaker() -> MossCircuitBreaker:
+    breaker = MossCircuitBreaker("docs", failure_threshold=1, reset_timeout=0.0)
+    breaker.record_failure()
+    return breaker
+
+
+def test_opens_after_consecutive_failures():
+    breaker = MossCircuitBreaker("docs", failure_threshold=2, reset_timeout=60.0)
+    breaker.record_failure()
+    assert breaker.state == "closed"
+    assert breaker.allow_request()
+
+    breaker.record_failure()
+    assert breaker.state == "open"
+    assert not breaker.allow_request()
+
+
+def test_success_resets_failure_count():
+    breaker = MossCircuitBreaker("docs", failure_threshold=2, reset_timeout=60.0)
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    assert breaker.state == "closed"
+
+
+def test_half_open_lets_a_single_probe_through():
+    breaker = half_open_breaker()
+    assert breaker.allow_request()
+    assert breaker.state == "half_open"
+    assert not breaker.allow_request()
+
+
+def test_successful_probe_closes():
+    breaker = half_open_breaker()
+    assert breaker.allow_request()
+    breaker.record_success()
+    assert breaker.state == "closed"
+    assert breaker.allow_request()
+    assert breaker.allow_request()
+
+
+def test_failed_probe_reopens():
+    breaker = MossCircuitBreaker("docs", failure_threshold=1, reset_timeout=60.0)
+    breaker.record_failure()
+    breaker._opened_at -= 60.0
+    assert breaker.allow_request()
+    breaker.record_failure()
+    assert breaker.state == "open"
+    assert not breaker.allow_request()
+
+
+def test_released_probe_lets_the_next_request_probe():
+    breaker = half_open_breaker()
+    assert breaker.allow_request()
+    breaker.release_probe()
+    assert breaker.state == "half_open"
+    assert breaker.allow_request()
+
+
+def test_release_probe_is_a_no_op_when_closed_or_open():
+    breaker = MossCircuitBreaker("docs", failure_threshold=1, reset_timeout=60.0)
+    breaker.release_probe()
+    assert breaker.state == "closed"
+    breaker.record_failure()
+    breaker.release_probe()
+    assert not breaker.allow_request()
+
+
+def test_cancelled_probe_does_not_wedge_the_breaker():
+    async def run():
+        client = HangingClient()
+        await client.load_index("docs")
+        breaker = half_open_breaker()
+        processor = MossIndexProcessor(client, "docs", circuit_breaker=breaker)
+
+        probe = asyncio.create_task(processor._retrieve_with_fallback("refund policy"))
+        await client.started.wait()
+        assert not breaker.allow_request()
+
+        probe.cancel()
+        await asyncio.gather(probe, return_exceptions=True)
+        assert breaker.state == "half_open"
+        assert breaker.allow_request()
+
+    asyncio.run(run())
+
+
+def test_cancelled_multi_index_probe_does_not_wedge_the_breaker():
+    async def run():
+        client = HangingClient()
+        await client.load_index("docs")
+        breaker = half_open_breaker()
+        processor = MossMultiIndexProcessor(
+            client, [MossIndexQuery("docs")], circuit_breakers={"docs": breaker}
+        )
+
+        fused = FusedSearchResult(docs=[], query="refund policy")
+        probe = asyncio.create_task(
+            processor._search_one(MossIndexQuery("docs"), "refund policy", fused)
+        )
+        await client.started.wait()
+
+        probe.cancel()
+        await asyncio.gather(probe, return_exceptions=True)
+        assert breaker.allow_request()
+
+    asyncio.run(run())
+
+
+def test_failed_retrieval_is_recorded():
+    async def run():
+        client = FakeMossClient(corpus_size=10, latency=0.0, jitter=0.0, failure_rate=1.0)
+        await client.load_index("docs")
+        breaker = MossCircuitBreaker("docs", failure_threshold=1, reset_timeout=60.0)
+        processor = MossIndexProcessor(client, "docs", circuit_breaker=breaker)
+
+        assert await processor._retrieve_with_fallback("refund policy") is None
+        assert breaker.state == "open"
+        assert await processor._retrieve_with_fallback("refund policy") is None
+        assert client.stats.queries == 1
+
+    asyncio.run(run())
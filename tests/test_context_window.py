@@ -0,0 +1,91 @@
+#
+# Copyright (c) 2024-2025, Daily
+#
+# SPDX-License-Identifier: BSD 2-Clause License
+#
+
+import asyncio
+
+from inferedge_moss import DocumentInfo
+from pipecat.processors.aggregators.llm_context import LLMContext
+
+from pipecat_moss.moss_fake_client import FakeMossClient
+from pipecat_moss.moss_index_processor import MossIndexProcessor
+from pipecat_moss.moss_retrieval_trace import RetrievalTrace
+
+DOCUMENTS = {
+    "a": "refund policy",
+    "b": "refund timing",
+    "c": "shipping policy",
+    "d": "shipping abroad",
+    "e": "warranty claims",
+    "f": "warranty repairs",
+}
+
+
+def make_processor(max_context_blocks: int) -> MossIndexProcessor:
+    client = FakeMossClient(latency=0.0, jitter=0.0)
+    docs = [DocumentInfo(id=doc_id, text=text) for doc_id, text in DOCUMENTS.items()]
+    asyncio.run(client.create_index("docs", docs))
+    asyncio.run(client.load_index("docs"))
+    return MossIndexProcessor(client, "docs", top_k=2, max_context_blocks=max_context_blocks)
+
+
+def retrieve(processor: MossIndexProcessor, context: LLMContext, query: str):
+    asyncio.run(processor._augment_context(context, query, RetrievalTrace("docs", "test")))
+
+
+def retrieval_messages(context: LLMContext) -> list[str]:
+    return [m["content"] for m in context.get_messages() if m["role"] == "system"]
+
+
+def test_single_block_keeps_identical_results_in_place():
+    processor = make_processor(1)
+    context = LLMContext([{"role": "user", "content": "hi"}])
+    retrieve(processor, context, "refund")
+    before = retrieval_messages(context)
+
+    retrieve(processor, context, "refund")
+    assert retrieval_messages(context) == before
+    assert processor._expired_tokens == 0
+
+
+def test_single_block_reinjects_documents_of_the_expired_block():
+    processor = make_processor(1)
+    context = LLMContext([{"role": "user", "content": "hi"}])
+    retrieve(processor, context, "refund")
+    old_tokens = processor._context_blocks[0].tokens
+
+    retrieve(processor, context, "policy")
+    [message] = retrieval_messages(context)
+    assert "refund policy" in message
+    assert "shipping policy" in message
+    assert "refund timing" not in message
+    assert processor._expired_tokens == old_tokens - processor._count_tokens("refund policy")
+
+
+def test_several_blocks_expire_oldest_and_skip_known_documents():
+    processor = make_processor(2)
+    context = LLMContext([{"role": "user", "content": "hi"}])
+    retrieve(processor, context, "refund")
+    retrieve(processor, context, "shipping")
+    first_tokens = processor._context_blocks[0].tokens
+
+    # Both hits are already in the window: nothing is injected or expired.
+    retrieve(processor, context, "policy")
+    assert len(retrieval_messages(context)) == 2
+    assert processor._expired_tokens == 0
+
+    retrieve(processor, context, "warranty")
+    messages = retrieval_messages(context)
+    assert len(messages) == 2
+    assert "refund" not in messages[0]
+    assert "warranty" in messages[1]
+    assert processor._expired_tokens == first_tokens
+
+    # "shipping abroad" is in the block this injection expires, so it comes back.
+    retrieve(processor, context, "timing abroad")
+    messages = retrieval_messages(context)
+    assert len(messages) == 2
+    assert "refund timing" in messages[1]
+    assert "shipping abroad" in messages[1]
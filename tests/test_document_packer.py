@@ -0,0 +1,81 @@
+#
+# Copyright (c) 2024-2025, Daily
+#
+# SPDX-License-Identifier: BSD 2-Clause License
+#
+
+from dataclasses import dataclass
+
+from pipecat_moss.moss_document_packer import DocumentPacker, estimate_tokens
+
+
+@dataclass
+class Doc:
+    id: str
+    text: str
+    score: float | None
+    metadata: dict | None = None
+
+
+def test_packs_highest_score_first_within_budget():
+    docs = [Doc("low", "x" * 40, 0.2), Doc("high", "y" * 40, 0.9), Doc("mid", "z" * 40, 0.5)]
+    packed = DocumentPacker(max_tokens=20).pack("query", docs)
+
+    assert [d.id for d in packed] == ["high", "mid"]
+    assert sum(d.tokens for d in packed) <= 20
+
+
+def test_drops_documents_below_absolute_and_relative_cutoffs():
+    docs = [Doc("a", "alpha", 0.9), Doc("b", "beta", 0.5), Doc("c", "gamma", 0.3)]
+
+    assert [d.id for d in DocumentPacker(min_score=0.4).pack("q", docs)] == ["a", "b"]
+    assert [d.id for d in DocumentPacker(min_relative_score=0.6).pack("q", docs)] == ["a"]
+
+
+def test_unscored_documents_keep_their_order():
+    docs = [Doc("a", "alpha", None), Doc("b", "beta", None)]
+    packed = DocumentPacker(min_score=0.5).pack("q", docs)
+
+    assert [d.id for d in packed] == ["a", "b"]
+    assert packed[0].score is None
+
+
+def test_long_passage_is_trimmed_to_matching_sentences_in_order():
+    text = (
+        "Refunds are issued within five days. "
+        "Our office is closed on holidays. "
+        "Refunds go back to the original card."
+    )
+    packer = DocumentPacker(max_passage_tokens=estimate_tokens(text) - 5)
+    [packed] = packer.pack("how do refunds work", [Doc("a", text, 1.0)])
+
+    assert "holidays" not in packed.text
+    assert packed.text.startswith("Refunds are issued")
+    assert packed.text.endswith("original card.")
+    assert packed.tokens == estimate_tokens(packed.text)
+
+
+def test_trims_to_the_remaining_budget():
+    first = Doc("a", "a" * 60, 0.9)
+    second = Doc("b", "Refund details here. Unrelated filler text follows after that.", 0.8)
+    packed = DocumentPacker(max_tokens=20).pack("refund", [first, second])
+
+    assert [d.id for d in packed] == ["a", "b"]
+    assert packed[1].text == "Refund details here."
+    assert sum(d.tokens for d in packed) <= 20
+
+
+def test_oversized_sentence_keeps_the_longest_prefix_that_fits():
+    text = "one two three four five six seven eight nine ten"
+    [packed] = DocumentPacker(max_tokens=10, tokenizer=len).pack("q", [Doc("a", text, 1.0)])
+
+    assert packed.text == "one two"
+    assert packed.tokens <= 10
+
+
+def test_custom_tokenizer_sets_the_budget_unit():
+    docs = [Doc("a", "abcde", 0.9), Doc("b", "fghij", 0.8)]
+    packed = DocumentPacker(max_tokens=7, tokenizer=len).pack("q", docs)
+
+    assert [d.id for d in packed] == ["a"]
+    assert packed[0].tokens == 5
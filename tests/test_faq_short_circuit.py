@@ -0,0 +1,90 @@
+#
+# Copyright (c) 2024-2025, Daily
+#
+# SPDX-License-Identifier: BSD 2-Clause License
+#
+
+import asyncio
+
+from inferedge_moss import DocumentInfo
+from pipecat.frames.frames import LLMContextFrame, TTSSpeakFrame
+from pipecat.processors.aggregators.llm_context import LLMContext
+from pipecat.tests.utils import run_test
+
+from pipecat_moss.moss_fake_client import FakeMossClient
+from pipecat_moss.moss_index_processor import MossIndexProcessor
+
+ANSWER = "Refunds take five days."
+
+DOCUMENTS = [
+    DocumentInfo(id="refund", text="refund policy", metadata={"answer": f"  {ANSWER}\n"}),
+    DocumentInfo(id="shipping", text="shipping abroad"),
+]
+
+
+async def make_processor(**kwargs) -> MossIndexProcessor:
+    client = FakeMossClient(corpus_size=0, latency=0.0, jitter=0.0)
+    await client.create_index("faq", DOCUMENTS)
+    await client.load_index("faq")
+    return MossIndexProcessor(client, "faq", top_k=1, **kwargs)
+
+
+async def run_turn(processor: MossIndexProcessor, text: str, expected: list[type]) -> LLMContext:
+    context = LLMContext([{"role": "user", "content": text}])
+    await run_test(
+        processor,
+        frames_to_send=[LLMContextFrame(context=context)],
+        expected_down_frames=expected,
+    )
+    return context
+
+
+def test_confident_hit_with_an_answer_skips_the_llm():
+    async def run():
+        processor = await make_processor(faq_answer_threshold=0.9)
+        context = await run_turn(processor, "refund policy", [TTSSpeakFrame])
+
+        assert context.get_messages()[-1] == {"role": "assistant", "content": ANSWER}
+        assert (processor._faq_short_circuits, processor._faq_turns) == (1, 1)
+
+    asyncio.run(run())
+
+
+def test_hit_below_the_threshold_goes_to_the_llm():
+    async def run():
+        processor = await make_processor(faq_answer_threshold=0.9)
+        context = await run_turn(processor, "refund timing", [LLMContextFrame])
+
+        roles = [m["role"] for m in context.get_messages()]
+        assert roles == ["user", "system"]
+        assert (processor._faq_short_circuits, processor._faq_turns) == (0, 1)
+
+    asyncio.run(run())
+
+
+def test_confident_hit_without_an_answer_goes_to_the_llm():
+    async def run():
+        processor = await make_processor(faq_answer_threshold=0.9)
+        context = await run_turn(processor, "shipping abroad", [LLMContextFrame])
+
+        assert "shipping abroad" in context.get_messages()[-1]["content"]
+
+    asyncio.run(run())
+
+
+def test_answers_are_ignored_without_a_threshold():
+    async def run():
+        processor = await make_processor()
+        await run_turn(processor, "refund policy", [LLMContextFrame])
+
+        assert processor._faq_turns == 0
+
+    asyncio.run(run())
+
+
+def test_custom_answer_key():
+    async def run():
+        processor = await make_processor(faq_answer_threshold=0.9, faq_answer_key="reply")
+        await run_turn(processor, "refund policy", [LLMContextFrame])
+
+    asyncio.run(run())
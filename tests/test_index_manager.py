@@ -0,0 +1,107 @@
+#
+# Copyright (c) 2024-2025, Daily
+#
+# SPDX-License-Identifier: BSD 2-Clause License
+#
+
+import asyncio
+
+from pipecat_moss.moss_fake_client import FakeMossClient
+from pipecat_moss.moss_index_manager import MossIndexManager
+from pipecat_moss.moss_retrieval_service import MossRetrievalService
+
+INDEX_BYTES = 100
+
+
+def make_manager(max_memory: int | None = 250) -> MossIndexManager:
+    def factory() -> FakeMossClient:
+        return FakeMossClient(corpus_size=10, latency=0.0, jitter=0.0)
+
+    return MossIndexManager(
+        None,
+        factory,
+        max_memory=max_memory,
+        memory_estimator=lambda client, index_name: INDEX_BYTES,
+    )
+
+
+def test_least_recently_used_index_is_evicted_over_budget():
+    manager = make_manager()
+
+    async def run():
+        await manager.load("a")
+        await manager.load("b")
+        await manager.query("a", "x")
+        await manager.load("c")
+
+    asyncio.run(run())
+    assert [name for name in "abc" if manager.is_loaded(name)] == ["a", "c"]
+    assert manager.resident_bytes == 2 * INDEX_BYTES
+    assert [(e.kind, e.index_name) for e in manager.events][-1] == ("evict", "b")
+
+
+def test_pinned_indexes_are_never_evicted():
+    manager = make_manager(max_memory=150)
+    manager.pin("a")
+
+    async def run():
+        await manager.load("a")
+        await manager.load("b")
+        await manager.load("c")
+
+    asyncio.run(run())
+    assert [name for name in "abc" if manager.is_loaded(name)] == ["a", "c"]
+    assert manager.stats["a"].pinned
+
+
+def test_evicted_index_is_loaded_again_on_its_next_query():
+    manager = make_manager(max_memory=100)
+
+    async def run():
+        await manager.query("a", "x")
+        await manager.query("b", "x")
+        assert not manager.is_loaded("a")
+        result = await manager.query("a", "x", top_k=3)
+        assert len(result.docs) == 3
+
+    asyncio.run(run())
+    assert [e.kind for e in manager.events].count("load") == 3
+    assert manager.is_loaded("a") and not manager.is_loaded("b")
+
+
+def test_concurrent_first_queries_share_one_load():
+    loads = []
+
+    def factory() -> FakeMossClient:
+        client = FakeMossClient(corpus_size=10, latency=0.0, jitter=0.0, load_latency=0.02)
+        loads.append(client)
+        return client
+
+    manager = MossIndexManager(None, factory)
+
+    async def run():
+        await asyncio.gather(*(manager.query("a", "x") for _ in range(5)))
+
+    asyncio.run(run())
+    assert len(loads) == 1
+    assert manager.stats["a"].queries == 5
+
+
+def test_service_unloads_and_reloads_indexes():
+    service = MossRetrievalService(
+        client_factory=lambda: FakeMossClient(corpus_size=10, latency=0.0, jitter=0.0)
+    )
+    processor = service.query("a", top_k=2)
+
+    async def run():
+        await service.load_index("a", pin=True)
+        assert service.index_stats["a"].pinned
+        assert service.unload_index("a")
+        assert "a" not in service.index_stats
+
+        result = await processor.retrieve_documents("x")
+        assert len(result.docs) == 2
+        assert not service.index_stats["a"].pinned
+        await service.close()
+
+    asyncio.run(run())
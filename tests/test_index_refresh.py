@@ -0,0 +1,145 @@
+#
+# Copyright (c) 2024-2025, Daily
+#
+# SPDX-License-Identifier: BSD 2-Clause License
+#
+
+import asyncio
+
+import pytest
+from inferedge_moss import DocumentInfo
+
+from pipecat_moss.moss_fake_client import FakeMossClient
+from pipecat_moss.moss_index_manager import MossIndexManager
+from pipecat_moss.moss_retrieval_service import MossRetrievalService
+
+
+class ProjectClient(FakeMossClient):
+    """Client that loads the current version of each index from a shared project."""
+
+    def __init__(self, project: FakeMossClient, load_latency: float = 0.0):
+        super().__init__(corpus_size=0, latency=0.0, jitter=0.0, load_latency=load_latency)
+        self._project = project
+
+    async def get_index(self, index_name: str):
+        return await self._project.get_index(index_name)
+
+    async def load_index(self, index_name: str) -> str:
+        docs = await self._project.get_docs(index_name)
+        await self.create_index(index_name, docs)
+        return await super().load_index(index_name)
+
+
+def make_project() -> FakeMossClient:
+    project = FakeMossClient(corpus_size=0)
+    asyncio.run(project.create_index("docs", [DocumentInfo(id="old", text="refund policy")]))
+    return project
+
+
+def make_manager(project: FakeMossClient, **kwargs) -> MossIndexManager:
+    load_latency = kwargs.pop("load_latency", 0.0)
+    return MossIndexManager(project, lambda: ProjectClient(project, load_latency), **kwargs)
+
+
+async def doc_ids(manager: MossIndexManager) -> list[str]:
+    result = await manager.query("docs", "refund", top_k=5)
+    return sorted(doc.id for doc in result.docs)
+
+
+def test_refresh_swaps_in_a_new_version_only_when_it_changed():
+    project = make_project()
+    swapped = []
+    manager = make_manager(project, on_swap=swapped.append)
+
+    async def run():
+        await manager.load("docs")
+        assert await doc_ids(manager) == ["old"]
+
+        await project.add_docs("docs", [DocumentInfo(id="new", text="refund timing")])
+        assert await manager.refresh("docs")
+        assert await doc_ids(manager) == ["new", "old"]
+        assert not await manager.refresh("docs")
+
+    asyncio.run(run())
+    stats = manager.stats["docs"]
+    assert stats.version == "2"
+    assert stats.refreshes == 1
+    assert [event.kind for event in manager.events] == ["load", "refresh"]
+    assert swapped == ["docs", "docs"]
+
+
+def test_queries_use_the_old_version_while_the_new_one_loads():
+    project = make_project()
+    manager = make_manager(project, load_latency=0.05)
+
+    async def run():
+        await manager.load("docs")
+        await project.add_docs("docs", [DocumentInfo(id="new", text="refund timing")])
+        refresh = asyncio.create_task(manager.refresh("docs"))
+        await asyncio.sleep(0.01)
+
+        assert await doc_ids(manager) == ["old"]
+        assert not refresh.done()
+        assert await refresh
+        assert await doc_ids(manager) == ["new", "old"]
+
+    asyncio.run(run())
+
+
+def test_failed_refresh_keeps_serving_the_current_version(monkeypatch):
+    project = make_project()
+    manager = make_manager(project)
+
+    async def unavailable(index_name: str):
+        raise ConnectionError("Moss unavailable")
+
+    async def run():
+        await manager.load("docs")
+        monkeypatch.setattr(project, "get_index", unavailable)
+        with pytest.raises(ConnectionError):
+            await manager.refresh("docs")
+        assert await doc_ids(manager) == ["old"]
+
+    asyncio.run(run())
+    assert manager.stats["docs"].failures == 1
+
+
+def test_background_refresh_picks_up_new_versions():
+    project = make_project()
+    manager = make_manager(project)
+
+    async def run():
+        manager.start_refresh(0.01)
+        await manager.load("docs")
+        await asyncio.sleep(0.05)
+        assert manager.stats["docs"].refreshes == 0
+
+        await project.add_docs("docs", [DocumentInfo(id="new", text="refund timing")])
+        await asyncio.sleep(0.1)
+        await manager.stop_refresh()
+        assert await doc_ids(manager) == ["new", "old"]
+
+    asyncio.run(run())
+    assert manager.stats["docs"].version == "2"
+    assert manager.stats["docs"].refreshes == 1
+
+
+def test_indexes_loaded_by_a_first_query_are_refreshed():
+    project = make_project()
+    service = MossRetrievalService(
+        client_factory=lambda: ProjectClient(project), refresh_interval=0.01, cache_max_size=0
+    )
+    processor = service.query("docs", top_k=5)
+
+    async def run():
+        result = await processor.retrieve_documents("refund")
+        assert [doc.id for doc in result.docs] == ["old"]
+
+        await project.add_docs("docs", [DocumentInfo(id="new", text="refund timing")])
+        await asyncio.sleep(0.1)
+        result = await processor.retrieve_documents("refund")
+        await service.close()
+        assert sorted(doc.id for doc in result.docs) == ["new", "old"]
+
+    asyncio.run(run())
+    assert service.index_stats["docs"].refreshes == 1
@@ -0,0 +1,37 @@
+#
+# Copyright (c) 2024-2025, Daily
+#
+# SPDX-License-Identifier: BSD 2-Clause License
+#
+
+import asyncio
+
+from pipecat_moss.moss_index_snapshot import MossIndexSnapshotCache
+
+DOCUMENTS = [{"id": "1", "text": "Refunds take five days.", "metadata": {"lang": "en"}}]
+
+
+def test_snapshot_round_trip(tmp_path):
+    cache = MossIndexSnapshotCache(tmp_path)
+    path = cache._path("docs", "v1")
+    path.parent.mkdir(parents=True)
+    written = MossIndexSnapshotCache._write(path, b"\x00index\xff", DOCUMENTS)
+
+    payload = asyncio.run(cache._read_snapshot(path))
+    assert payload == (b"\x00index\xff", DOCUMENTS)
+    assert cache.stats.bytes_read == written
+    assert cache.stats.corrupt == 0
+
+
+def test_corrupt_snapshot_is_discarded(tmp_path):
+    cache = MossIndexSnapshotCache(tmp_path)
+    path = cache._path("docs", "v1")
+    path.parent.mkdir(parents=True)
+    MossIndexSnapshotCache._write(path, b"index", DOCUMENTS)
+    data = bytearray(path.read_bytes())
+    data[-1] ^= 0xFF
+    path.write_bytes(bytes(data))
+
+    assert asyncio.run(cache._read_snapshot(path)) is None
+    assert cache.stats.corrupt == 1
+    assert not path.exists()
@@ -0,0 +1,154 @@
+#
+# Copyright (c) 2024-2025, Daily
+#
+# SPDX-License-Identifier: BSD 2-Clause License
+#
+
+import asyncio
+import json
+
+import pytest
+from inferedge_moss import DocumentInfo
+
+from pipecat_moss.moss_fake_client import FakeMossClient
+from pipecat_moss.moss_index_sync import MossIndexSync
+from pipecat_moss.moss_ingest import IngestRecord
+
+
+class RecordingClient(FakeMossClient):
+    """Fake client that records document reads and writes, and can fail deletes."""
+
+    def __init__(self, fail_deletes: bool = False):
+        super().__init__(corpus_size=0, latency=0.0, jitter=0.0)
+        self.fail_deletes = fail_deletes
+        self.reads = 0
+        self.added: list[str] = []
+        self.deleted: list[str] = []
+
+    async def get_docs(self, index_name, options=None):
+        self.reads += 1
+        return await super().get_docs(index_name, options)
+
+    async def add_docs(self, index_name, docs, options=None):
+        self.added += [doc.id for doc in docs]
+        return await super().add_docs(index_name, docs, options)
+
+    async def delete_docs(self, index_name, doc_ids):
+        if self.fail_deletes:
+            raise RuntimeError("delete failed")
+        self.deleted += doc_ids
+        return await super().delete_docs(index_name, doc_ids)
+
+
+INDEXED = [
+    DocumentInfo(id="a", text="Refunds take five days."),
+    DocumentInfo(id="b", text="Shipping is free."),
+    DocumentInfo(id="c", text="Warranty lasts a year."),
+]
+
+RECORDS = [
+    IngestRecord(id="a", text="Refunds take five days."),
+    IngestRecord(id="b", text="Shipping is free over $50."),
+    IngestRecord(id="d", text="Support is open on weekdays."),
+]
+
+
+def make_client(**kwargs) -> RecordingClient:
+    client = RecordingClient(**kwargs)
+    asyncio.run(client.create_index("docs", INDEXED))
+    return client
+
+
+def test_sends_only_added_updated_and_deleted_documents():
+    client = make_client()
+    result = asyncio.run(MossIndexSync(client, "docs").sync(RECORDS))
+
+    assert (result.added, result.updated, result.deleted) == (["d"], ["b"], ["c"])
+    assert result.unchanged == 1
+    assert sorted(client.added) == ["b", "d"]
+    assert client.deleted == ["c"]
+
+    again = asyncio.run(MossIndexSync(client, "docs").sync(RECORDS))
+    assert again.changed == 0
+    assert again.unchanged == 3
+    assert sorted(client.added) == ["b", "d"]
+
+
+def test_metadata_changes_count_as_updates():
+    client = make_client()
+    records = [IngestRecord(id=doc.id, text=doc.text, metadata={"v": "2"}) for doc in INDEXED]
+    result = asyncio.run(MossIndexSync(client, "docs").sync(records))
+
+    assert result.updated == ["a", "b", "c"]
+
+
+def test_dry_run_sends_nothing():
+    client = make_client()
+    result = asyncio.run(MossIndexSync(client, "docs").sync(RECORDS, dry_run=True))
+
+    assert result.changed == 3
+    assert client.added == client.deleted == []
+
+
+def test_keep_missing_documents():
+    client = make_client()
+    result = asyncio.run(MossIndexSync(client, "docs", delete_missing=False).sync(RECORDS))
+
+    assert result.deleted == []
+    assert client.deleted == []
+
+
+def test_manifest_replaces_reading_the_index(tmp_path):
+    client = make_client()
+    manifest = tmp_path / "manifest.json"
+    asyncio.run(MossIndexSync(client, "docs", manifest_path=manifest).sync(RECORDS))
+    reads = client.reads
+
+    result = asyncio.run(MossIndexSync(client, "docs", manifest_path=manifest).sync(RECORDS))
+    assert result.changed == 0
+    assert client.reads == reads
+    assert sorted(json.loads(manifest.read_text())["hashes"]) == ["a", "b", "d"]
+
+
+def test_failed_sync_resends_only_what_did_not_land(tmp_path):
+    client = make_client(fail_deletes=True)
+    manifest = tmp_path / "manifest.json"
+    # Seed the manifest with the indexed documents.
+    asyncio.run(
+        MossIndexSync(client, "docs", manifest_path=manifest).sync(
+            [IngestRecord(id=doc.id, text=doc.text) for doc in INDEXED]
+        )
+    )
+    client.added.clear()
+
+    failing = MossIndexSync(client, "docs", manifest_path=manifest, max_retries=1)
+    with pytest.raises(RuntimeError, match="delete failed"):
+        asyncio.run(failing.sync(RECORDS))
+    assert sorted(client.added) == ["b", "d"]
+
+    client.fail_deletes = False
+    result = asyncio.run(MossIndexSync(client, "docs", manifest_path=manifest).sync(RECORDS))
+    assert (result.added, result.updated, result.deleted) == ([], [], ["c"])
+    assert sorted(client.added) == ["b", "d"]
+
+
+def test_manifest_of_another_index_is_rejected(tmp_path):
+    manifest = tmp_path / "manifest.json"
+    manifest.write_text(json.dumps({"index_name": "other", "hashes": {}}))
+
+    with pytest.raises(ValueError, match="belongs to index other"):
+        asyncio.run(MossIndexSync(make_client(), "docs", manifest_path=manifest).sync(RECORDS))
+
+
+def test_chunked_records_sync_per_chunk():
+    client = FakeMossClient(corpus_size=0, latency=0.0, jitter=0.0)
+    asyncio.run(client.create_index("docs", []))
+    text = " ".join(f"Sentence number {i} is here." for i in range(10))
+    sync = MossIndexSync(client, "docs", chunk_size=80, chunk_overlap=0)
+
+    result = asyncio.run(sync.sync([IngestRecord(id="r", text=text, metadata={"k": "v"})]))
+    docs = asyncio.run(client.get_docs("docs"))
+
+    assert len(result.added) > 1
+    assert all(doc_id.startswith("r#") for doc_id in result.added)
+    assert all(doc.metadata == {"k": "v", "parent_id": "r"} for doc in docs)
@@ -0,0 +1,122 @@
+#
+# Copyright (c) 2024-2025, Daily
+#
+# SPDX-License-Identifier: BSD 2-Clause License
+#
+
+import asyncio
+
+import pytest
+
+from pipecat_moss.moss_fake_client import FakeMossClient
+from pipecat_moss.moss_ingest import IngestRecord, MossIngestor
+
+
+class FlakyClient(FakeMossClient):
+    """Fake client whose uploads fail after ``fail_after`` successful ``add_docs`` calls."""
+
+    def __init__(self, fail_after: int | None = None):
+        super().__init__(latency=0.0, jitter=0.0)
+        self.fail_after = fail_after
+        self.creates = 0
+        self.adds = 0
+
+    async def create_index(self, index_name, docs, model_id=None):
+        self.creates += 1
+        return await super().create_index(index_name, docs, model_id)
+
+    async def add_docs(self, index_name, docs, options=None):
+        if self.fail_after is not None and self.adds >= self.fail_after:
+            raise RuntimeError("upload failed")
+        self.adds += 1
+        return await super().add_docs(index_name, docs, options)
+
+
+RECORDS = [IngestRecord(id=f"doc-{i}", text=f"Document number {i}.") for i in range(20)]
+
+
+def make_ingestor(client: FakeMossClient, checkpoint) -> MossIngestor:
+    return MossIngestor(
+        client,
+        "docs",
+        batch_size=2,
+        min_batch_size=2,
+        max_batch_size=2,
+        max_concurrency=1,
+        max_retries=1,
+        processes=0,
+        checkpoint_path=checkpoint,
+        create_model_id="moss-minilm",
+    )
+
+
+def test_resumed_create_run_keeps_uploaded_documents(tmp_path):
+    async def run():
+        client = FlakyClient(fail_after=3)
+        checkpoint = tmp_path / "ingest.json"
+        with pytest.raises(RuntimeError):
+            await make_ingestor(client, checkpoint).ingest(RECORDS)
+        assert checkpoint.exists()
+
+        client.fail_after = None
+        stats = await make_ingestor(client, checkpoint).ingest(RECORDS)
+        assert stats.skipped > 0
+        assert client.creates == 1
+        assert (await client.get_index("docs")).doc_count == len(RECORDS)
+
+    asyncio.run(run())
+
+
+def test_fresh_create_run_creates_the_index(tmp_path):
+    async def run():
+        client = FlakyClient()
+        stats = await make_ingestor(client, tmp_path / "ingest.json").ingest(RECORDS)
+        assert stats.skipped == 0
+        assert client.creates == 1
+        assert (await client.get_index("docs")).doc_count == len(RECORDS)
+
+    asyncio.run(run())
+
+
+class SlowHeadClient(FakeMossClient):
+    """Fake client whose first upload hangs until ``release`` is set."""
+
+    def __init__(self):
+        super().__init__(corpus_size=0, latency=0.0, jitter=0.0)
+        self.release = asyncio.Event()
+        self.adds_while_blocked = 0
+        self.adds = 0
+
+    async def add_docs(self, index_name, docs, options=None):
+        self.adds += 1
+        if self.adds == 1:
+            await self.release.wait()
+        elif not self.release.is_set():
+            self.adds_while_blocked += 1
+        return await super().add_docs(index_name, docs, options)
+
+
+def test_slow_head_batch_bounds_the_batches_behind_it(tmp_path):
+    async def run():
+        client = SlowHeadClient()
+        ingestor = MossIngestor(
+            client,
+            "docs",
+            batch_size=2,
+            min_batch_size=2,
+            max_batch_size=2,
+            max_concurrency=2,
+            processes=0,
+            checkpoint_path=tmp_path / "ingest.json",
+        )
+        records = [IngestRecord(id=f"doc-{i}", text=f"Document {i}.") for i in range(100)]
+        ingest = asyncio.create_task(ingestor.ingest(records))
+        await asyncio.sleep(0.2)
+        # Head plus at most 4 * max_concurrency - 1 batches behind it.
+        assert client.adds_while_blocked == 7
+        client.release.set()
+        stats = await asyncio.wait_for(ingest, 5.0)
+        assert stats.chunks == len(records)
+        assert (await client.get_index("docs")).doc_count == len(records)
+
+    asyncio.run(run())
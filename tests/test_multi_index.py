@@ -0,0 +1,107 @@
+#
+# Copyright (c) 2024-2025, Daily
+#
+# SPDX-License-Identifier: BSD 2-Clause License
+#
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from inferedge_moss import DocumentInfo
+
+from pipecat_moss.moss_circuit_breaker import MossCircuitBreaker
+from pipecat_moss.moss_fake_client import FakeMossClient
+from pipecat_moss.moss_multi_index_processor import MossIndexQuery, MossMultiIndexProcessor
+
+
+def hit(doc_id: str, text: str, score: float):
+    return SimpleNamespace(id=doc_id, text=text, metadata=None, score=score)
+
+
+def result(*docs):
+    return SimpleNamespace(docs=list(docs), time_taken_ms=1)
+
+
+def make_processor(**kwargs) -> MossMultiIndexProcessor:
+    indexes = [MossIndexQuery("faq"), MossIndexQuery("manual")]
+    return MossMultiIndexProcessor(FakeMossClient(), indexes, **kwargs)
+
+
+def test_rrf_rewards_documents_found_by_several_indexes():
+    processor = make_processor(fusion="rrf", rrf_k=60)
+    fused = processor._fuse(
+        {
+            "faq": result(hit("1", "only faq", 0.9), hit("2", "shared", 0.8)),
+            "manual": result(hit("9", "shared", 0.4), hit("3", "only manual", 0.3)),
+        }
+    )
+
+    assert [d.text for d in fused] == ["shared", "only faq", "only manual"]
+    assert fused[0].score == pytest.approx(1 / 62 + 1 / 61)
+    assert fused[0].metadata == {"source": "faq"}
+
+
+def test_score_fusion_normalizes_each_index_and_keeps_the_best():
+    processor = make_processor(fusion="score")
+    fused = processor._fuse(
+        {
+            "faq": result(hit("1", "a", 0.9), hit("2", "b", 0.5), hit("3", "c", 0.1)),
+            "manual": result(hit("4", "b", 40.0), hit("5", "d", 20.0)),
+        }
+    )
+
+    assert [(d.text, d.score) for d in fused] == [
+        ("a", 1.0),
+        ("b", 1.0),
+        ("c", 0.0),
+        ("d", 0.0),
+    ]
+
+
+def test_score_fusion_keeps_raw_score_of_a_single_hit():
+    processor = make_processor(fusion="score")
+    fused = processor._fuse(
+        {
+            "faq": result(hit("1", "strong", 0.9), hit("2", "decent", 0.7), hit("3", "x", 0.1)),
+            "manual": result(hit("4", "weak lone hit", 0.2)),
+        }
+    )
+
+    scores = {d.text: d.score for d in fused}
+    assert scores["weak lone hit"] == pytest.approx(0.2)
+    assert [d.text for d in fused][:2] == ["strong", "decent"]
+
+
+def test_dedupe_by_id_keeps_same_text_under_different_ids():
+    processor = make_processor(dedupe_by="id")
+    fused = processor._fuse(
+        {"faq": result(hit("1", "same", 0.9)), "manual": result(hit("2", "same", 0.9))}
+    )
+
+    assert [d.id for d in fused] == ["1", "2"]
+
+
+def test_fans_out_and_leaves_out_an_index_whose_breaker_is_open():
+    async def run():
+        client = FakeMossClient(latency=0.0, jitter=0.0)
+        await client.create_index("faq", [DocumentInfo(id="f1", text="refund policy")])
+        await client.create_index("manual", [DocumentInfo(id="m1", text="refund steps")])
+        await client.load_index("faq")
+        await client.load_index("manual")
+
+        breaker = MossCircuitBreaker("manual", failure_threshold=1)
+        breaker.record_failure()
+        processor = MossMultiIndexProcessor(
+            client,
+            [MossIndexQuery("faq", top_k=1), MossIndexQuery("manual", top_k=1)],
+            circuit_breakers={"manual": breaker},
+        )
+        fused = await processor.retrieve_documents("refund")
+
+        assert [d.id for d in fused.docs] == ["f1"]
+        assert fused.index_failures == {"manual": "circuit_open"}
+        assert client.stats.queries == 1
+        assert (await processor.retrieve_documents("refund", top_k=0)).docs == []
+
+    asyncio.run(run())
@@ -0,0 +1,125 @@
+#
+# Copyright (c) 2024-2025, Daily
+#
+# SPDX-License-Identifier: BSD 2-Clause License
+#
+
+import asyncio
+
+import pytest
+
+from pipecat_moss.moss_fake_client import FakeMossClient
+from pipecat_moss.moss_index_manager import MossIndexManager
+from pipecat_moss.moss_query_batcher import MossQueryBatcher
+
+
+class CountingClient(FakeMossClient):
+    """Fake client that counts embedding calls and can fail chosen queries."""
+
+    def __init__(self, fail_on: str | None = None):
+        super().__init__(corpus_size=50, latency=0.0, jitter=0.0, seed=3)
+        self.embed_calls: list[list[str]] = []
+        self.fail_on = fail_on
+
+    async def embed_queries(self, index_name, texts):
+        self.embed_calls.append(list(texts))
+        return await super().embed_queries(index_name, texts)
+
+    async def query_with_embedding(self, index_name, query, embedding, top_k=5, alpha=None):
+        if query == self.fail_on:
+            raise RuntimeError(f"search for {query!r} failed")
+        return await super().query_with_embedding(index_name, query, embedding, top_k, alpha)
+
+
+def make_manager(client: FakeMossClient) -> MossIndexManager:
+    return MossIndexManager(client, lambda: client)
+
+
+def test_results_are_routed_back_to_their_callers():
+    async def run():
+        client = FakeMossClient(corpus_size=50, latency=0.0, jitter=0.0, seed=3)
+        batcher = MossQueryBatcher(make_manager(client), max_batch_size=8, max_wait=0.01)
+        queries = ["refund policy", "flight delay", "hotel booking", "password login"]
+        results = await asyncio.gather(*(batcher.query("docs", q, top_k=2) for q in queries))
+        assert [r.query for r in results] == queries
+        assert all(len(r.docs) == 2 for r in results)
+        assert batcher.stats.batches == 1
+        assert batcher.stats.max_batch_size == 4
+
+    asyncio.run(run())
+
+
+def test_same_index_and_settings_are_embedded_in_one_call():
+    async def run():
+        client = CountingClient()
+        batcher = MossQueryBatcher(make_manager(client), max_batch_size=8, max_wait=0.01)
+        await asyncio.gather(
+            batcher.query("docs", "refund policy"),
+            batcher.query("docs", "flight delay"),
+            batcher.query("docs", "hotel booking", top_k=3),
+            batcher.query("other", "refund policy"),
+        )
+        # Groups of one are plain queries.
+        assert [sorted(texts) for texts in client.embed_calls] == [
+            ["flight delay", "refund policy"]
+        ]
+        assert client.stats.queries == 4
+
+    asyncio.run(run())
+
+
+def test_a_failed_search_only_fails_its_caller():
+    async def run():
+        client = CountingClient(fail_on="flight delay")
+        batcher = MossQueryBatcher(make_manager(client), max_batch_size=8, max_wait=0.01)
+        results = await asyncio.gather(
+            batcher.query("docs", "refund policy"),
+            batcher.query("docs", "flight delay"),
+            return_exceptions=True,
+        )
+        assert results[0].query == "refund policy"
+        assert isinstance(results[1], RuntimeError)
+
+    asyncio.run(run())
+
+
+def test_full_batch_dispatches_without_waiting():
+    async def run():
+        client = FakeMossClient(corpus_size=10, latency=0.0, jitter=0.0)
+        batcher = MossQueryBatcher(make_manager(client), max_batch_size=2, max_wait=10.0)
+        await asyncio.wait_for(
+            asyncio.gather(batcher.query("docs", "a b"), batcher.query("docs", "c d")), 1.0
+        )
+
+    asyncio.run(run())
+
+
+def test_clients_without_query_batch_are_queried_concurrently():
+    async def run():
+        client = FakeMossClient(corpus_size=10, latency=0.0, jitter=0.0)
+        await client.load_index("docs")
+        batcher = MossQueryBatcher(client, max_batch_size=8, max_wait=0.01)
+        results = await asyncio.gather(
+            batcher.query("docs", "refund policy"), batcher.query("docs", "flight delay")
+        )
+        assert [r.query for r in results] == ["refund policy", "flight delay"]
+        assert client.stats.queries == 2
+
+    asyncio.run(run())
+
+
+def test_cancelled_callers_are_not_dispatched():
+    async def run():
+        client = FakeMossClient(corpus_size=10, latency=0.0, jitter=0.0)
+        await client.load_index("docs")
+        batcher = MossQueryBatcher(client, max_batch_size=8, max_wait=0.01)
+        cancelled = asyncio.create_task(batcher.query("docs", "refund policy"))
+        kept = asyncio.create_task(batcher.query("docs", "flight delay"))
+        await asyncio.sleep(0)
+        cancelled.cancel()
+        assert (await kept).query == "flight delay"
+        with pytest.raises(asyncio.CancelledError):
+            await cancelled
+        assert client.stats.queries == 1
+
+    asyncio.run(run())
@@ -0,0 +1,156 @@
+#
+# Copyright (c) 2024-2025, Daily
+#
+# SPDX-License-Identifier: BSD 2-Clause License
+#
+
+import asyncio
+import math
+
+import pytest
+from pipecat.frames.frames import LLMContextFrame
+from pipecat.processors.aggregators.llm_context import LLMContext
+from pipecat.tests.utils import SleepFrame, run_test
+
+from pipecat_moss.moss_fake_client import FakeMossClient
+from pipecat_moss.moss_index_processor import MossIndexProcessor
+from pipecat_moss.moss_query_builder import ConversationQueryBuilder
+from pipecat_moss.moss_query_embedding import QueryEmbeddingCache, combine_embeddings
+
+
+def user(text):
+    return {"role": "user", "content": text}
+
+
+def assistant(text):
+    return {"role": "assistant", "content": text}
+
+
+CONVERSATION = [
+    {"role": "system", "content": "You are a support agent."},
+    user("what is your refund policy"),
+    assistant("Refunds are issued to the original card."),
+    user("and how long does that take"),
+]
+
+
+def segments(query):
+    return [(segment.text, segment.weight) for segment in query.segments]
+
+
+def test_follow_up_keeps_earlier_user_turns_with_decayed_weight():
+    query = ConversationQueryBuilder().build(CONVERSATION)
+
+    assert segments(query) == [
+        ("what is your refund policy", 0.5),
+        ("and how long does that take", 1.0),
+    ]
+    assert query == "what is your refund policy and how long does that take"
+    assert query.latest == "and how long does that take"
+
+
+def test_assistant_turns_are_included_on_request():
+    query = ConversationQueryBuilder(include_assistant=True, decay=0.5).build(CONVERSATION)
+
+    assert [weight for _, weight in segments(query)] == [0.25, 0.5, 1.0]
+
+
+def test_turns_after_the_latest_user_turn_are_ignored():
+    query = ConversationQueryBuilder(include_assistant=True, window_turns=0).build(
+        [*CONVERSATION, assistant("About five days.")]
+    )
+
+    assert segments(query) == [("and how long does that take", 1.0)]
+
+
+def test_no_user_turn_builds_no_query():
+    assert ConversationQueryBuilder().build([assistant("Hello!")]) is None
+
+
+def test_list_content_and_long_turns():
+    builder = ConversationQueryBuilder(max_turn_chars=12)
+    query = builder.build(
+        [
+            user("shipping rates for international orders"),
+            {"role": "user", "content": [{"type": "text", "text": "to canada"}]},
+        ]
+    )
+
+    assert segments(query) == [("shipping", 0.5), ("to canada", 1.0)]
+
+
+def test_turns_leaving_the_window_are_folded_into_a_summary():
+    builder = ConversationQueryBuilder(window_turns=1, summary_terms=2, summary_weight=0.25)
+    messages = [
+        user("my warranty claim for the blender"),
+        user("the blender warranty expired"),
+        user("can I pay for a repair"),
+        user("how much would that cost"),
+    ]
+    query = builder.build(messages)
+
+    summary, *rest = segments(query)
+    assert summary == ("blender warranty", 0.25)
+    assert rest == [("can I pay for a repair", 0.5), ("how much would that cost", 1.0)]
+
+
+def test_summary_is_rebuilt_when_the_history_is_replaced():
+    builder = ConversationQueryBuilder(window_turns=0, summary_terms=3)
+    builder.build([user("refund policy"), user("refund timing"), user("next")])
+    query = builder.build([user("shipping abroad"), user("next")])
+
+    assert segments(query)[0][0] == "abroad shipping"
+
+
+def test_embedding_cache_only_embeds_new_texts():
+    calls = []
+
+    async def embed(texts):
+        calls.append(list(texts))
+        return [[float(len(text)), 1.0] for text in texts]
+
+    async def run():
+        cache = QueryEmbeddingCache(max_size=3)
+        await cache.get_or_embed("docs", ["a", "bb"], embed)
+        vectors = await cache.get_or_embed("docs", ["bb", "ccc"], embed)
+        await cache.get_or_embed("faq", ["bb"], embed)
+        return cache, vectors
+
+    cache, vectors = asyncio.run(run())
+    assert calls == [["a", "bb"], ["ccc"], ["bb"]]
+    assert vectors == [[2.0, 1.0], [3.0, 1.0]]
+    stats = cache.stats
+    assert (stats.hits, stats.misses, stats.embed_calls, stats.size) == (1, 4, 3, 3)
+    assert stats.hit_rate == pytest.approx(0.2)
+
+
+def test_combined_embedding_is_a_unit_weighted_mean():
+    combined = combine_embeddings([[1.0, 0.0], [0.0, 1.0]], [1.0, 0.5])
+
+    assert combined == pytest.approx([2 / math.sqrt(5), 1 / math.sqrt(5)])
+    assert combine_embeddings([[0.0, 0.0]], [1.0]) == [0.0, 0.0]
+
+
+def test_processor_only_embeds_the_new_turn():
+    async def run():
+        client = FakeMossClient(corpus_size=20, latency=0.0, jitter=0.0)
+        await client.load_index("docs")
+        processor = MossIndexProcessor(client, "docs", query_builder=ConversationQueryBuilder())
+        first = LLMContext([user("what is your refund policy")])
+        second = LLMContext(CONVERSATION)
+        await run_test(
+            processor,
+            frames_to_send=[
+                LLMContextFrame(context=first),
+                SleepFrame(0.05),
+                LLMContextFrame(context=second),
+                SleepFrame(0.05),
+            ],
+        )
+        return client, processor
+
+    client, processor = asyncio.run(run())
+    stats = processor.embedding_stats
+    assert (stats.hits, stats.misses, stats.embed_calls) == (1, 2, 2)
+    assert client.stats.embeddings == 2
+    assert client.stats.queries == 2
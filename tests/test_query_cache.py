@@ -0,0 +1,136 @@
+#
+# Copyright (c) 2024-2025, Daily
+#
+# SPDX-License-Identifier: BSD 2-Clause License
+#
+
+import asyncio
+
+import pytest
+
+from pipecat_moss.moss_fake_client import FakeMossClient
+from pipecat_moss.moss_query_cache import MossQueryCache
+
+
+async def loaded_client(latency: float = 0.0, failure_rate: float = 0.0) -> FakeMossClient:
+    client = FakeMossClient(corpus_size=20, latency=latency, jitter=0.0, failure_rate=failure_rate)
+    await client.load_index("docs")
+    return client
+
+
+def lookup(cache: MossQueryCache, client: FakeMossClient, query: str, index_name: str = "docs"):
+    return cache.get_or_query(
+        index_name, query, 3, 0.8, lambda: client.query(index_name, query, 3, 0.8)
+    )
+
+
+def test_concurrent_identical_queries_share_one_call():
+    async def run():
+        client = await loaded_client(latency=0.01)
+        cache = MossQueryCache()
+        results = await asyncio.gather(
+            lookup(cache, client, "Refund policy?"),
+            lookup(cache, client, "refund   policy"),
+            lookup(cache, client, "REFUND POLICY"),
+        )
+        assert client.stats.queries == 1
+        assert results[0] is results[1] is results[2]
+        assert cache.stats.misses == 1
+        assert cache.stats.coalesced == 2
+
+        await lookup(cache, client, "refund policy")
+        assert client.stats.queries == 1
+        assert cache.stats.hits == 1
+
+    asyncio.run(run())
+
+
+def test_cancelling_one_waiter_keeps_the_shared_query():
+    async def run():
+        client = await loaded_client(latency=0.02)
+        cache = MossQueryCache()
+        first = asyncio.create_task(lookup(cache, client, "refund policy"))
+        second = asyncio.create_task(lookup(cache, client, "refund policy"))
+        await asyncio.sleep(0)
+        first.cancel()
+        assert (await second).query == "refund policy"
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        assert client.stats.queries == 1
+
+    asyncio.run(run())
+
+
+def test_failures_are_not_cached():
+    async def run():
+        client = await loaded_client(failure_rate=1.0)
+        cache = MossQueryCache()
+        for _ in range(2):
+            with pytest.raises(RuntimeError, match="Simulated"):
+                await lookup(cache, client, "refund policy")
+        assert client.stats.failures == 2
+        assert len(cache) == 0
+
+    asyncio.run(run())
+
+
+def test_invalidate_drops_only_that_index():
+    async def run():
+        client = await loaded_client()
+        await client.load_index("faq")
+        cache = MossQueryCache()
+        await lookup(cache, client, "refund policy")
+        await lookup(cache, client, "refund policy", index_name="faq")
+
+        cache.invalidate("docs")
+        assert len(cache) == 1
+        await lookup(cache, client, "refund policy")
+        await lookup(cache, client, "refund policy", index_name="faq")
+        assert client.stats.queries == 3
+
+        cache.invalidate()
+        assert len(cache) == 0
+
+    asyncio.run(run())
+
+
+def test_results_in_flight_during_invalidation_are_not_cached():
+    async def run():
+        client = await loaded_client(latency=0.02)
+        cache = MossQueryCache()
+        pending = asyncio.create_task(lookup(cache, client, "refund policy"))
+        await asyncio.sleep(0)
+        cache.invalidate("docs")
+        assert (await pending).query == "refund policy"
+        assert len(cache) == 0
+
+    asyncio.run(run())
+
+
+def test_least_recently_used_entries_are_evicted():
+    async def run():
+        client = await loaded_client()
+        cache = MossQueryCache(max_size=2)
+        await lookup(cache, client, "refund policy")
+        await lookup(cache, client, "flight delay")
+        await lookup(cache, client, "refund policy")
+        await lookup(cache, client, "hotel booking")
+
+        assert cache.stats.evictions == 1
+        await lookup(cache, client, "refund policy")
+        assert cache.stats.hits == 2
+
+    asyncio.run(run())
+
+
+def test_entries_expire_after_the_ttl():
+    async def run():
+        client = await loaded_client()
+        cache = MossQueryCache(ttl=0.0)
+        await lookup(cache, client, "refund policy")
+        await asyncio.sleep(0.001)
+        await lookup(cache, client, "refund policy")
+        assert cache.stats.expirations == 1
+        assert client.stats.queries == 2
+
+    asyncio.run(run())
@@ -0,0 +1,74 @@
+#
+# Copyright (c) 2024-2025, Daily
+#
+# SPDX-License-Identifier: BSD 2-Clause License
+#
+
+import asyncio
+import threading
+
+from pipecat_moss.moss_fake_client import FakeMossClient
+from pipecat_moss.moss_query_executor import MossQueryExecutor
+
+
+class Occupancy:
+    """Blocking work that records how many calls run on worker threads at once."""
+
+    def __init__(self):
+        self.release = threading.Event()
+        self.active = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+
+    async def work(self):
+        with self._lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        self.release.wait(5.0)
+        with self._lock:
+            self.active -= 1
+
+
+def test_cancelled_callers_keep_their_slot_until_the_thread_finishes():
+    async def run():
+        executor = MossQueryExecutor(max_workers=4, max_pending=2)
+        occupancy = Occupancy()
+        try:
+            callers = [asyncio.create_task(executor.submit(occupancy.work)) for _ in range(4)]
+            await asyncio.sleep(0.05)
+            for caller in callers:
+                caller.cancel()
+            await asyncio.gather(*callers, return_exceptions=True)
+
+            later = [asyncio.create_task(executor.submit(occupancy.work)) for _ in range(2)]
+            await asyncio.sleep(0.05)
+            assert occupancy.peak == 2
+            assert executor.stats.running == 2
+            assert executor.stats.waiting == 2
+
+            occupancy.release.set()
+            await asyncio.wait_for(asyncio.gather(*later), 5.0)
+            assert occupancy.peak == 2
+            assert executor.stats.running == 0
+        finally:
+            occupancy.release.set()
+            executor.shutdown()
+
+    asyncio.run(run())
+
+
+def test_queries_run_on_worker_threads():
+    async def run():
+        client = FakeMossClient(corpus_size=10, latency=0.0, jitter=0.0)
+        await client.load_index("docs")
+        executor = MossQueryExecutor(client, max_workers=2)
+        try:
+            results = await asyncio.gather(
+                executor.query("docs", "refund policy"), executor.query("docs", "flight delay")
+            )
+            assert [r.query for r in results] == ["refund policy", "flight delay"]
+            assert executor.stats.completed == 2
+        finally:
+            executor.shutdown()
+
+    asyncio.run(run())
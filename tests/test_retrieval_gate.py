@@ -0,0 +1,93 @@
+#
+# Copyright (c) 2024-2025, Daily
+#
+# SPDX-License-Identifier: BSD 2-Clause License
+#
+
+import asyncio
+
+import pytest
+from pipecat.processors.aggregators.llm_context import LLMContext
+
+from pipecat_moss.moss_fake_client import FakeMossClient
+from pipecat_moss.moss_index_processor import MossIndexProcessor
+from pipecat_moss.moss_retrieval_gate import RetrievalGate
+from pipecat_moss.moss_retrieval_trace import RetrievalTrace
+
+
+def skip_reason(gate: RetrievalGate, query: str) -> str | None:
+    return asyncio.run(gate.skip_reason(query))
+
+
+@pytest.mark.parametrize("query", ["pricing?", "Refunds", "warranty"])
+def test_single_word_questions_are_retrieved(query):
+    assert skip_reason(RetrievalGate(), query) is None
+
+
+@pytest.mark.parametrize("query", ["thanks", "Okay, okay. Thanks!", "hold on", "yes yes"])
+def test_stop_phrases_are_skipped(query):
+    assert skip_reason(RetrievalGate(), query) == "stop_phrase"
+
+
+def test_min_tokens():
+    gate = RetrievalGate(min_tokens=3)
+    assert skip_reason(gate, "refund policy") == "too_short"
+    assert skip_reason(gate, "what is the refund policy") is None
+
+
+def test_passing_alone_does_not_count_as_retrieved():
+    gate = RetrievalGate()
+    assert skip_reason(gate, "what is the refund policy") is None
+    assert skip_reason(gate, "what is the refund policy") is None
+
+
+def test_repeats_of_retrieved_queries_are_skipped():
+    gate = RetrievalGate(repeat_window=2)
+    gate.mark_retrieved("What is the refund policy?")
+    assert skip_reason(gate, "what is the refund policy") == "repeated"
+
+    gate.mark_retrieved("how do I reset my password")
+    gate.mark_retrieved("where is my order")
+    assert skip_reason(gate, "what is the refund policy") is None
+
+
+def test_predicate_has_the_final_say():
+    async def only_questions(query: str) -> bool:
+        return query.endswith("?")
+
+    gate = RetrievalGate(predicate=only_questions)
+    assert skip_reason(gate, "tell me about refunds") == "predicate"
+    assert skip_reason(gate, "what about refunds?") is None
+
+
+def retrieve_turn(processor: MossIndexProcessor, query: str) -> bool:
+    """Run the gate and retrieval for one turn; return whether retrieval ran."""
+
+    async def run():
+        if not await processor._should_retrieve(query):
+            return False
+        context = LLMContext([{"role": "user", "content": query}])
+        await processor._augment_context(context, query, RetrievalTrace("docs", "test"))
+        return True
+
+    return asyncio.run(run())
+
+
+def test_failed_retrieval_can_be_retried():
+    client = FakeMossClient(corpus_size=10, latency=0.0, jitter=0.0, failure_rate=1.0)
+    asyncio.run(client.load_index("docs"))
+    processor = MossIndexProcessor(client, "docs", gate=RetrievalGate())
+
+    assert retrieve_turn(processor, "what is the refund policy")
+    assert retrieve_turn(processor, "what is the refund policy")
+    assert client.stats.failures == 2
+
+
+def test_successful_retrieval_skips_the_repeat():
+    client = FakeMossClient(corpus_size=10, latency=0.0, jitter=0.0)
+    asyncio.run(client.load_index("docs"))
+    processor = MossIndexProcessor(client, "docs", gate=RetrievalGate())
+
+    assert retrieve_turn(processor, "what is the refund policy")
+    assert not retrieve_turn(processor, "what is the refund policy?")
+    assert client.stats.queries == 1
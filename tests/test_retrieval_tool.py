@@ -0,0 +1,75 @@
+#
+# Copyright (c) 2024-2025, Daily
+#
+# SPDX-License-Identifier: BSD 2-Clause License
+#
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from pipecat_moss.moss_fake_client import FakeMossClient
+from pipecat_moss.moss_index_processor import MossIndexProcessor
+from pipecat_moss.moss_retrieval_tool import MossRetrievalTool
+
+
+def call_tool(arguments: dict) -> tuple[list, object]:
+    async def run():
+        client = FakeMossClient(corpus_size=20, latency=0.0, jitter=0.0, seed=1)
+        await client.load_index("docs")
+        processor = MossIndexProcessor(client, "docs", top_k=3)
+        tool = MossRetrievalTool({"docs": processor}, max_top_k=10)
+        results = []
+
+        async def result_callback(result, **kwargs):
+            results.append(result)
+
+        params = SimpleNamespace(
+            arguments=arguments,
+            result_callback=result_callback,
+            llm=SimpleNamespace(metrics_enabled=False),
+        )
+        await tool.handle_function_call(params)
+        return results, processor
+
+    return asyncio.run(run())
+
+
+def passage_count(result: str) -> int:
+    return sum(1 for line in result.splitlines() if line[:1].isdigit())
+
+
+@pytest.mark.parametrize("top_k", ["five", None, [], {"n": 2}, float("inf")])
+def test_invalid_top_k_falls_back_to_the_default(top_k):
+    results, _ = call_tool({"query": "refund policy", "top_k": top_k})
+    assert len(results) == 1
+    assert passage_count(results[0]) == 3
+
+
+@pytest.mark.parametrize(("top_k", "expected"), [("2", 2), (7, 7), (0, 1), (50, 10)])
+def test_top_k_is_clamped(top_k, expected):
+    results, _ = call_tool({"query": "refund policy", "top_k": top_k})
+    assert passage_count(results[0]) == expected
+
+
+def test_explicit_top_k_is_not_replaced_by_the_default():
+    async def run():
+        client = FakeMossClient(corpus_size=20, latency=0.0, jitter=0.0, seed=1)
+        await client.load_index("docs")
+        processor = MossIndexProcessor(client, "docs", top_k=3)
+        assert len((await processor.retrieve_documents("refund policy")).docs) == 3
+        assert len((await processor.retrieve_documents("refund policy", top_k=1)).docs) == 1
+        assert (await processor.retrieve_documents("refund policy", top_k=0)).docs == []
+
+    asyncio.run(run())
+
+
+def test_missing_query_reports_an_error():
+    results, _ = call_tool({"query": "  "})
+    assert "error" in results[0]
+
+
+def test_result_matches_the_processor_formatting():
+    results, processor = call_tool({"query": "refund policy"})
+    assert results[0].startswith(processor.format_documents([]))
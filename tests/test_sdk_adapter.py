@@ -0,0 +1,61 @@
+#
+# Copyright (c) 2024-2025, Daily
+#
+# SPDX-License-Identifier: BSD 2-Clause License
+#
+
+import asyncio
+
+import inferedge_moss
+import pytest
+from inferedge_moss import MossClient
+
+from pipecat_moss.moss_fake_client import FakeMossClient
+from pipecat_moss.moss_index_manager import MossIndexManager
+from pipecat_moss.moss_sdk_adapter import SUPPORTED_SDK_VERSIONS, sdk_internals
+
+
+def test_fake_clients_have_no_internals():
+    assert sdk_internals(FakeMossClient()) is None
+
+
+def test_supported_sdk_exposes_internals(monkeypatch):
+    monkeypatch.setattr(inferedge_moss, "__version__", sorted(SUPPORTED_SDK_VERSIONS)[0])
+    internals = sdk_internals(MossClient("project", "key"))
+    assert internals is not None
+    assert not internals.has_index("docs")
+
+
+def test_unsupported_sdk_falls_back_to_the_public_api(monkeypatch):
+    monkeypatch.setattr(inferedge_moss, "__version__", "99.0.0")
+    assert sdk_internals(MossClient("project", "key")) is None
+
+
+class PublicApiClient(FakeMossClient):
+    """Fake client limited to the public ``MossClient`` API."""
+
+    embed_queries = None
+    query_with_embedding = None
+
+
+def test_clients_without_embedding_search_fall_back_to_query():
+    async def run():
+        client = PublicApiClient(corpus_size=10, latency=0.0, jitter=0.0)
+        manager = MossIndexManager(client, lambda: client)
+        with pytest.raises(NotImplementedError):
+            await manager.embed_queries("docs", ["refund policy"])
+        result = await manager.query_with_embedding("docs", "refund policy", [0.0], top_k=2)
+        assert len(result.docs) == 2
+        assert client.stats.queries == 1
+
+    asyncio.run(run())
+
+
+def test_clients_share_embedding_models(monkeypatch):
+    monkeypatch.setattr(inferedge_moss, "__version__", sorted(SUPPORTED_SDK_VERSIONS)[0])
+    shared, client = MossClient("project", "key"), MossClient("project", "key")
+    sdk_internals(client).share_embedding_models(sdk_internals(shared))
+    assert (
+        client._internal._index_service._embedding_services
+        is shared._internal._index_service._embedding_services
+    )
@@ -0,0 +1,156 @@
+#
+# Copyright (c) 2024-2025, Daily
+#
+# SPDX-License-Identifier: BSD 2-Clause License
+#
+
+import asyncio
+
+from pipecat.frames.frames import InterimTranscriptionFrame, LLMContextFrame
+from pipecat.processors.aggregators.llm_context import LLMContext
+from pipecat.tests.utils import SleepFrame, run_test
+
+from pipecat_moss.moss_circuit_breaker import MossCircuitBreaker
+from pipecat_moss.moss_fake_client import FakeMossClient
+from pipecat_moss.moss_index_processor import MossIndexProcessor
+from pipecat_moss.moss_retrieval_gate import RetrievalGate
+
+
+def interim(text: str) -> InterimTranscriptionFrame:
+    return InterimTranscriptionFrame(text=text, user_id="user", timestamp="")
+
+
+def user_turn(text: str) -> LLMContextFrame:
+    return LLMContextFrame(context=LLMContext([{"role": "user", "content": text}]))
+
+
+class RecordingClient(FakeMossClient):
+    """Fake client that records the text of every query, and which were cancelled."""
+
+    def __init__(self, latency: float = 0.0):
+        super().__init__(corpus_size=20, latency=latency, jitter=0.0, seed=2)
+        self.queries: list[str] = []
+        self.cancelled: list[str] = []
+
+    async def query(self, index_name, query, top_k=5, alpha=None):
+        self.queries.append(str(query))
+        try:
+            return await super().query(index_name, query, top_k, alpha)
+        except asyncio.CancelledError:
+            self.cancelled.append(str(query))
+            raise
+
+
+async def loaded_client(latency: float = 0.0) -> RecordingClient:
+    client = RecordingClient(latency)
+    await client.load_index("docs")
+    return client
+
+
+def test_open_breaker_blocks_speculation():
+    async def run():
+        client = await loaded_client()
+        breaker = MossCircuitBreaker("docs", failure_threshold=1, reset_timeout=60.0)
+        breaker.record_failure()
+        processor = MossIndexProcessor(client, "docs", speculative=True, circuit_breaker=breaker)
+        await run_test(
+            processor,
+            frames_to_send=[interim("what is the refund policy"), SleepFrame(0.05)],
+        )
+        assert client.stats.queries == 0
+
+    asyncio.run(run())
+
+
+def test_gated_text_is_not_speculated():
+    async def run():
+        client = await loaded_client()
+        processor = MossIndexProcessor(client, "docs", speculative=True, gate=RetrievalGate())
+        await run_test(processor, frames_to_send=[interim("okay thanks"), SleepFrame(0.05)])
+        assert client.stats.queries == 0
+
+    asyncio.run(run())
+
+
+def test_matching_turn_reuses_the_speculative_query():
+    async def run():
+        client = await loaded_client()
+        processor = MossIndexProcessor(client, "docs", speculative=True)
+        await run_test(
+            processor,
+            frames_to_send=[
+                interim("what is the refund policy"),
+                SleepFrame(0.05),
+                user_turn("What is the refund policy?"),
+                SleepFrame(0.05),
+            ],
+        )
+        assert client.queries == ["what is the refund policy"]
+        assert processor._speculative_hits == 1
+        assert processor._speculative_wasted == 0
+
+    asyncio.run(run())
+
+
+def test_different_turn_discards_the_speculative_query():
+    async def run():
+        client = await loaded_client()
+        processor = MossIndexProcessor(client, "docs", speculative=True)
+        await run_test(
+            processor,
+            frames_to_send=[
+                interim("where is my order"),
+                SleepFrame(0.05),
+                user_turn("what is the refund policy"),
+                SleepFrame(0.05),
+            ],
+        )
+        assert client.queries == ["where is my order", "what is the refund policy"]
+        assert processor._speculative_hits == 0
+        assert processor._speculative_wasted == 1
+
+    asyncio.run(run())
+
+
+def test_diverging_interim_cancels_the_speculative_query():
+    async def run():
+        client = await loaded_client(latency=0.5)
+        processor = MossIndexProcessor(client, "docs", speculative=True)
+        await run_test(
+            processor,
+            frames_to_send=[
+                interim("where is my order"),
+                SleepFrame(0.02),
+                interim("what is the refund policy"),
+                SleepFrame(0.02),
+            ],
+        )
+        assert client.queries[0] == "where is my order"
+        assert client.queries[1].endswith("what is the refund policy")
+        assert client.cancelled[0] == "where is my order"
+        assert processor._speculative_started == 2
+
+    asyncio.run(run())
+
+
+def test_turn_that_skips_retrieval_resets_the_transcript():
+    async def run():
+        client = await loaded_client()
+        processor = MossIndexProcessor(client, "docs", speculative=True)
+        await run_test(
+            processor,
+            frames_to_send=[
+                user_turn("refund policy"),
+                SleepFrame(0.05),
+                interim("where is my order"),
+                SleepFrame(0.05),
+                # A duplicate query ends the turn before any retrieval.
+                user_turn("refund policy"),
+                SleepFrame(0.05),
+                interim("flight delay"),
+                SleepFrame(0.05),
+            ],
+        )
+        assert client.queries == ["refund policy", "where is my order", "flight delay"]
+
+    asyncio.run(run())